@@ -9,6 +9,12 @@ __version__ = "1.0.0"
 __author__ = "Ambivo Development Team"
 __email__ = "dev@ambivo.com"
 
-from .server import run_server as main
+
+def main():
+    """Console entry point; imports the server only when it is run"""
+    from .server import run_server
+
+    return run_server()
+
 
 __all__ = ["main"]
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+HTTP client for the Ambivo API
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import json_codec
+from .cache import ResponseCache
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .compression import TransferStats, accept_encoding_header, compress_body
+from .config import ServerConfig
+from .http_pool import create_http_client, get_pool_stats
+from .logging_pipeline import SAMPLED
+from .metrics import MetricsRegistry
+from .retry import RetryPolicy
+from .security import InputValidator, TokenValidator
+from .singleflight import SingleFlight
+from .streaming import StreamingJSONReader
+from .tenants import get_tenant_session
+from .tracing import REQUEST_ID_HEADER, Tracer, get_request_id
+
+# Undecoded bodies are checked for an upstream failure in a bounded prefix
+FAILURE_CHECK_BYTES = 4096
+_FAILURE_PATTERN = re.compile(rb'"success"\s*:\s*false')
+
+
+def is_cacheable_body(body: bytes) -> bool:
+    """
+    Whether an undecoded upstream body can be cached
+
+    Only the first FAILURE_CHECK_BYTES are inspected: the body must open a
+    JSON object or array and not report `"success": false`, which the
+    upstream sends ahead of its data.
+    """
+    head = body[:FAILURE_CHECK_BYTES].lstrip()
+    return head[:1] in (b"{", b"[") and _FAILURE_PATTERN.search(head) is None
+
+
+def parse_bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Extract the token from an "Authorization: Bearer <token>" header value"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+
+@dataclass
+class QueryResponse:
+    """Outcome of a natural query"""
+
+    result: Optional[Any]  # decoded response, when decoding was requested
+    body: Optional[bytes]  # raw upstream body
+    # Served from the cache or by another caller's identical in-flight request
+    shared: bool = False
+
+
+class AmbivoAPIClient:
+    """Client for interacting with Ambivo API endpoints with enhanced error handling"""
+
+    def __init__(
+        self,
+        config: ServerConfig,
+        auth_token: Optional[str] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None,
+        input_validator: Optional[InputValidator] = None,
+        token_validator: Optional[TokenValidator] = None,
+    ):
+        self.config = config
+        self.base_url = config.base_url.rstrip("/")
+        self.client = create_http_client(config)
+        self.accept_encoding = accept_encoding_header(config.accept_encodings)
+        self.transfer_stats = TransferStats()
+        self.cache = (
+            ResponseCache(
+                max_bytes=config.response_cache_max_bytes,
+                ttl=config.response_cache_ttl,
+                compress=config.response_cache_compress,
+            )
+            if config.response_cache_enabled
+            else None
+        )
+        self.single_flight = SingleFlight() if config.single_flight_enabled else None
+        self.retry_policy = RetryPolicy.from_config(config)
+        self.stream_reader = (
+            StreamingJSONReader(max_bytes=config.max_payload_size)
+            if config.stream_responses
+            else None
+        )
+        self.circuit_breaker = (
+            CircuitBreaker.from_config(
+                config, on_state_change=self._on_circuit_state_change
+            )
+            if config.circuit_breaker_enabled
+            else None
+        )
+        self._init_metrics(metrics or MetricsRegistry())
+        self.tracer = tracer or Tracer()
+        self.input_validator = input_validator or InputValidator(
+            max_query_length=config.max_query_length,
+            max_payload_size=config.max_payload_size,
+        )
+        self.token_validator = token_validator or TokenValidator(
+            cache_ttl=config.token_cache_ttl,
+            max_cache_size=config.token_cache_max_size,
+        )
+        self.logger = logging.getLogger("ambivo-mcp.client")
+        self.auth_token = auth_token
+
+    @property
+    def auth_token(self) -> Optional[str]:
+        """Token for the current call: the request tenant's, else the session's"""
+        tenant = get_tenant_session()
+        return tenant.token if tenant is not None else self.session_token
+
+    @auth_token.setter
+    def auth_token(self, token: Optional[str]) -> None:
+        self.session_token = token
+        self._session_client_id = (
+            self.token_validator.get_client_id_from_token(token) if token else None
+        )
+
+    @property
+    def client_id(self) -> Optional[str]:
+        """Client ID of the current call's tenant, or None when unauthenticated"""
+        tenant = get_tenant_session()
+        return tenant.client_id if tenant is not None else self._session_client_id
+
+    def set_auth_token(self, token: str):
+        """Set the authentication token with validation"""
+        try:
+            if self.config.token_validation_enabled:
+                self.token_validator.validate_token_format(token)
+            self.auth_token = token
+            self.logger.info("Authentication token set successfully")
+        except ValueError as e:
+            self.logger.error(f"Invalid token format: {e}")
+            raise
+
+    def _get_headers(self) -> Dict[str, str]:
+        """Get headers for API requests"""
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Accept-Encoding": self.accept_encoding,
+        }
+        auth_token = self.auth_token
+        if auth_token:
+            headers["Authorization"] = f"Bearer {auth_token}"
+        request_id = get_request_id()
+        if request_id:
+            headers[REQUEST_ID_HEADER] = request_id
+        return headers
+
+    def _init_metrics(self, metrics: MetricsRegistry) -> None:
+        """Create upstream metrics and expose component stats to the registry"""
+        self.metrics = metrics
+        self.upstream_duration = metrics.histogram(
+            "upstream_request_duration_seconds",
+            "Latency of upstream API attempts",
+            ("endpoint",),
+        )
+        self.upstream_responses = metrics.counter(
+            "upstream_responses",
+            "Upstream attempts by HTTP status or transport error",
+            ("endpoint", "status"),
+        )
+        self.upstream_retries = metrics.counter(
+            "upstream_retries", "Retried upstream attempts", ("endpoint",)
+        )
+        self.upstream_in_flight = metrics.gauge(
+            "upstream_requests_in_flight", "Upstream attempts in progress"
+        )
+        self.circuit_state = metrics.gauge(
+            "circuit_open",
+            "1 while the upstream circuit is open, 0.5 half-open",
+            aggregate="max",
+        )
+        self.circuit_state.set(0)
+
+        metrics.register_collector("pool", self.get_pool_stats)
+        metrics.register_collector("retry", self.retry_policy.get_stats)
+        metrics.register_collector("transfer", self.transfer_stats.get_stats)
+        metrics.register_collector("cache", self.get_cache_stats)
+        if self.single_flight is not None:
+            metrics.register_collector("single_flight", self.single_flight.get_stats)
+        if self.circuit_breaker is not None:
+            metrics.register_collector("circuit", self.circuit_breaker.get_stats)
+
+    def _on_circuit_state_change(
+        self, old_state: CircuitState, new_state: CircuitState
+    ) -> None:
+        """Mirror circuit breaker transitions into the circuit_open gauge"""
+        values = {
+            CircuitState.CLOSED: 0,
+            CircuitState.HALF_OPEN: 0.5,
+            CircuitState.OPEN: 1,
+        }
+        self.circuit_state.set(values[new_state])
+
+    def _observe_attempt(self, endpoint: str, latency: float, outcome: str) -> None:
+        """Record the latency and outcome of one upstream attempt"""
+        self.retry_policy.record_attempt(latency, outcome)
+        self.upstream_duration.labels(endpoint).observe(latency)
+        self.upstream_responses.labels(endpoint, outcome).inc()
+
+    def _record_upstream_outcome(self, failed: bool) -> None:
+        """Feed the outcome of one upstream attempt to the circuit breaker"""
+        if self.circuit_breaker is None:
+            return
+        if failed:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    async def _make_request_with_retry(
+        self, method: str, url: str, stream: bool = False, **kwargs
+    ) -> httpx.Response:
+        """
+        Make HTTP request with jittered backoff, Retry-After and a retry budget
+
+        With stream=True the returned response body has not been read yet and
+        the caller is responsible for closing it.
+        """
+        retry = self.retry_policy
+        max_attempts = self.config.max_retries + 1
+        endpoint = urlsplit(url).path
+
+        for attempt in range(max_attempts):
+            is_last_attempt = attempt + 1 >= max_attempts
+            if self.circuit_breaker is not None:
+                # Fails fast with CircuitOpenError while the upstream is down
+                self.circuit_breaker.before_request()
+
+            attempt_start = time.perf_counter()
+            self.upstream_in_flight.inc()
+            try:
+                with self.tracer.span(
+                    "upstream_attempt", endpoint=endpoint, attempt=attempt + 1
+                ) as span:
+                    request_kwargs = kwargs
+                    trace = self.tracer.httpx_trace()
+                    if trace is not None:
+                        # Connection-level phases become child spans
+                        request_kwargs = {**kwargs, "extensions": {"trace": trace}}
+                    if stream:
+                        request = self.client.build_request(
+                            method, url, **request_kwargs
+                        )
+                        response = await self.client.send(request, stream=True)
+                    else:
+                        response = await self.client.request(
+                            method, url, **request_kwargs
+                        )
+                    span.set_attribute("status_code", response.status_code)
+            except (httpx.TimeoutException, httpx.ConnectError, httpx.ReadError) as e:
+                self._observe_attempt(
+                    endpoint, time.perf_counter() - attempt_start, type(e).__name__
+                )
+                self._record_upstream_outcome(failed=True)
+                if is_last_attempt or not retry.allow_retry():
+                    self.logger.error(
+                        f"Request failed after {attempt + 1} of {max_attempts} attempts"
+                    )
+                    raise
+                wait_time = retry.backoff(attempt)
+                self.logger.warning(
+                    f"Request attempt {attempt + 1} failed, retrying in {wait_time:.2f}s: {e}"
+                )
+                self.upstream_retries.labels(endpoint).inc()
+                await asyncio.sleep(wait_time)
+                continue
+            except httpx.TransportError as e:
+                self._observe_attempt(
+                    endpoint, time.perf_counter() - attempt_start, type(e).__name__
+                )
+                self._record_upstream_outcome(failed=True)
+                raise
+            except BaseException:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.release_probe()
+                raise
+            finally:
+                self.upstream_in_flight.dec()
+
+            self._observe_attempt(
+                endpoint, time.perf_counter() - attempt_start, str(response.status_code)
+            )
+            self._record_upstream_outcome(failed=response.status_code >= 500)
+            if not retry.is_retryable_status(response.status_code):
+                if response.status_code < 500:
+                    retry.budget.record_success()
+                return response
+
+            if is_last_attempt:
+                return response
+            wait_time = retry.delay_for_status(
+                attempt, response.headers.get("Retry-After")
+            )
+            if wait_time is None or not retry.allow_retry():
+                return response
+            if stream:
+                await response.aclose()
+            self.logger.warning(
+                f"Request attempt {attempt + 1} returned HTTP {response.status_code}, "
+                f"retrying in {wait_time:.2f}s"
+            )
+            self.upstream_retries.labels(endpoint).inc()
+            await asyncio.sleep(wait_time)
+
+        # This should never be reached, but just in case
+        raise RuntimeError("Retry loop exited without a response")
+
+    async def _read_json_response(
+        self, response: httpx.Response, decode: bool = True
+    ) -> Tuple[Optional[Any], Optional[bytes], int]:
+        """
+        Check status and read a JSON response
+
+        Args:
+            response: Upstream response, streamed when a stream reader is set
+            decode: Decode the body; when False only the raw bytes are returned
+
+        Returns:
+            Tuple of (decoded JSON or None, raw body bytes when available,
+            decompressed body size)
+        """
+        if self.stream_reader is None:
+            response.raise_for_status()
+            body = response.content
+            return (json_codec.loads(body) if decode else None), body, len(body)
+
+        try:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            if not decode:
+                body = await self.stream_reader.read_bytes(response)
+                return None, body, len(body)
+            return await self.stream_reader.read(
+                response, keep_body=self.cache is not None
+            )
+        finally:
+            await response.aclose()
+
+    async def natural_query(
+        self, query: str, response_format: str = "both"
+    ) -> Dict[str, Any]:
+        """
+        Execute a natural language query against entity data with validation and error handling
+
+        Args:
+            query: Natural language query string
+            response_format: Response format - "table", "natural", or "both"
+
+        Returns:
+            API response dictionary
+        """
+        response = await self.natural_query_response(query, response_format)
+        return response.result
+
+    async def natural_query_raw(
+        self, query: str, response_format: str = "both"
+    ) -> bytes:
+        """
+        Execute a natural language query and return the undecoded upstream body
+
+        Used to pass upstream JSON straight through to MCP clients without
+        parsing and re-encoding it.
+
+        Args:
+            query: Natural language query string
+            response_format: Response format - "table", "natural", or "both"
+
+        Returns:
+            Raw UTF-8 JSON response body
+        """
+        response = await self.natural_query_response(
+            query, response_format, decode=False
+        )
+        return response.body
+
+    async def natural_query_response(
+        self, query: str, response_format: str = "both", decode: bool = True
+    ) -> QueryResponse:
+        """
+        Execute a natural language query, telling whether it went upstream
+
+        Args:
+            query: Natural language query string
+            response_format: Response format - "table", "natural", or "both"
+            decode: Decode the response; otherwise only the raw body is kept
+
+        Returns:
+            Decoded result and raw body, marked shared when this call did not
+            make the upstream request itself
+        """
+        # Validate inputs
+        with self.tracer.span("validate"):
+            self.input_validator.validate_query(query)
+
+            if response_format not in ["table", "natural", "both"]:
+                raise ValueError(
+                    "Invalid response_format. Must be 'table', 'natural', or 'both'"
+                )
+
+        # Cache and single-flight keys are scoped to the tenant owning the token
+        client_id = self.client_id
+
+        if self.cache is not None and client_id is not None:
+            with self.tracer.span("cache_lookup") as span:
+                cached = self.cache.get(client_id, query, response_format)
+                span.set_attribute("hit", cached is not None)
+            if cached is not None:
+                self.logger.info(
+                    "Natural query served from cache: %.100s...", query, extra=SAMPLED
+                )
+                result = json_codec.loads(cached) if decode else None
+                return QueryResponse(result, cached, shared=True)
+
+        payload = {"query": query, "response_format": response_format}
+        raw_body = json_codec.dumps(payload).encode("utf-8")
+        content, content_encoding = compress_body(
+            raw_body, self.config.request_compression_min_bytes
+        )
+
+        url = f"{self.base_url}/entity/natural_query"
+        headers = self._get_headers()
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+
+        # Only the caller whose fetch runs pays for the upstream request
+        fetched = False
+
+        async def fetch() -> Tuple[Optional[Any], Optional[bytes]]:
+            nonlocal fetched
+            fetched = True
+            with self.tracer.span("upstream_request"):
+                response = await self._make_request_with_retry(
+                    "POST",
+                    url,
+                    stream=self.stream_reader is not None,
+                    content=content,
+                    headers=headers,
+                )
+            with self.tracer.span("read_response", decode=decode) as span:
+                result, body, size = await self._read_json_response(
+                    response, decode=decode
+                )
+                span.set_attribute("bytes", size)
+            self.transfer_stats.record(
+                client_id,
+                sent_bytes=len(raw_body),
+                sent_wire_bytes=len(content),
+                received_bytes=size,
+                received_wire_bytes=response.num_bytes_downloaded,
+            )
+            return result, body
+
+        try:
+            self.logger.info("Executing natural query: %.100s...", query, extra=SAMPLED)
+            start_time = time.time()
+
+            if self.single_flight is not None and client_id is not None:
+                key = (
+                    client_id,
+                    ResponseCache.normalize_query(query),
+                    response_format,
+                    decode,
+                )
+                result, body = await self.single_flight.do(key, fetch)
+            else:
+                result, body = await fetch()
+
+            elapsed_time = time.time() - start_time
+            self.logger.info(
+                "Natural query completed in %.2fs", elapsed_time, extra=SAMPLED
+            )
+
+            if self.cache is not None and client_id is not None and body is not None:
+                if result is not None:
+                    cacheable = not (
+                        isinstance(result, dict) and result.get("success") is False
+                    )
+                else:
+                    cacheable = is_cacheable_body(body)
+                if cacheable:
+                    self.cache.set(client_id, query, response_format, body)
+
+            if self.logger.isEnabledFor(logging.DEBUG):
+                preview = (
+                    body[:500].decode("utf-8", "replace")
+                    if body is not None
+                    else json_codec.dumps(result)
+                )
+                self.logger.debug("API response: %.500s...", preview)
+            return QueryResponse(result, body, shared=not fetched)
+
+        except httpx.TimeoutException as e:
+            self.logger.error(f"Natural query timeout: {e}")
+            raise Exception(f"Request timeout after {self.config.timeout}s")
+        except httpx.HTTPStatusError as e:
+            self.logger.error(
+                f"Natural query HTTP error: {e.response.status_code} - {e.response.text}"
+            )
+            raise
+        except Exception as e:
+            self.logger.error(f"Natural query unexpected error: {e}")
+            raise
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get live connection pool statistics for sizing the pool"""
+        return get_pool_stats(self.client)
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get response cache statistics, or None when caching is disabled"""
+        return self.cache.get_stats() if self.cache is not None else None
+
+    async def close(self):
+        """Close the HTTP client"""
+        await self.client.aclose()
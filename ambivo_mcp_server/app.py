@@ -0,0 +1,750 @@
+#!/usr/bin/env python3
+"""
+MCP application for Ambivo API endpoints
+
+Holds the components the MCP tools share (API client, rate limiter, result
+store, metrics, tracer) and registers the tool and resource handlers on an
+MCP server. Built by server.create_app(); importing this module pulls in the
+mcp SDK and httpx, so the server entry point imports it lazily.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from mcp import types
+from mcp.server import NotificationOptions, Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.server.models import InitializationOptions
+from pydantic import AnyUrl
+
+from . import json_codec
+from .api_client import AmbivoAPIClient
+from .config import ServerConfig
+from .heavy_hitters import RateLimitUsage
+from .logging_pipeline import SAMPLED
+from .metrics import MetricsRegistry
+from .result_store import (
+    RESULT_URI_TEMPLATE,
+    ResultNotFoundError,
+    ResultStore,
+    parse_result_uri,
+)
+from .security import (
+    InputValidator,
+    RateLimitPolicy,
+    RateLimitTiers,
+    TokenValidator,
+    create_rate_limiter,
+)
+from .tenants import TenantSession, TenantSessionPool, get_tenant_session
+from .tracing import Tracer, request_context
+
+TOOL_NAMES = frozenset(
+    [
+        "set_auth_token",
+        "natural_query",
+        "batch_natural_query",
+        "get_result_page",
+        "server_stats",
+    ]
+)
+
+
+class AmbivoMCPApp:
+    """MCP server application: shared components and tool handlers"""
+
+    def __init__(self, config: ServerConfig, logger: Optional[logging.Logger] = None):
+        self.config = config
+        self.logger = logger or logging.getLogger("ambivo-mcp")
+
+        # Initialize security components
+        if config.rate_limit_backend == "local":
+            self.rate_limiter = create_rate_limiter(
+                config.rate_limit_algorithm,
+                max_requests=config.rate_limit_requests,
+                window_seconds=config.rate_limit_window,
+                sweep_interval=config.rate_limit_sweep_interval,
+                burst=config.rate_limit_burst,
+            )
+        else:
+            from .rate_limit_backends import SharedRateLimiter
+
+            self.rate_limiter = SharedRateLimiter.from_config(config)
+        self.rate_limit_tiers = RateLimitTiers.from_config(
+            config, self.rate_limiter.default_policy
+        )
+        if config.rate_limit_top_clients:
+            self.rate_limiter.usage = RateLimitUsage(
+                config.rate_limit_top_clients,
+                config.rate_limit_sketch_width,
+                period=config.rate_limit_usage_period,
+            )
+        self.input_validator = InputValidator(
+            max_query_length=config.max_query_length,
+            max_payload_size=config.max_payload_size,
+        )
+        self.token_validator = TokenValidator(
+            cache_ttl=config.token_cache_ttl,
+            max_cache_size=config.token_cache_max_size,
+        )
+
+        # Per-tenant state for HTTP requests; all tenants share the API client
+        self.tenant_sessions = TenantSessionPool(
+            self.token_validator.get_client_id_from_token,
+            max_sessions=config.tenant_max_sessions,
+            idle_ttl=config.tenant_idle_ttl,
+            on_evict=self._release_tenant,
+        )
+
+        # Metrics and tracing shared by the tool handlers and the API client
+        self.metrics = MetricsRegistry()
+        self.tracer = Tracer.from_config(config)
+        self.tool_duration = self.metrics.histogram(
+            "tool_call_duration_seconds",
+            "Latency of MCP tool calls",
+            ("tool", "outcome"),
+        )
+        self.tools_in_flight = self.metrics.gauge(
+            "tool_calls_in_flight", "MCP tool calls in progress"
+        )
+        self.rate_limited = self.metrics.counter(
+            "rate_limit_rejections", "Requests rejected by the rate limiter", ("tool",)
+        )
+        self.rate_limit_cost = self.metrics.counter(
+            "rate_limit_cost",
+            "Cost charged to the rate limiter, in requests",
+            ("tool",),
+        )
+        self.rate_limit_wait = self.metrics.histogram(
+            "rate_limit_wait_seconds",
+            "Time calls waited for a rate limit permit",
+            ("tool",),
+        )
+
+        self.api_client = AmbivoAPIClient(
+            config,
+            auth_token=config.auth_token,
+            metrics=self.metrics,
+            tracer=self.tracer,
+            input_validator=self.input_validator,
+            token_validator=self.token_validator,
+        )
+
+        self.metrics.register_collector("tenants", self.tenant_sessions.get_stats)
+        self.metrics.register_collector("token_cache", self.token_validator.get_stats)
+        self.metrics.register_collector("rate_limiter", self.rate_limiter.get_stats)
+        self.metrics.register_collector(
+            "rate_limit_tiers", self.rate_limit_tiers.get_stats
+        )
+        if self.rate_limiter.usage is not None:
+            self.metrics.register_collector(
+                "rate_limit_usage", self.rate_limiter.usage.get_stats
+            )
+
+        # Server-side storage for large results
+        self.result_store = (
+            ResultStore.from_config(config) if config.result_handles_enabled else None
+        )
+
+        self.server = Server(config.server_name)
+        self.server.list_tools()(self.list_tools)
+        self.server.list_resource_templates()(self.list_resource_templates)
+        self.server.read_resource()(self.read_resource)
+        self.server.call_tool()(self.call_tool)
+
+    def initialization_options(self) -> InitializationOptions:
+        """Options announced to MCP clients on initialization"""
+        return InitializationOptions(
+            server_name=self.config.server_name,
+            server_version=self.config.server_version,
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
+            ),
+        )
+
+    def _tool_cost(self, name: str) -> float:
+        """Provisional rate limit cost of one call of a tool"""
+        return self.config.rate_limit_tool_weights.get(name, 1.0)
+
+    def _rate_limit_policy(self, client_id: str) -> RateLimitPolicy:
+        """Rate limit policy of the current call's tenant"""
+        return self.rate_limit_tiers.resolve(client_id, self.api_client.auth_token)
+
+    async def _reconcile_cost(
+        self, client_id: str, name: str, size: int, seconds: float
+    ) -> None:
+        """
+        Charge a completed call by its response size and upstream time
+
+        Calls are charged the larger of the tool's base weight and the
+        measured cost, so only heavy calls pay more than the provisional cost.
+        """
+        measured = (
+            size / 1048576 * self.config.rate_limit_cost_per_mb
+            + seconds * self.config.rate_limit_cost_per_second
+        )
+        extra = measured - self._tool_cost(name)
+        if extra > 0:
+            await self.rate_limiter.reconcile(client_id, extra)
+            self.rate_limit_cost.labels(name).inc(extra)
+
+    def _release_tenant(self, session: TenantSession) -> None:
+        """Free the state of an evicted tenant session"""
+        self.rate_limiter.release(session.client_id)
+        self.rate_limit_tiers.forget(session.client_id)
+
+    async def close(self) -> None:
+        """Release the HTTP client, trace file, stored results and rate limits"""
+        await self.api_client.close()
+        self.tracer.close()
+        self.rate_limiter.close()
+        if self.result_store is not None:
+            self.result_store.close()
+
+    async def list_tools(self) -> List[types.Tool]:
+        """
+        List available tools.
+        """
+        tools = [
+            types.Tool(
+                name="natural_query",
+                description="Execute natural language queries against Ambivo entity data. "
+                "This tool processes natural language queries and returns structured data "
+                "about leads, contacts, opportunities, and other entities.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Natural language query describing what data you want to retrieve. "
+                            "Examples: 'Show me leads created this week', 'Find contacts with gmail addresses', "
+                            "'List opportunities worth more than $10,000'",
+                        },
+                        "response_format": {
+                            "type": "string",
+                            "enum": ["table", "natural", "both"],
+                            "default": "both",
+                            "description": "Format of the response: 'table' for structured data, "
+                            "'natural' for natural language description, 'both' for both formats",
+                        },
+                    },
+                    "required": ["query"],
+                },
+            ),
+            types.Tool(
+                name="set_auth_token",
+                description="Set the authentication token for API requests. "
+                "This must be called before using other tools to authenticate with the Ambivo API.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "token": {
+                            "type": "string",
+                            "description": "JWT Bearer token for authentication with Ambivo API",
+                        }
+                    },
+                    "required": ["token"],
+                },
+            ),
+        ]
+
+        tools.append(
+            types.Tool(
+                name="batch_natural_query",
+                description="Execute several natural language queries against Ambivo "
+                "entity data in one call. Queries run concurrently and each one "
+                "returns its own result or error.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "queries": {
+                            "type": "array",
+                            "minItems": 1,
+                            "maxItems": self.config.batch_max_queries,
+                            "items": {
+                                "oneOf": [
+                                    {"type": "string"},
+                                    {
+                                        "type": "object",
+                                        "properties": {
+                                            "query": {"type": "string"},
+                                            "response_format": {
+                                                "type": "string",
+                                                "enum": ["table", "natural", "both"],
+                                            },
+                                        },
+                                        "required": ["query"],
+                                    },
+                                ]
+                            },
+                            "description": "Natural language queries, either as strings "
+                            "or objects with a query and optional response_format",
+                        },
+                        "response_format": {
+                            "type": "string",
+                            "enum": ["table", "natural", "both"],
+                            "default": "both",
+                            "description": "Default response format for queries that "
+                            "do not set their own",
+                        },
+                    },
+                    "required": ["queries"],
+                },
+            )
+        )
+
+        if self.result_store is not None:
+            tools.append(
+                types.Tool(
+                    name="get_result_page",
+                    description="Fetch a page of rows from a large natural_query result "
+                    "that was stored server-side. Large results return a result_handle "
+                    "and page count instead of every row.",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "result_handle": {
+                                "type": "string",
+                                "description": "The result_handle returned by natural_query",
+                            },
+                            "page": {
+                                "type": "integer",
+                                "minimum": 0,
+                                "default": 0,
+                                "description": "Zero-based page number",
+                            },
+                        },
+                        "required": ["result_handle"],
+                    },
+                )
+            )
+
+        if self.config.metrics_enabled:
+            tools.append(
+                types.Tool(
+                    name="server_stats",
+                    description="Get server metrics: tool and upstream latency "
+                    "percentiles, upstream status codes, retries, rate-limit "
+                    "rejections, connection pool, cache and circuit breaker state.",
+                    inputSchema={"type": "object", "properties": {}},
+                )
+            )
+
+        return tools
+
+    async def list_resource_templates(self) -> List[types.ResourceTemplate]:
+        """
+        List resource templates for paged access to stored results.
+        """
+        if self.result_store is None:
+            return []
+
+        return [
+            types.ResourceTemplate(
+                name="natural_query_result",
+                uriTemplate=RESULT_URI_TEMPLATE,
+                description="A page of rows from a large natural_query result stored "
+                "server-side under an opaque handle",
+                mimeType="application/json",
+            )
+        ]
+
+    async def read_resource(self, uri: AnyUrl) -> List[ReadResourceContents]:
+        """
+        Serve a page of rows from a stored result.
+        """
+        if self.result_store is None:
+            raise ValueError("Result handles are not enabled")
+        if not self.api_client.auth_token:
+            raise ValueError("Authentication required")
+
+        handle, page = parse_result_uri(str(uri))
+        client_id = self.api_client.client_id
+        text = self.result_store.get_page(client_id, handle, page)
+        return [ReadResourceContents(content=text, mime_type="application/json")]
+
+    async def run_batch_natural_query(
+        self, queries: List[Any], default_format: str = "both"
+    ) -> List[Tuple[bool, str]]:
+        """
+        Run a batch of natural queries concurrently
+
+        Concurrency is capped by batch_max_concurrency and each query has its own
+        timeout. Every query is charged to the rate limiter separately.
+
+        Returns:
+            One (succeeded, JSON object text) pair per query, in input order
+        """
+        client_id = self.api_client.client_id
+        policy = self._rate_limit_policy(client_id)
+        semaphore = asyncio.Semaphore(self.config.batch_max_concurrency)
+
+        def failure(header: Dict[str, Any], error: str) -> Tuple[bool, str]:
+            return False, json_codec.dumps({**header, "success": False, "error": error})
+
+        async def run_item(index: int, item: Any) -> Tuple[bool, str]:
+            if isinstance(item, str):
+                query, response_format = item, default_format
+            elif isinstance(item, dict):
+                query = item.get("query")
+                response_format = item.get("response_format", default_format)
+            else:
+                query, response_format = None, default_format
+
+            header = {"index": index, "query": query}
+            if not isinstance(query, str) or not query:
+                return failure(header, "Query must be a non-empty string")
+
+            cost = self._tool_cost("batch_natural_query")
+            waited = await self.rate_limiter.acquire(
+                client_id, self.config.rate_limit_max_delay, cost, policy
+            )
+            if waited is None:
+                self.rate_limited.labels("batch_natural_query").inc()
+                return failure(header, "Rate limit exceeded")
+            self.rate_limit_wait.labels("batch_natural_query").observe(waited)
+            self.rate_limit_cost.labels("batch_natural_query").inc(cost)
+
+            try:
+                async with semaphore:
+                    upstream_start = time.perf_counter()
+                    response = await asyncio.wait_for(
+                        self.api_client.natural_query_response(
+                            query,
+                            response_format,
+                            decode=not self.config.response_passthrough,
+                        ),
+                        timeout=self.config.batch_item_timeout,
+                    )
+                    upstream_seconds = time.perf_counter() - upstream_start
+                    if self.config.response_passthrough:
+                        body = response.body
+                        result_text = body.decode("utf-8", errors="replace")
+                        if not json_codec.is_container(body):
+                            # Not JSON: embed the body as a string instead
+                            result_text = json_codec.dumps(result_text)
+                        size = len(body)
+                    else:
+                        result_text = json_codec.dumps(response.result)
+                        size = len(result_text.encode("utf-8"))
+                    if not response.shared:
+                        await self._reconcile_cost(
+                            client_id, "batch_natural_query", size, upstream_seconds
+                        )
+            except asyncio.TimeoutError:
+                return failure(
+                    header, f"Query timed out after {self.config.batch_item_timeout}s"
+                )
+            except httpx.HTTPStatusError as e:
+                return failure(
+                    header, f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+                )
+            except Exception as e:
+                return failure(header, str(e))
+
+            # Splice the upstream JSON in without decoding it
+            text = json_codec.dumps({**header, "success": True})[:-1]
+            return True, f'{text},"result":{result_text}}}'
+
+        return await asyncio.gather(
+            *(run_item(index, item) for index, item in enumerate(queries))
+        )
+
+    async def call_tool(
+        self, name: str, arguments: Dict[str, Any] | None
+    ) -> List[types.TextContent]:
+        """
+        Handle tool calls under a new request ID and root trace span.
+        """
+        with request_context(), self.tracer.span("tool_call", tool=name):
+            return await self._call_tool(name, arguments)
+
+    async def _call_tool(
+        self, name: str, arguments: Dict[str, Any] | None
+    ) -> List[types.TextContent]:
+        """
+        Handle tool calls with security and rate limiting.
+        """
+        if arguments is None:
+            arguments = {}
+
+        start_time = time.perf_counter()
+        self.logger.info("Tool call started: %s", name, extra=SAMPLED)
+        tool_label = name if name in TOOL_NAMES else "unknown"
+        outcome = "ok"
+        self.tools_in_flight.inc()
+
+        try:
+            # Rate limiting (except for auth token setting; batches are charged per query)
+            if (
+                name not in ("set_auth_token", "batch_natural_query", "server_stats")
+                and self.api_client.auth_token
+            ):
+                client_id = self.api_client.client_id
+                cost = self._tool_cost(tool_label)
+                policy = self._rate_limit_policy(client_id)
+                with self.tracer.span("rate_limit"):
+                    waited = await self.rate_limiter.acquire(
+                        client_id, self.config.rate_limit_max_delay, cost, policy
+                    )
+                if waited is None:
+                    outcome = "rate_limited"
+                    self.rate_limited.labels(tool_label).inc()
+                    stats = self.rate_limiter.get_client_stats(client_id)
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text=f"Rate limit exceeded. Requests: {stats['requests']}/{policy.max_requests}. "
+                            f"Reset in {stats['reset_time'] - time.time():.0f}s",
+                        )
+                    ]
+                self.rate_limit_wait.labels(tool_label).observe(waited)
+                self.rate_limit_cost.labels(tool_label).inc(cost)
+
+            if name == "set_auth_token":
+                token = arguments.get("token")
+                if not token:
+                    return [
+                        types.TextContent(
+                            type="text", text="Error: Authentication token is required"
+                        )
+                    ]
+
+                if get_tenant_session() is not None:
+                    # Over HTTP the token belongs to the request, not the process
+                    outcome = "error"
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text="Error: Over HTTP, send the token in the "
+                            "Authorization header of each request instead.",
+                        )
+                    ]
+
+                # Validate and set token
+                self.api_client.set_auth_token(token)
+
+                # Cache the token if validation is enabled
+                if self.config.token_validation_enabled:
+                    self.token_validator.cache_token(token)
+
+                return [
+                    types.TextContent(
+                        type="text",
+                        text="Authentication token set successfully. You can now use other tools to query the Ambivo API.",
+                    )
+                ]
+
+            elif name == "natural_query":
+                if not self.api_client.auth_token:
+                    outcome = "error"
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text="Error: Authentication required. Please use the 'set_auth_token' tool first.",
+                        )
+                    ]
+
+                query = arguments.get("query")
+                if not query:
+                    return [
+                        types.TextContent(
+                            type="text", text="Error: Query parameter is required"
+                        )
+                    ]
+
+                response_format = arguments.get("response_format", "both")
+
+                try:
+                    upstream_start = time.perf_counter()
+                    response = await self.api_client.natural_query_response(
+                        query,
+                        response_format,
+                        decode=not self.config.response_passthrough,
+                    )
+                    upstream_seconds = time.perf_counter() - upstream_start
+                    body, result = response.body, response.result
+                    if self.config.response_passthrough:
+                        # Upstream JSON goes to the client as is, without re-encoding
+                        with self.tracer.span("serialize", passthrough=True):
+                            text = body.decode("utf-8", errors="replace")
+                        size = len(body)
+                    else:
+                        with self.tracer.span("serialize", passthrough=False):
+                            text = json_codec.dumps(result)
+                        size = len(text.encode("utf-8"))
+                    if not response.shared:
+                        # Cache hits and coalesced calls cost no upstream work
+                        await self._reconcile_cost(
+                            self.api_client.client_id, name, size, upstream_seconds
+                        )
+
+                    if (
+                        self.result_store is not None
+                        and size > self.config.result_inline_max_bytes
+                    ):
+                        client_id = self.api_client.client_id
+                        summary = self.result_store.store(
+                            client_id,
+                            (
+                                json_codec.loads(body)
+                                if self.config.response_passthrough
+                                else result
+                            ),
+                        )
+                        if summary is not None:
+                            return [
+                                types.TextContent(
+                                    type="text",
+                                    text="Natural Query Results (large result stored "
+                                    "server-side; fetch rows with the get_result_page tool "
+                                    f"or the {summary['resource_uri']} resource):\n\n"
+                                    f"{json_codec.dumps(summary)}",
+                                )
+                            ]
+
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text=f"Natural Query Results:\n\n{text}",
+                        )
+                    ]
+                except httpx.HTTPStatusError as e:
+                    outcome = "http_error"
+                    error_msg = f"HTTP {e.response.status_code}: {e.response.text}"
+                    return [
+                        types.TextContent(type="text", text=f"API Error: {error_msg}")
+                    ]
+                except Exception as e:
+                    outcome = "error"
+                    return [
+                        types.TextContent(
+                            type="text", text=f"Error executing natural query: {str(e)}"
+                        )
+                    ]
+
+            elif name == "batch_natural_query":
+                if not self.api_client.auth_token:
+                    outcome = "error"
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text="Error: Authentication required. Please use the 'set_auth_token' tool first.",
+                        )
+                    ]
+
+                queries = arguments.get("queries")
+                if not isinstance(queries, list) or not queries:
+                    raise ValueError("queries must be a non-empty list")
+                if len(queries) > self.config.batch_max_queries:
+                    raise ValueError(
+                        f"Too many queries. Maximum per batch: {self.config.batch_max_queries}"
+                    )
+
+                results = await self.run_batch_natural_query(
+                    queries, arguments.get("response_format", "both")
+                )
+                succeeded = sum(1 for ok, _ in results if ok)
+                items = ",".join(text for _, text in results)
+                return [
+                    types.TextContent(
+                        type="text",
+                        text=f"Batch Natural Query Results ({succeeded}/{len(results)} "
+                        f"succeeded):\n\n[{items}]",
+                    )
+                ]
+
+            elif name == "get_result_page" and self.result_store is not None:
+                if not self.api_client.auth_token:
+                    outcome = "error"
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text="Error: Authentication required. Please use the 'set_auth_token' tool first.",
+                        )
+                    ]
+
+                handle = arguments.get("result_handle")
+                if not handle:
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text="Error: result_handle parameter is required",
+                        )
+                    ]
+
+                page = arguments.get("page", 0)
+                if not isinstance(page, int):
+                    raise ValueError("Page must be an integer")
+
+                client_id = self.api_client.client_id
+                try:
+                    text = self.result_store.get_page(client_id, handle, page)
+                except ResultNotFoundError as e:
+                    outcome = "error"
+                    return [types.TextContent(type="text", text=f"Error: {e}")]
+                return [types.TextContent(type="text", text=text)]
+
+            elif name == "server_stats" and self.config.metrics_enabled:
+                stats = self.metrics.snapshot()
+                tenant = get_tenant_session()
+                if tenant is not None and "rate_limit_usage" in stats:
+                    # Over HTTP a tenant sees its own usage, not other tenants'
+                    stats["rate_limit_usage"] = {
+                        "client_id": tenant.client_id,
+                        **self.rate_limiter.usage.get_client_stats(tenant.client_id),
+                    }
+                if tenant is not None and "transfer" in stats:
+                    stats["transfer"] = {
+                        "client_id": tenant.client_id,
+                        **self.api_client.transfer_stats.get_stats(tenant.client_id),
+                    }
+                if self.result_store is not None:
+                    stats["result_store"] = self.result_store.get_stats()
+                return [
+                    types.TextContent(
+                        type="text", text=f"Server Stats:\n\n{json_codec.dumps(stats)}"
+                    )
+                ]
+
+            else:
+                outcome = "error"
+                return [types.TextContent(type="text", text=f"Unknown tool: {name}")]
+
+        except ValueError as e:
+            # Input validation errors
+            outcome = "validation_error"
+            self.logger.warning(f"Validation error in tool {name}: {e}")
+            return [types.TextContent(type="text", text=f"Validation Error: {str(e)}")]
+
+        except httpx.HTTPStatusError as e:
+            # HTTP errors from API
+            outcome = "http_error"
+            self.logger.error(f"HTTP error in tool {name}: {e.response.status_code}")
+            error_msg = f"API Error (HTTP {e.response.status_code})"
+            try:
+                error_detail = e.response.json()
+                if "error_code" in error_detail:
+                    error_msg += f": {error_detail['error_code']}"
+            except:
+                error_msg += f": {e.response.text[:200]}"
+
+            return [types.TextContent(type="text", text=error_msg)]
+
+        except Exception as e:
+            # Unexpected errors
+            outcome = "error"
+            self.logger.exception(f"Unexpected error in tool {name}")
+            return [types.TextContent(type="text", text=f"Unexpected error: {str(e)}")]
+
+        finally:
+            elapsed_time = time.perf_counter() - start_time
+            self.tools_in_flight.dec()
+            self.tool_duration.labels(tool_label, outcome).observe(elapsed_time)
+            self.logger.info(
+                "Tool call completed: %s in %.2fs", name, elapsed_time, extra=SAMPLED
+            )
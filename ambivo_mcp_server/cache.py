@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Response caching for Ambivo MCP Server
+"""
+
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("ambivo-mcp.cache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class CacheEntry:
+    """Cached response entry"""
+
+    value: bytes
+    size: int
+    expires_at: float
+    compressed: bool = False
+
+
+class ResponseCache:
+    """
+    Tenant-isolated TTL + LRU cache bounded by total bytes
+
+    Entries are keyed by (client_id, normalized query, response_format), so a
+    cached result can only ever be served back to the tenant that produced it.
+    Values are the raw upstream response bodies, optionally zlib-compressed.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl: float = 300,
+        compress: bool = False,
+        compress_min_size: int = 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.compress_min_size = compress_min_size
+        self.entries: "OrderedDict[Tuple[str, str, str], CacheEntry]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a query so trivially different spellings share an entry"""
+        return _WHITESPACE.sub(" ", query).strip()
+
+    def make_key(
+        self, client_id: str, query: str, response_format: str
+    ) -> Tuple[str, str, str]:
+        """Build the tenant-scoped cache key"""
+        return (client_id, self.normalize_query(query), response_format)
+
+    def get(self, client_id: str, query: str, response_format: str) -> Optional[bytes]:
+        """Get a cached response body, or None on miss or expiry"""
+        key = self.make_key(client_id, query, response_format)
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return zlib.decompress(entry.value) if entry.compressed else entry.value
+
+    def set(
+        self, client_id: str, query: str, response_format: str, value: bytes
+    ) -> bool:
+        """
+        Cache a response body
+
+        Returns:
+            True if the value was stored, False if it exceeds the byte budget
+        """
+        compressed = False
+        if self.compress and len(value) >= self.compress_min_size:
+            packed = zlib.compress(value, 6)
+            if len(packed) < len(value):
+                value = packed
+                compressed = True
+
+        size = len(value)
+        if size > self.max_bytes:
+            self.rejections += 1
+            logger.debug(f"Response of {size} bytes exceeds cache budget, skipping")
+            return False
+
+        key = self.make_key(client_id, query, response_format)
+        if key in self.entries:
+            self._remove(key)
+
+        self.entries[key] = CacheEntry(
+            value=value,
+            size=size,
+            expires_at=time.monotonic() + self.ttl,
+            compressed=compressed,
+        )
+        self.total_bytes += size
+        self._evict()
+        return True
+
+    def invalidate(self, client_id: Optional[str] = None) -> int:
+        """Drop all entries, or only those belonging to one tenant"""
+        if client_id is None:
+            removed = len(self.entries)
+            self.entries.clear()
+            self.total_bytes = 0
+            return removed
+
+        keys = [key for key in self.entries if key[0] == client_id]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: Tuple[str, str, str]) -> None:
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry.size
+
+    def _evict(self) -> None:
+        """Evict expired entries first, then least recently used, to fit budget"""
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        now = time.monotonic()
+        for key in [k for k, e in self.entries.items() if e.expires_at <= now]:
+            self._remove(key)
+            self.expirations += 1
+
+        while self.total_bytes > self.max_bytes:
+            key = next(iter(self.entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejections": self.rejections,
+        }
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for the Ambivo upstream API
+"""
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("ambivo-mcp.circuit")
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the circuit is open"""
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(
+            f"Ambivo API is unavailable (circuit open), retry in {retry_in:.0f}s"
+        )
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker over a rolling window
+
+    The circuit trips when either `failure_threshold` consecutive failures
+    occur, or the error rate over the last `window_seconds` reaches
+    `error_rate_threshold` with at least `min_requests` outcomes. While open
+    every request fails fast. After `open_seconds` the circuit goes half-open
+    and lets up to `half_open_max_probes` requests through; all of them must
+    succeed to close it again, and any failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        window_seconds: float = 60.0,
+        min_requests: int = 10,
+        open_seconds: float = 30.0,
+        half_open_max_probes: int = 1,
+        on_state_change: Optional[Callable[[CircuitState, CircuitState], None]] = None,
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_max_probes = half_open_max_probes
+        self.on_state_change = on_state_change
+
+        self._state = CircuitState.CLOSED
+        self.outcomes: deque = deque()  # (timestamp, failed) pairs
+        self.window_failures = 0
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.rejected = 0
+        self.transitions: Dict[str, int] = {state.value: 0 for state in CircuitState}
+
+    @classmethod
+    def from_config(cls, config, **kwargs) -> "CircuitBreaker":
+        """Create a circuit breaker from ServerConfig"""
+        return cls(
+            failure_threshold=config.circuit_failure_threshold,
+            error_rate_threshold=config.circuit_error_rate_threshold,
+            window_seconds=config.circuit_window_seconds,
+            min_requests=config.circuit_min_requests,
+            open_seconds=config.circuit_open_seconds,
+            half_open_max_probes=config.circuit_half_open_probes,
+            **kwargs,
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the open period ends"""
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self.opened_at >= self.open_seconds
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def before_request(self) -> None:
+        """
+        Admit or reject a request
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                probe slots in use
+        """
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+
+        if (
+            state == CircuitState.HALF_OPEN
+            and self.probes_in_flight < self.half_open_max_probes
+        ):
+            self.probes_in_flight += 1
+            return
+
+        self.rejected += 1
+        retry_in = max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+        raise CircuitOpenError(retry_in)
+
+    def record_success(self) -> None:
+        """Record a successful upstream request"""
+        self.consecutive_failures = 0
+        if self._state == CircuitState.HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+            self.probe_successes += 1
+            if self.probe_successes >= self.half_open_max_probes:
+                self._transition(CircuitState.CLOSED)
+            return
+        self._add_outcome(failed=False)
+
+    def record_failure(self) -> None:
+        """Record a failed upstream request"""
+        self.consecutive_failures += 1
+        if self._state == CircuitState.HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+            self._transition(CircuitState.OPEN)
+            return
+        self._add_outcome(failed=True)
+
+        if self._state == CircuitState.CLOSED and self._should_trip():
+            self._transition(CircuitState.OPEN)
+
+    def release_probe(self) -> None:
+        """Release a half-open probe slot for a request that ended without an outcome"""
+        if self._state == CircuitState.HALF_OPEN:
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def _add_outcome(self, failed: bool) -> None:
+        now = time.monotonic()
+        self.outcomes.append((now, failed))
+        self.window_failures += failed
+
+        cutoff = now - self.window_seconds
+        while self.outcomes and self.outcomes[0][0] < cutoff:
+            _, old_failed = self.outcomes.popleft()
+            self.window_failures -= old_failed
+
+    def _should_trip(self) -> bool:
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        total = len(self.outcomes)
+        return (
+            total >= self.min_requests
+            and self.window_failures / total >= self.error_rate_threshold
+        )
+
+    def _transition(self, new_state: CircuitState) -> None:
+        old_state = self._state
+        if old_state == new_state:
+            return
+
+        self._state = new_state
+        self.transitions[new_state.value] += 1
+        if new_state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+            logger.warning(
+                f"Circuit opened after {self.consecutive_failures} consecutive "
+                f"failures ({self.window_failures}/{len(self.outcomes)} in window), "
+                f"failing fast for {self.open_seconds:.0f}s"
+            )
+        else:
+            logger.info(
+                f"Circuit state changed: {old_state.value} -> {new_state.value}"
+            )
+
+        if new_state == CircuitState.CLOSED:
+            self.outcomes.clear()
+            self.window_failures = 0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+
+        if self.on_state_change is not None:
+            self.on_state_change(old_state, new_state)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker statistics"""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "window_requests": len(self.outcomes),
+            "window_failures": self.window_failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
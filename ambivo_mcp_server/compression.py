@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Transfer compression for upstream Ambivo API requests
+"""
+
+import gzip
+import importlib.util
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("ambivo-mcp.compression")
+
+
+# Optional codecs httpx decodes when one of these packages is installed
+OPTIONAL_DECODER_PACKAGES = {
+    "br": ("brotli", "brotlicffi"),
+    "zstd": ("zstandard",),
+}
+
+
+def available_encodings() -> List[str]:
+    """Content encodings the HTTP client can decode in this environment"""
+    encodings = ["gzip", "deflate"]
+    for name, packages in OPTIONAL_DECODER_PACKAGES.items():
+        if any(importlib.util.find_spec(package) for package in packages):
+            encodings.append(name)
+    return encodings
+
+
+def accept_encoding_header(preferred: Iterable[str]) -> str:
+    """
+    Build an explicit Accept-Encoding header
+
+    Args:
+        preferred: Encodings in order of preference, e.g. ["zstd", "br", "gzip"]
+
+    Returns:
+        Header value listing the preferred encodings that can be decoded,
+        always including gzip
+    """
+    supported = set(available_encodings())
+    encodings = [name for name in preferred if name in supported]
+    if "gzip" not in encodings:
+        encodings.append("gzip")
+    return ", ".join(encodings)
+
+
+def compress_body(body: bytes, min_bytes: int) -> Tuple[bytes, Optional[str]]:
+    """
+    Gzip a request body when it is large enough to be worth it
+
+    Args:
+        body: Encoded request body
+        min_bytes: Smallest body to compress; 0 disables request compression
+
+    Returns:
+        Tuple of (body to send, Content-Encoding value or None)
+    """
+    if min_bytes <= 0 or len(body) < min_bytes:
+        return body, None
+
+    compressed = gzip.compress(body, compresslevel=6)
+    if len(compressed) >= len(body):
+        return body, None
+    return compressed, "gzip"
+
+
+@dataclass
+class TransferCounters:
+    """Per-tenant transfer byte counters"""
+
+    requests: int = 0
+    sent_bytes: int = 0  # request bytes before compression
+    sent_wire_bytes: int = 0  # request bytes on the wire
+    received_bytes: int = 0  # response bytes after decompression
+    received_wire_bytes: int = 0  # response bytes on the wire
+
+
+class TransferStats:
+    """Compressed vs decompressed byte counters per tenant, LRU-bounded"""
+
+    def __init__(self, max_tenants: int = 1000):
+        self.max_tenants = max_tenants
+        self.tenants: "OrderedDict[str, TransferCounters]" = OrderedDict()
+        self.total = TransferCounters()
+
+    def record(
+        self,
+        client_id: Optional[str],
+        sent_bytes: int,
+        sent_wire_bytes: int,
+        received_bytes: int,
+        received_wire_bytes: int,
+    ) -> None:
+        """Record the byte counts of one upstream exchange"""
+        counters = [self.total]
+        if client_id is not None:
+            tenant = self.tenants.get(client_id)
+            if tenant is None:
+                tenant = self.tenants[client_id] = TransferCounters()
+                if len(self.tenants) > self.max_tenants:
+                    self.tenants.popitem(last=False)
+            else:
+                self.tenants.move_to_end(client_id)
+            counters.append(tenant)
+
+        for counter in counters:
+            counter.requests += 1
+            counter.sent_bytes += sent_bytes
+            counter.sent_wire_bytes += sent_wire_bytes
+            counter.received_bytes += received_bytes
+            counter.received_wire_bytes += received_wire_bytes
+
+    @staticmethod
+    def _summarize(counters: TransferCounters) -> Dict[str, Any]:
+        received_ratio = (
+            counters.received_wire_bytes / counters.received_bytes
+            if counters.received_bytes
+            else 1.0
+        )
+        return {
+            "requests": counters.requests,
+            "sent_bytes": counters.sent_bytes,
+            "sent_wire_bytes": counters.sent_wire_bytes,
+            "received_bytes": counters.received_bytes,
+            "received_wire_bytes": counters.received_wire_bytes,
+            "received_compression_ratio": round(received_ratio, 3),
+        }
+
+    def get_stats(self, client_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get totals, or the counters of one tenant"""
+        if client_id is None:
+            return {**self._summarize(self.total), "tenants": len(self.tenants)}
+        counters = self.tenants.get(client_id)
+        return self._summarize(counters or TransferCounters())
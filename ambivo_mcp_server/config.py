@@ -11,6 +11,24 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 
+def _optional_float(name: str) -> Optional[float]:
+    """Read an optional float from an environment variable"""
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+def _float_map(name: str) -> Dict[str, float]:
+    """Read `key=value,...` pairs with float values from an environment variable"""
+    pairs = (item.split("=", 1) for item in os.getenv(name, "").split(",") if item)
+    return {key.strip(): float(value) for key, value in pairs}
+
+
+def _str_map(name: str) -> Dict[str, str]:
+    """Read `key=value,...` pairs from an environment variable"""
+    pairs = (item.split("=", 1) for item in os.getenv(name, "").split(",") if item)
+    return {key.strip(): value.strip() for key, value in pairs}
+
+
 @dataclass
 class ServerConfig:
     """Server configuration settings"""
@@ -20,9 +38,117 @@ class ServerConfig:
     timeout: float = 30.0
     max_retries: int = 3
 
+    # Connection Pool Configuration
+    pool_max_connections: int = 100
+    pool_max_keepalive_connections: int = 20
+    pool_keepalive_expiry: float = 30.0  # seconds
+    connect_timeout: Optional[float] = None  # Falls back to timeout
+    read_timeout: Optional[float] = None  # Falls back to timeout
+    write_timeout: Optional[float] = None  # Falls back to timeout
+    pool_timeout: Optional[float] = None  # Falls back to timeout
+    http2_enabled: bool = False  # Requires the optional h2 package
+
+    # Compression Configuration
+    accept_encodings: list = field(
+        default_factory=lambda: ["zstd", "br", "gzip"]
+    )  # in order of preference; codecs that are not installed are skipped
+    request_compression_min_bytes: int = 0  # gzip larger request bodies; 0 = off
+
+    # Retry Configuration
+    retry_backoff_base: float = 0.5  # seconds, doubled per attempt
+    retry_backoff_max: float = 10.0  # cap before full jitter is applied
+    retry_statuses: list = field(default_factory=lambda: [429, 502, 503, 504])
+    retry_after_max: float = 30.0  # longer Retry-After values are not retried
+    retry_budget_ratio: float = 0.2  # retries earned per successful request
+    retry_budget_min_per_second: float = 1.0
+    retry_budget_max_tokens: float = 10.0
+
+    # Circuit Breaker Configuration
+    circuit_breaker_enabled: bool = True
+    circuit_failure_threshold: int = 5  # consecutive failures that trip
+    circuit_error_rate_threshold: float = 0.5  # error rate over the window
+    circuit_window_seconds: float = 60.0
+    circuit_min_requests: int = 10  # outcomes needed before the rate applies
+    circuit_open_seconds: float = 30.0  # fail-fast period before probing
+    circuit_half_open_probes: int = 1
+
+    # Streaming Configuration
+    stream_responses: bool = False  # Enforces max_payload_size on responses
+    response_passthrough: bool = True  # Send upstream JSON to clients unparsed
+
+    # Result Handle Configuration
+    result_handles_enabled: bool = False
+    result_inline_max_bytes: int = 65536  # larger results are stored
+    result_page_size: int = 100  # rows per page
+    result_ttl: int = 900  # 15 minutes
+    result_tenant_quota_bytes: int = 67108864  # 64MB per tenant
+    result_spill_bytes: int = 1048576  # larger results are memory-mapped
+
+    # Batch Query Configuration
+    batch_max_queries: int = 10
+    batch_max_concurrency: int = 4
+    batch_item_timeout: float = 60.0  # seconds per query
+
+    # Response Cache Configuration
+    response_cache_enabled: bool = False
+    response_cache_ttl: int = 300  # 5 minutes
+    response_cache_max_bytes: int = 16777216  # 16MB
+    response_cache_compress: bool = False
+    single_flight_enabled: bool = True  # Coalesce identical in-flight queries
+
+    # Transport Configuration
+    transport: str = "stdio"  # "stdio", or "http" for multi-tenant serving
+    http_host: str = "127.0.0.1"
+    http_port: int = 8080
+    http_json_response: bool = False  # JSON instead of SSE streamed /mcp replies
+    workers: int = 1  # HTTP worker processes; more than 1 pre-forks
+    worker_max_requests: int = 0  # recycle a worker after this many, 0 = never
+    worker_max_rss_mb: float = 0.0  # recycle a worker above this RSS, 0 = never
+    worker_metrics_interval: float = 5.0  # seconds between metrics exports
+    worker_reuse_port: bool = True  # per-worker SO_REUSEPORT sockets if available
+    tenant_max_sessions: int = 10000  # least recently used tenants are evicted
+    tenant_idle_ttl: float = 1800.0  # seconds before an idle tenant is dropped
+
+    # Metrics Configuration
+    metrics_enabled: bool = True  # Expose the server_stats tool
+    metrics_host: str = "127.0.0.1"
+    metrics_port: Optional[int] = None  # Serve /metrics in stdio mode
+
+    # Tracing Configuration
+    trace_file: Optional[str] = None  # JSONL span output; tracing is off if unset
+
     # Security Configuration
     rate_limit_requests: int = 100
     rate_limit_window: int = 3600  # 1 hour in seconds
+    # "sliding_log" (exact), "sliding_window" or "gcra" (constant memory), or
+    # "token_bucket", which lets calls wait up to rate_limit_max_delay
+    rate_limit_algorithm: str = "sliding_log"
+    rate_limit_burst: Optional[int] = None  # token bucket size, default the limit
+    rate_limit_max_delay: float = 0.0  # seconds a call may wait for a permit
+    rate_limit_sweep_interval: float = 60.0  # seconds between idle sweeps
+    # Requests of the limit a call costs by tool, 1 if unset (per query for
+    # batch_natural_query); reconciled after the call from the per-MB and
+    # per-upstream-second costs, so heavy calls are charged more
+    rate_limit_tool_weights: dict = field(default_factory=dict)
+    rate_limit_cost_per_mb: float = 0.0
+    rate_limit_cost_per_second: float = 0.0
+    # "local" (per process), or "sqlite"/"redis" to share limits across workers
+    rate_limit_backend: str = "local"
+    rate_limit_sqlite_path: Optional[str] = None
+    rate_limit_redis_url: Optional[str] = None  # e.g. redis://:password@host:6379/0
+    rate_limit_lease_size: int = 10  # permits taken from the backend at once
+    rate_limit_backend_timeout: float = 0.1  # seconds
+    # Per-tenant limits: tiers as {"name": {"requests", "window", "burst"}},
+    # assigned by client ID or rate_limit_tier_claim value (or a claim value
+    # naming the tier); the tiers file is reloaded when it changes
+    rate_limit_tiers: dict = field(default_factory=dict)
+    rate_limit_tenant_tiers: dict = field(default_factory=dict)
+    rate_limit_tier_claim: Optional[str] = None
+    rate_limit_tiers_file: Optional[str] = None
+    # Heavy hitters reported by server_stats, in fixed memory; 0 disables
+    rate_limit_top_clients: int = 20
+    rate_limit_sketch_width: int = 2048  # count-min sketch counters per row
+    rate_limit_usage_period: float = 3600.0  # seconds before counts reset
     max_query_length: int = 1000
     max_payload_size: int = 1048576  # 1MB in bytes
     allowed_entity_types: list = field(
@@ -44,6 +170,8 @@ class ServerConfig:
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     log_file: Optional[str] = None
+    log_queue_enabled: bool = False  # Write log records from a background thread
+    log_sample_rate: float = 0.0  # Per-call INFO lines per second, 0 = log all
 
     # Server Configuration
     server_name: str = "ambivo-mcp-server"
@@ -52,6 +180,7 @@ class ServerConfig:
     # Token Configuration
     token_validation_enabled: bool = True
     token_cache_ttl: int = 14400  # 4 hours
+    token_cache_max_size: int = 10000  # validated tokens
     auth_token: Optional[str] = None  # Optional default auth token
 
     @classmethod
@@ -61,12 +190,227 @@ class ServerConfig:
             base_url=os.getenv("AMBIVO_BASE_URL", "https://goferapi.ambivo.com"),
             timeout=float(os.getenv("AMBIVO_TIMEOUT", cls.timeout)),
             max_retries=int(os.getenv("AMBIVO_MAX_RETRIES", cls.max_retries)),
+            pool_max_connections=int(
+                os.getenv("AMBIVO_POOL_MAX_CONNECTIONS", cls.pool_max_connections)
+            ),
+            pool_max_keepalive_connections=int(
+                os.getenv(
+                    "AMBIVO_POOL_MAX_KEEPALIVE_CONNECTIONS",
+                    cls.pool_max_keepalive_connections,
+                )
+            ),
+            pool_keepalive_expiry=float(
+                os.getenv("AMBIVO_POOL_KEEPALIVE_EXPIRY", cls.pool_keepalive_expiry)
+            ),
+            connect_timeout=_optional_float("AMBIVO_CONNECT_TIMEOUT"),
+            read_timeout=_optional_float("AMBIVO_READ_TIMEOUT"),
+            write_timeout=_optional_float("AMBIVO_WRITE_TIMEOUT"),
+            pool_timeout=_optional_float("AMBIVO_POOL_TIMEOUT"),
+            http2_enabled=os.getenv("AMBIVO_HTTP2", "false").lower() == "true",
+            accept_encodings=[
+                name.strip()
+                for name in os.getenv("AMBIVO_ACCEPT_ENCODINGS", "zstd,br,gzip").split(
+                    ","
+                )
+                if name.strip()
+            ],
+            request_compression_min_bytes=int(
+                os.getenv(
+                    "AMBIVO_REQUEST_COMPRESSION_MIN_BYTES",
+                    cls.request_compression_min_bytes,
+                )
+            ),
+            retry_backoff_base=float(
+                os.getenv("AMBIVO_RETRY_BACKOFF_BASE", cls.retry_backoff_base)
+            ),
+            retry_backoff_max=float(
+                os.getenv("AMBIVO_RETRY_BACKOFF_MAX", cls.retry_backoff_max)
+            ),
+            retry_statuses=[
+                int(code)
+                for code in os.getenv("AMBIVO_RETRY_STATUSES", "429,502,503,504").split(
+                    ","
+                )
+                if code.strip()
+            ],
+            retry_after_max=float(
+                os.getenv("AMBIVO_RETRY_AFTER_MAX", cls.retry_after_max)
+            ),
+            retry_budget_ratio=float(
+                os.getenv("AMBIVO_RETRY_BUDGET_RATIO", cls.retry_budget_ratio)
+            ),
+            retry_budget_min_per_second=float(
+                os.getenv(
+                    "AMBIVO_RETRY_BUDGET_MIN_PER_SECOND",
+                    cls.retry_budget_min_per_second,
+                )
+            ),
+            retry_budget_max_tokens=float(
+                os.getenv("AMBIVO_RETRY_BUDGET_MAX_TOKENS", cls.retry_budget_max_tokens)
+            ),
+            stream_responses=os.getenv("AMBIVO_STREAM_RESPONSES", "false").lower()
+            == "true",
+            response_passthrough=os.getenv(
+                "AMBIVO_RESPONSE_PASSTHROUGH", "true"
+            ).lower()
+            == "true",
+            result_handles_enabled=os.getenv("AMBIVO_RESULT_HANDLES", "false").lower()
+            == "true",
+            result_inline_max_bytes=int(
+                os.getenv("AMBIVO_RESULT_INLINE_MAX_BYTES", cls.result_inline_max_bytes)
+            ),
+            result_page_size=int(
+                os.getenv("AMBIVO_RESULT_PAGE_SIZE", cls.result_page_size)
+            ),
+            result_ttl=int(os.getenv("AMBIVO_RESULT_TTL", cls.result_ttl)),
+            result_tenant_quota_bytes=int(
+                os.getenv(
+                    "AMBIVO_RESULT_TENANT_QUOTA_BYTES", cls.result_tenant_quota_bytes
+                )
+            ),
+            result_spill_bytes=int(
+                os.getenv("AMBIVO_RESULT_SPILL_BYTES", cls.result_spill_bytes)
+            ),
+            batch_max_queries=int(
+                os.getenv("AMBIVO_BATCH_MAX_QUERIES", cls.batch_max_queries)
+            ),
+            batch_max_concurrency=int(
+                os.getenv("AMBIVO_BATCH_MAX_CONCURRENCY", cls.batch_max_concurrency)
+            ),
+            batch_item_timeout=float(
+                os.getenv("AMBIVO_BATCH_ITEM_TIMEOUT", cls.batch_item_timeout)
+            ),
+            transport=os.getenv("AMBIVO_TRANSPORT", cls.transport).lower(),
+            http_host=os.getenv("AMBIVO_HTTP_HOST", cls.http_host),
+            http_port=int(os.getenv("AMBIVO_HTTP_PORT", cls.http_port)),
+            http_json_response=os.getenv("AMBIVO_HTTP_JSON_RESPONSE", "false").lower()
+            == "true",
+            workers=int(os.getenv("AMBIVO_WORKERS", cls.workers)),
+            worker_max_requests=int(
+                os.getenv("AMBIVO_WORKER_MAX_REQUESTS", cls.worker_max_requests)
+            ),
+            worker_max_rss_mb=float(
+                os.getenv("AMBIVO_WORKER_MAX_RSS_MB", cls.worker_max_rss_mb)
+            ),
+            worker_metrics_interval=float(
+                os.getenv("AMBIVO_WORKER_METRICS_INTERVAL", cls.worker_metrics_interval)
+            ),
+            worker_reuse_port=os.getenv("AMBIVO_WORKER_REUSE_PORT", "true").lower()
+            == "true",
+            tenant_max_sessions=int(
+                os.getenv("AMBIVO_TENANT_MAX_SESSIONS", cls.tenant_max_sessions)
+            ),
+            tenant_idle_ttl=float(
+                os.getenv("AMBIVO_TENANT_IDLE_TTL", cls.tenant_idle_ttl)
+            ),
+            metrics_enabled=os.getenv("AMBIVO_METRICS", "true").lower() == "true",
+            metrics_host=os.getenv("AMBIVO_METRICS_HOST", cls.metrics_host),
+            metrics_port=(
+                int(os.environ["AMBIVO_METRICS_PORT"])
+                if os.getenv("AMBIVO_METRICS_PORT")
+                else None
+            ),
+            trace_file=os.getenv("AMBIVO_TRACE_FILE"),
+            response_cache_enabled=os.getenv("AMBIVO_RESPONSE_CACHE", "false").lower()
+            == "true",
+            response_cache_ttl=int(
+                os.getenv("AMBIVO_RESPONSE_CACHE_TTL", cls.response_cache_ttl)
+            ),
+            response_cache_max_bytes=int(
+                os.getenv(
+                    "AMBIVO_RESPONSE_CACHE_MAX_BYTES", cls.response_cache_max_bytes
+                )
+            ),
+            response_cache_compress=os.getenv(
+                "AMBIVO_RESPONSE_CACHE_COMPRESS", "false"
+            ).lower()
+            == "true",
+            single_flight_enabled=os.getenv("AMBIVO_SINGLE_FLIGHT", "true").lower()
+            == "true",
+            circuit_breaker_enabled=os.getenv("AMBIVO_CIRCUIT_BREAKER", "true").lower()
+            == "true",
+            circuit_failure_threshold=int(
+                os.getenv(
+                    "AMBIVO_CIRCUIT_FAILURE_THRESHOLD", cls.circuit_failure_threshold
+                )
+            ),
+            circuit_error_rate_threshold=float(
+                os.getenv(
+                    "AMBIVO_CIRCUIT_ERROR_RATE_THRESHOLD",
+                    cls.circuit_error_rate_threshold,
+                )
+            ),
+            circuit_window_seconds=float(
+                os.getenv("AMBIVO_CIRCUIT_WINDOW_SECONDS", cls.circuit_window_seconds)
+            ),
+            circuit_min_requests=int(
+                os.getenv("AMBIVO_CIRCUIT_MIN_REQUESTS", cls.circuit_min_requests)
+            ),
+            circuit_open_seconds=float(
+                os.getenv("AMBIVO_CIRCUIT_OPEN_SECONDS", cls.circuit_open_seconds)
+            ),
+            circuit_half_open_probes=int(
+                os.getenv(
+                    "AMBIVO_CIRCUIT_HALF_OPEN_PROBES", cls.circuit_half_open_probes
+                )
+            ),
             rate_limit_requests=int(
                 os.getenv("AMBIVO_RATE_LIMIT_REQUESTS", cls.rate_limit_requests)
             ),
             rate_limit_window=int(
                 os.getenv("AMBIVO_RATE_LIMIT_WINDOW", cls.rate_limit_window)
             ),
+            rate_limit_algorithm=os.getenv(
+                "AMBIVO_RATE_LIMIT_ALGORITHM", cls.rate_limit_algorithm
+            ).lower(),
+            rate_limit_burst=(
+                int(os.environ["AMBIVO_RATE_LIMIT_BURST"])
+                if os.getenv("AMBIVO_RATE_LIMIT_BURST")
+                else None
+            ),
+            rate_limit_max_delay=float(
+                os.getenv("AMBIVO_RATE_LIMIT_MAX_DELAY", cls.rate_limit_max_delay)
+            ),
+            rate_limit_sweep_interval=float(
+                os.getenv(
+                    "AMBIVO_RATE_LIMIT_SWEEP_INTERVAL", cls.rate_limit_sweep_interval
+                )
+            ),
+            rate_limit_tool_weights=_float_map("AMBIVO_RATE_LIMIT_TOOL_WEIGHTS"),
+            rate_limit_cost_per_mb=float(
+                os.getenv("AMBIVO_RATE_LIMIT_COST_PER_MB", cls.rate_limit_cost_per_mb)
+            ),
+            rate_limit_cost_per_second=float(
+                os.getenv(
+                    "AMBIVO_RATE_LIMIT_COST_PER_SECOND", cls.rate_limit_cost_per_second
+                )
+            ),
+            rate_limit_backend=os.getenv(
+                "AMBIVO_RATE_LIMIT_BACKEND", cls.rate_limit_backend
+            ).lower(),
+            rate_limit_sqlite_path=os.getenv("AMBIVO_RATE_LIMIT_SQLITE_PATH"),
+            rate_limit_redis_url=os.getenv("AMBIVO_RATE_LIMIT_REDIS_URL"),
+            rate_limit_lease_size=int(
+                os.getenv("AMBIVO_RATE_LIMIT_LEASE_SIZE", cls.rate_limit_lease_size)
+            ),
+            rate_limit_backend_timeout=float(
+                os.getenv(
+                    "AMBIVO_RATE_LIMIT_BACKEND_TIMEOUT", cls.rate_limit_backend_timeout
+                )
+            ),
+            rate_limit_tiers=json.loads(os.getenv("AMBIVO_RATE_LIMIT_TIERS", "{}")),
+            rate_limit_tenant_tiers=_str_map("AMBIVO_RATE_LIMIT_TENANT_TIERS"),
+            rate_limit_tier_claim=os.getenv("AMBIVO_RATE_LIMIT_TIER_CLAIM"),
+            rate_limit_tiers_file=os.getenv("AMBIVO_RATE_LIMIT_TIERS_FILE"),
+            rate_limit_top_clients=int(
+                os.getenv("AMBIVO_RATE_LIMIT_TOP_CLIENTS", cls.rate_limit_top_clients)
+            ),
+            rate_limit_sketch_width=int(
+                os.getenv("AMBIVO_RATE_LIMIT_SKETCH_WIDTH", cls.rate_limit_sketch_width)
+            ),
+            rate_limit_usage_period=float(
+                os.getenv("AMBIVO_RATE_LIMIT_USAGE_PERIOD", cls.rate_limit_usage_period)
+            ),
             max_query_length=int(
                 os.getenv("AMBIVO_MAX_QUERY_LENGTH", cls.max_query_length)
             ),
@@ -75,6 +419,10 @@ class ServerConfig:
             ),
             log_level=os.getenv("AMBIVO_LOG_LEVEL", cls.log_level),
             log_file=os.getenv("AMBIVO_LOG_FILE"),
+            log_queue_enabled=os.getenv("AMBIVO_LOG_QUEUE", "false").lower() == "true",
+            log_sample_rate=float(
+                os.getenv("AMBIVO_LOG_SAMPLE_RATE", cls.log_sample_rate)
+            ),
             server_name=os.getenv("AMBIVO_SERVER_NAME", cls.server_name),
             server_version=os.getenv("AMBIVO_SERVER_VERSION", cls.server_version),
             token_validation_enabled=os.getenv(
@@ -84,6 +432,9 @@ class ServerConfig:
             token_cache_ttl=int(
                 os.getenv("AMBIVO_TOKEN_CACHE_TTL", cls.token_cache_ttl)
             ),
+            token_cache_max_size=int(
+                os.getenv("AMBIVO_TOKEN_CACHE_MAX_SIZE", cls.token_cache_max_size)
+            ),
             auth_token=os.getenv("AMBIVO_AUTH_TOKEN"),
         )
 
@@ -101,6 +452,13 @@ class ServerConfig:
 
     def setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
+        from logging.handlers import QueueHandler
+
+        try:
+            from .logging_pipeline import SamplingFilter, start_queue_logging
+        except ImportError:
+            from logging_pipeline import SamplingFilter, start_queue_logging
+
         # Configure root logger
         logging.basicConfig(
             level=getattr(logging, self.log_level.upper()),
@@ -113,12 +471,33 @@ class ServerConfig:
         logger.setLevel(getattr(logging, self.log_level.upper()))
 
         # Add console handler if logging to file
+        console_handler = None
         if self.log_file:
             console_handler = logging.StreamHandler()
             console_handler.setLevel(logging.INFO)
             console_formatter = logging.Formatter(self.log_format)
             console_handler.setFormatter(console_formatter)
-            logger.addHandler(console_handler)
+            console_handler.addFilter(logging.Filter("ambivo-mcp"))
+
+        root = logging.getLogger()
+        if self.log_queue_enabled:
+            # File and console writes move to a listener thread
+            handlers = [h for h in root.handlers if not isinstance(h, QueueHandler)]
+            if console_handler:
+                handlers.append(console_handler)
+            entry_handlers = [start_queue_logging(handlers, root)]
+        else:
+            if console_handler:
+                logger.addHandler(console_handler)
+            entry_handlers = root.handlers + (
+                [console_handler] if console_handler else []
+            )
+
+        # Sample before records are formatted or queued
+        if self.log_sample_rate > 0:
+            sampling_filter = SamplingFilter(self.log_sample_rate)
+            for handler in entry_handlers:
+                handler.addFilter(sampling_filter)
 
         return logger
 
@@ -130,18 +509,161 @@ class ServerConfig:
         if self.max_retries < 0:
             raise ValueError("Max retries must be non-negative")
 
+        if self.retry_backoff_base < 0 or self.retry_backoff_max < 0:
+            raise ValueError("Retry backoff must be non-negative")
+
+        if self.retry_budget_ratio < 0 or self.retry_budget_min_per_second < 0:
+            raise ValueError("Retry budget rates must be non-negative")
+
+        if self.circuit_failure_threshold <= 0 or self.circuit_half_open_probes <= 0:
+            raise ValueError("Circuit breaker thresholds must be positive")
+
+        if not 0 < self.circuit_error_rate_threshold <= 1:
+            raise ValueError("Circuit error rate threshold must be in (0, 1]")
+
+        if self.pool_max_connections <= 0:
+            raise ValueError("Pool max connections must be positive")
+
+        if not 0 <= self.pool_max_keepalive_connections <= self.pool_max_connections:
+            raise ValueError(
+                "Pool max keepalive connections must be between 0 and "
+                "pool max connections"
+            )
+
+        if self.pool_keepalive_expiry < 0:
+            raise ValueError("Pool keepalive expiry must be non-negative")
+
+        for name in (
+            "connect_timeout",
+            "read_timeout",
+            "write_timeout",
+            "pool_timeout",
+        ):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive")
+
+        if self.log_sample_rate < 0:
+            raise ValueError("Log sample rate must be non-negative")
+
+        if self.result_page_size <= 0 or self.result_ttl <= 0:
+            raise ValueError("Result page size and TTL must be positive")
+
+        if (
+            self.batch_max_queries <= 0
+            or self.batch_max_concurrency <= 0
+            or self.batch_item_timeout <= 0
+        ):
+            raise ValueError("Batch limits must be positive")
+
+        if self.transport not in ("stdio", "http"):
+            raise ValueError("Transport must be 'stdio' or 'http'")
+
+        if not 0 < self.http_port < 65536:
+            raise ValueError("HTTP port must be between 1 and 65535")
+
+        if self.workers <= 0 or self.worker_metrics_interval <= 0:
+            raise ValueError("Workers and worker metrics interval must be positive")
+
+        if self.worker_max_requests < 0 or self.worker_max_rss_mb < 0:
+            raise ValueError("Worker recycling limits must be non-negative")
+
+        if self.tenant_max_sessions <= 0 or self.tenant_idle_ttl <= 0:
+            raise ValueError("Tenant session limits must be positive")
+
+        if self.metrics_port is not None and not 0 < self.metrics_port < 65536:
+            raise ValueError("Metrics port must be between 1 and 65535")
+
+        if self.response_cache_ttl <= 0:
+            raise ValueError("Response cache TTL must be positive")
+
+        if self.response_cache_max_bytes <= 0:
+            raise ValueError("Response cache max bytes must be positive")
+
         if self.rate_limit_requests <= 0:
             raise ValueError("Rate limit requests must be positive")
 
         if self.rate_limit_window <= 0:
             raise ValueError("Rate limit window must be positive")
 
+        if self.rate_limit_algorithm not in (
+            "sliding_log",
+            "sliding_window",
+            "gcra",
+            "token_bucket",
+        ):
+            raise ValueError(
+                "Rate limit algorithm must be 'sliding_log', 'sliding_window', "
+                "'gcra' or 'token_bucket'"
+            )
+
+        if self.rate_limit_burst is not None and self.rate_limit_burst <= 0:
+            raise ValueError("Rate limit burst must be positive")
+
+        if self.rate_limit_max_delay < 0:
+            raise ValueError("Rate limit max delay must be non-negative")
+
+        if self.rate_limit_sweep_interval <= 0:
+            raise ValueError("Rate limit sweep interval must be positive")
+
+        if (
+            any(weight < 0 for weight in self.rate_limit_tool_weights.values())
+            or self.rate_limit_cost_per_mb < 0
+            or self.rate_limit_cost_per_second < 0
+        ):
+            raise ValueError("Rate limit costs must be non-negative")
+
+        if self.rate_limit_backend not in ("local", "sqlite", "redis"):
+            raise ValueError("Rate limit backend must be 'local', 'sqlite' or 'redis'")
+
+        if self.rate_limit_backend == "sqlite" and not self.rate_limit_sqlite_path:
+            raise ValueError("The sqlite rate limit backend needs a database path")
+
+        if self.rate_limit_backend == "redis" and not self.rate_limit_redis_url:
+            raise ValueError("The redis rate limit backend needs a Redis URL")
+
+        if self.rate_limit_backend != "local" and (
+            self.rate_limit_algorithm != "sliding_log" or self.rate_limit_max_delay
+        ):
+            # Shared backends always count with the sliding window counter
+            raise ValueError(
+                "Rate limit algorithm and max delay only apply to the local backend"
+            )
+
+        if self.rate_limit_lease_size <= 0 or self.rate_limit_backend_timeout <= 0:
+            raise ValueError(
+                "Rate limit lease size and backend timeout must be positive"
+            )
+
+        for tier, spec in self.rate_limit_tiers.items():
+            if not isinstance(spec, dict) or "requests" not in spec:
+                raise ValueError(f"Rate limit tier {tier!r} needs a requests limit")
+            limits = [spec.get(key) for key in ("requests", "window", "burst")]
+            if any(limit is not None and limit <= 0 for limit in limits):
+                raise ValueError(f"Rate limit tier {tier!r} must have positive limits")
+
+        if self.rate_limit_top_clients < 0 or self.rate_limit_sketch_width <= 0:
+            raise ValueError(
+                "Rate limit top clients must be non-negative and sketch width positive"
+            )
+
+        if self.rate_limit_usage_period <= 0:
+            raise ValueError("Rate limit usage period must be positive")
+
+        tiers = set(self.rate_limit_tiers)
+        unknown = set(self.rate_limit_tenant_tiers.values()) - tiers
+        if unknown and not self.rate_limit_tiers_file:
+            raise ValueError(f"Unknown rate limit tiers: {', '.join(sorted(unknown))}")
+
         if self.max_query_length <= 0:
             raise ValueError("Max query length must be positive")
 
         if self.max_payload_size <= 0:
             raise ValueError("Max payload size must be positive")
 
+        if self.token_cache_max_size <= 0:
+            raise ValueError("Token cache max size must be positive")
+
         if not self.base_url.startswith(("http://", "https://")):
             raise ValueError("Base URL must start with http:// or https://")
 
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Heavy-hitter tracking for Ambivo MCP Server
+
+Finds the clients consuming the most of their rate limits in fixed memory,
+however many tenants call in: a space-saving summary keeps the top clients
+and a count-min sketch estimates the usage of any client.
+"""
+
+import heapq
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CountMinSketch:
+    """
+    Count-min sketch of weighted counts
+
+    `depth` rows of `width` counters. Estimates never undercount, and
+    overcount by at most total x e / width with probability 1 - e^-depth.
+    Counters are raised with conservative update, which only increments
+    the rows holding the current minimum and keeps overcounting low.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("d", bytes(8 * width)) for _ in range(depth)]
+        self.total = 0.0
+
+    def _indexes(self, key: str) -> List[int]:
+        # Double hashing: one hash of the key gives every row's index
+        h = hash(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, key: str, count: float = 1.0) -> float:
+        """Add to a key's count; returns its new estimate"""
+        indexes = self._indexes(key)
+        rows = self.rows
+        estimate = min(row[i] for row, i in zip(rows, indexes)) + count
+        for row, i in zip(rows, indexes):
+            if row[i] < estimate:
+                row[i] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key: str) -> float:
+        """Estimated count of a key"""
+        return min(row[i] for row, i in zip(self.rows, self._indexes(key)))
+
+    def clear(self) -> None:
+        self.rows = [array("d", bytes(8 * self.width)) for _ in range(self.depth)]
+        self.total = 0.0
+
+
+class SpaceSaving:
+    """
+    Space-saving summary of the `capacity` largest weighted counts
+
+    A key not in a full summary replaces the smallest one and inherits its
+    count as the error bound, so every key counted more than total /
+    capacity is kept, and a kept key's count overestimates by at most its
+    error. The smallest key is found through a min-heap with lazily
+    discarded stale entries, rebuilt when it grows past a few times the
+    capacity, so updates are amortized O(log capacity).
+    """
+
+    def __init__(self, capacity: int = 20):
+        self.capacity = capacity
+        self.counts: Dict[str, List[float]] = {}  # key -> [count, error]
+        self.heap: List[Tuple[float, str]] = []
+
+    def add(self, key: str, count: float = 1.0) -> None:
+        """Add to a key's count"""
+        entry = self.counts.get(key)
+        if entry is None:
+            if len(self.counts) < self.capacity:
+                entry = self.counts[key] = [0.0, 0.0]
+            else:
+                floor, evicted = self._pop_min()
+                del self.counts[evicted]
+                entry = self.counts[key] = [floor, floor]
+        entry[0] += count
+        heapq.heappush(self.heap, (entry[0], key))
+        if len(self.heap) > 4 * self.capacity + 64:
+            self.heap = [(entry[0], key) for key, entry in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    @property
+    def full(self) -> bool:
+        return len(self.counts) >= self.capacity
+
+    def min_count(self) -> float:
+        """Smallest kept count"""
+        heap = self.heap
+        while heap:
+            count, key = heap[0]
+            entry = self.counts.get(key)
+            if entry is not None and entry[0] == count:
+                return count
+            heapq.heappop(heap)
+        return 0.0
+
+    def _pop_min(self) -> Tuple[float, str]:
+        while True:
+            count, key = heapq.heappop(self.heap)
+            entry = self.counts.get(key)
+            if entry is not None and entry[0] == count:
+                return count, key
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, float, float]]:
+        """Largest counts first, as (key, count, error)"""
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1][0])
+        return [(key, count, error) for key, (count, error) in ranked[:n]]
+
+    def clear(self) -> None:
+        self.counts.clear()
+        self.heap.clear()
+
+
+class HeavyHitters:
+    """
+    Top keys by weighted count, with an estimate for any key
+
+    A key only displaces one in the full summary once its sketch estimate
+    exceeds the smallest kept count, so the many keys seen a few times do
+    not churn the summary and inflate its counts.
+    """
+
+    def __init__(self, capacity: int = 20, width: int = 2048, depth: int = 4):
+        self.summary = SpaceSaving(capacity)
+        self.sketch = CountMinSketch(width, depth)
+
+    def add(self, key: str, count: float = 1.0) -> None:
+        estimate = self.sketch.add(key, count)
+        summary = self.summary
+        if key in summary.counts or not summary.full or estimate > summary.min_count():
+            summary.add(key, count)
+
+    def estimate(self, key: str) -> float:
+        """Estimated count of a key, tracked in the top or not"""
+        return self.sketch.estimate(key)
+
+    def top(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Keys with the largest counts
+
+        Counts are the smaller of the summary count and the sketch estimate,
+        both upper bounds; the true count is at least count - error.
+        """
+        estimate = self.sketch.estimate
+        ranked = sorted(
+            (
+                (key, min(count, estimate(key)), error)
+                for key, count, error in self.summary.top()
+            ),
+            key=lambda item: -item[1],
+        )
+        return [
+            {"client_id": key, "count": round(count, 3), "error": round(error, 3)}
+            for key, count, error in ranked[:n]
+        ]
+
+    @property
+    def total(self) -> float:
+        return self.sketch.total
+
+    def clear(self) -> None:
+        self.summary.clear()
+        self.sketch.clear()
+
+
+class RateLimitUsage:
+    """
+    Heavy hitters of a rate limiter: cost admitted and calls rejected
+
+    Attached to a limiter as its `usage`, which feeds it from is_allowed,
+    acquire and adjust. Counts cover one reporting period of `period`
+    seconds: when it ends they are reset, keeping the top clients of the
+    period just ended, so the counts never saturate with stale tenants.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 20,
+        width: int = 2048,
+        depth: int = 4,
+        period: float = 3600.0,
+    ):
+        self.capacity = capacity
+        self.period = period
+        self.consumed = HeavyHitters(capacity, width, depth)
+        self.rejected = HeavyHitters(capacity, width, depth)
+        self.period_start = time.time()
+        self.previous: Optional[Dict[str, Any]] = None
+
+    def _roll(self) -> None:
+        """Start a new period once the current one has ended"""
+        if time.time() - self.period_start >= self.period:
+            self.previous = self._period_stats()
+            self.reset()
+
+    def record(self, client_id: str, cost: float, allowed: bool) -> None:
+        """Count a call's cost if admitted, or the call if rejected"""
+        self._roll()
+        if allowed:
+            self.consumed.add(client_id, cost)
+        else:
+            self.rejected.add(client_id)
+
+    def charge(self, client_id: str, cost: float) -> None:
+        """Count extra cost charged after admission"""
+        if cost > 0:
+            self._roll()
+            self.consumed.add(client_id, cost)
+
+    def get_client_stats(self, client_id: str) -> Dict[str, float]:
+        """Estimated usage of any client in the current period"""
+        self._roll()
+        return {
+            "consumed": round(self.consumed.estimate(client_id), 3),
+            "rejected": round(self.rejected.estimate(client_id), 3),
+        }
+
+    def reset(self) -> None:
+        """Clear the counts and start a new period"""
+        self.consumed.clear()
+        self.rejected.clear()
+        self.period_start = time.time()
+
+    def _period_stats(self) -> Dict[str, Any]:
+        return {
+            "consumed": round(self.consumed.total, 3),
+            "rejected": round(self.rejected.total, 3),
+            "top_consumers": self.consumed.top(),
+            "top_rejected": self.rejected.top(),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the top consumers and rejected clients of this and the last period"""
+        self._roll()
+        return {
+            **self._period_stats(),
+            "period_seconds": self.period,
+            "period_elapsed": round(time.time() - self.period_start, 3),
+            "previous_period": self.previous,
+        }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+HTTP connection pool management for Ambivo MCP Server
+"""
+
+import logging
+from typing import Any, Dict
+
+import httpx
+
+logger = logging.getLogger("ambivo-mcp.http")
+
+
+def http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_timeout(config) -> httpx.Timeout:
+    """Build split connect/read/write/pool timeouts, defaulting to config.timeout"""
+
+    def _pick(value):
+        return config.timeout if value is None else value
+
+    return httpx.Timeout(
+        connect=_pick(config.connect_timeout),
+        read=_pick(config.read_timeout),
+        write=_pick(config.write_timeout),
+        pool=_pick(config.pool_timeout),
+    )
+
+
+def build_limits(config) -> httpx.Limits:
+    """Build connection pool limits from configuration"""
+    return httpx.Limits(
+        max_connections=config.pool_max_connections,
+        max_keepalive_connections=config.pool_max_keepalive_connections,
+        keepalive_expiry=config.pool_keepalive_expiry,
+    )
+
+
+def create_http_client(config) -> httpx.AsyncClient:
+    """
+    Create the shared HTTP client used for upstream Ambivo API requests
+
+    Args:
+        config: ServerConfig instance
+
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    http2 = config.http2_enabled
+    if http2 and not http2_available():
+        logger.warning(
+            "HTTP/2 requested but the 'h2' package is not installed, "
+            "falling back to HTTP/1.1 (pip install httpx[http2])"
+        )
+        http2 = False
+
+    return httpx.AsyncClient(
+        timeout=build_timeout(config),
+        limits=build_limits(config),
+        http2=http2,
+    )
+
+
+def get_pool_stats(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    Get live connection pool statistics
+
+    Reads the underlying httpcore pool, so values are best-effort snapshots.
+
+    Returns:
+        Dictionary with active/idle connection and active/waiting request counts
+    """
+    stats = {
+        "connections_active": 0,
+        "connections_idle": 0,
+        "connections_http2": 0,
+        "requests_active": 0,
+        "requests_waiting": 0,
+    }
+
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return stats
+
+    for connection in list(getattr(pool, "_connections", [])):
+        if connection.is_idle():
+            stats["connections_idle"] += 1
+        else:
+            stats["connections_active"] += 1
+        info = connection.info() if hasattr(connection, "info") else ""
+        if "HTTP/2" in info:
+            stats["connections_http2"] += 1
+
+    for request in list(getattr(pool, "_requests", [])):
+        if request.is_queued():
+            stats["requests_waiting"] += 1
+        else:
+            stats["requests_active"] += 1
+
+    return stats
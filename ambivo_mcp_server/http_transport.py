@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+HTTP transport for the Ambivo MCP Server
+
+Serves MCP over streamable HTTP (/mcp) and SSE (/sse, /messages/), plus plain
+JSON endpoints (/health, /tools, /query, /metrics). Every request carries its
+own "Authorization: Bearer <token>" header, which authenticates the API calls
+made while handling it, so one process serves many tenants concurrently.
+"""
+
+import asyncio
+import contextlib
+import logging
+import re
+import socket
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+from uuid import UUID
+
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Mount, Route
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .api_client import parse_bearer_token
+from .metrics import PROMETHEUS_CONTENT_TYPE
+from .tenants import get_tenant_session, tenant_context
+
+if TYPE_CHECKING:
+    from .app import AmbivoMCPApp
+    from .workers import WorkerRuntime
+
+logger = logging.getLogger("ambivo-mcp.http")
+
+# Paths served without a bearer token
+PUBLIC_PATHS = frozenset(["/health", "/metrics"])
+
+# Session ID in the endpoint event that opens an SSE stream
+SSE_SESSION_ID = re.compile(rb"session_id=([0-9a-f]{32})")
+
+
+class BearerAuthMiddleware:
+    """
+    Require a bearer token and run the request as the token's tenant
+
+    A pure ASGI middleware, so the tenant session is set in the context the
+    endpoint and any tasks it starts run in, including streamed responses.
+    """
+
+    def __init__(self, app: ASGIApp, mcp_app: "AmbivoMCPApp"):
+        self.app = app
+        self.mcp_app = mcp_app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        token = parse_bearer_token(Headers(scope=scope).get("authorization"))
+        if token is None:
+            await self._unauthorized("Authentication required")(scope, receive, send)
+            return
+
+        # Hashed once for the token cache and the tenant's client ID
+        token_validator = self.mcp_app.token_validator
+        digest = token_validator.token_digest(token)
+        if self.mcp_app.config.token_validation_enabled:
+            if not token_validator.is_token_cached(token, digest):
+                try:
+                    token_validator.validate_token_format(token)
+                except ValueError as e:
+                    await self._unauthorized(f"Invalid token: {e}")(
+                        scope, receive, send
+                    )
+                    return
+                token_validator.cache_token(token, digest)
+
+        client_id = token_validator.client_id_from_digest(digest)
+        with tenant_context(self.mcp_app.tenant_sessions.acquire(token, client_id)):
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    def _unauthorized(message: str) -> Response:
+        return JSONResponse(
+            {"error": message},
+            status_code=401,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+class StreamableHTTPEndpoint:
+    """ASGI endpoint handing requests to the streamable HTTP session manager"""
+
+    def __init__(self, session_manager: StreamableHTTPSessionManager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def _content_text(content: List[Any]) -> str:
+    """Join the text of MCP tool result content"""
+    return "\n".join(item.text for item in content if getattr(item, "text", None))
+
+
+async def _json_body(request: Request) -> Dict[str, Any]:
+    """Read a JSON object request body"""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ValueError("Request body must be JSON")
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+    return body
+
+
+def create_http_app(
+    mcp_app: "AmbivoMCPApp", render_metrics: Optional[Callable[[], str]] = None
+) -> Starlette:
+    """
+    Build the ASGI application serving an MCP application over HTTP
+
+    Streamable HTTP runs stateless: each POST gets a fresh transport, so no
+    MCP session outlives the request whose token authenticated it. An SSE
+    session is bound to the token of the GET request that opened it, and
+    messages posted to it by any other tenant are refused with 403.
+
+    Args:
+        mcp_app: Application whose tools and MCP server are served
+        render_metrics: Renders /metrics; defaults to the application's own
+            registry, worker processes pass one aggregating all workers
+
+    Returns:
+        Starlette application; its lifespan runs the MCP session manager
+    """
+    config = mcp_app.config
+    render_metrics = render_metrics or mcp_app.metrics.render_prometheus
+    session_manager = StreamableHTTPSessionManager(
+        app=mcp_app.server,
+        json_response=config.http_json_response,
+        stateless=True,
+    )
+    sse = SseServerTransport("/messages/")
+
+    # Client ID of the tenant that opened each SSE session, by session ID
+    sse_owners: Dict[str, str] = {}
+
+    async def handle_sse(request: Request) -> Response:
+        tenant = get_tenant_session()
+        session_ids: List[str] = []
+
+        async def send(message: Dict[str, Any]) -> None:
+            # Bind the session to its tenant before the client learns its ID
+            if not session_ids and message["type"] == "http.response.body":
+                match = SSE_SESSION_ID.search(message.get("body", b""))
+                if match is not None and tenant is not None:
+                    session_ids.append(match.group(1).decode())
+                    sse_owners[session_ids[0]] = tenant.client_id
+            await request._send(message)
+
+        try:
+            async with sse.connect_sse(request.scope, request.receive, send) as (
+                read_stream,
+                write_stream,
+            ):
+                await mcp_app.server.run(
+                    read_stream, write_stream, mcp_app.initialization_options()
+                )
+        finally:
+            for session_id in session_ids:
+                sse_owners.pop(session_id, None)
+        return Response()
+
+    async def handle_post_message(scope: Scope, receive: Receive, send: Send) -> None:
+        # Only the tenant that opened an SSE session may post to it
+        values = parse_qs(scope.get("query_string", b"").decode()).get("session_id")
+        try:
+            session_id = UUID(hex=values[0]).hex if values else None
+        except ValueError:
+            session_id = None
+        owner = sse_owners.get(session_id) if session_id else None
+        tenant = get_tenant_session()
+        if owner is not None and (tenant is None or tenant.client_id != owner):
+            logger.warning("Rejected message for another tenant's SSE session")
+            response = JSONResponse(
+                {"error": "Session belongs to another tenant"}, status_code=403
+            )
+            await response(scope, receive, send)
+            return
+        await sse.handle_post_message(scope, receive, send)
+
+    async def health(request: Request) -> Response:
+        return JSONResponse(
+            {
+                "status": "ok",
+                "server": config.server_name,
+                "version": config.server_version,
+            }
+        )
+
+    async def metrics(request: Request) -> Response:
+        if not config.metrics_enabled:
+            return PlainTextResponse("Not Found\n", status_code=404)
+        return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    async def list_tools(request: Request) -> Response:
+        tools = await mcp_app.list_tools()
+        return JSONResponse(
+            {
+                "tools": [
+                    tool.model_dump(mode="json", exclude_none=True) for tool in tools
+                ]
+            }
+        )
+
+    async def call_tool(request: Request) -> Response:
+        try:
+            body = await _json_body(request)
+            name = body.get("name")
+            if not isinstance(name, str) or not name:
+                raise ValueError("Tool name is required")
+            arguments = body.get("arguments") or {}
+            if not isinstance(arguments, dict):
+                raise ValueError("Tool arguments must be a JSON object")
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+        content = await mcp_app.call_tool(name, arguments)
+        return JSONResponse({"tool": name, "result": _content_text(content)})
+
+    async def natural_query(request: Request) -> Response:
+        try:
+            arguments = await _json_body(request)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+        content = await mcp_app.call_tool("natural_query", arguments)
+        return JSONResponse({"result": _content_text(content)})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with session_manager.run():
+            logger.info("HTTP transport started")
+            yield
+
+    http_app = Starlette(
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Route("/tools", list_tools, methods=["GET"]),
+            Route("/tools", call_tool, methods=["POST"]),
+            Route("/query", natural_query, methods=["POST"]),
+            Route(
+                "/mcp",
+                StreamableHTTPEndpoint(session_manager),
+                methods=["GET", "POST", "DELETE"],
+            ),
+            Route("/sse", handle_sse, methods=["GET"]),
+            Mount("/messages/", app=handle_post_message),
+        ],
+        lifespan=lifespan,
+    )
+    http_app.add_middleware(BearerAuthMiddleware, mcp_app=mcp_app)
+    return http_app
+
+
+async def serve_http(
+    mcp_app: "AmbivoMCPApp",
+    host: str,
+    port: int,
+    sock: Optional[socket.socket] = None,
+    runtime: Optional["WorkerRuntime"] = None,
+) -> None:
+    """
+    Serve the MCP application over HTTP until the server is stopped
+
+    Args:
+        mcp_app: Application to serve
+        host: Listen address, unless a socket is given
+        port: Listen port, unless a socket is given
+        sock: Already bound listening socket, e.g. shared by worker processes
+        runtime: Worker runtime that recycles this process and aggregates
+            metrics across workers
+    """
+    import uvicorn
+
+    render_metrics = None
+    if runtime is not None:
+        runtime.attach(mcp_app.metrics)
+        render_metrics = runtime.render_prometheus
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_http_app(mcp_app, render_metrics),
+            host=host,
+            port=port,
+            log_level=mcp_app.config.log_level.lower(),
+            access_log=False,
+            limit_max_requests=runtime.max_requests if runtime else None,
+        )
+    )
+    logger.info(f"Serving MCP over HTTP on http://{host}:{port}/mcp")
+    if runtime is None:
+        await server.serve(sockets=[sock] if sock is not None else None)
+        return
+
+    watcher = asyncio.create_task(runtime.watch(server))
+    try:
+        await server.serve(sockets=[sock])
+    finally:
+        watcher.cancel()
+        runtime.close()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+JSON encoding helpers for Ambivo MCP Server
+
+Uses orjson when it is installed and falls back to the standard library.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Encode to compact JSON text"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON from bytes or text"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def is_container(data: bytes) -> bool:
+    """
+    Whether bytes are delimited as a JSON object or array
+
+    Only the first and last non-whitespace bytes are checked, so a body can
+    be spliced into a larger document without decoding it.
+    """
+    head, tail = data[:64].lstrip(), data[-64:].rstrip()
+    return (head[:1], tail[-1:]) in ((b"{", b"}"), (b"[", b"]"))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Non-blocking logging pipeline and per-call log sampling
+"""
+
+import atexit
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+# Pass as `extra=SAMPLED` on per-call INFO lines that may be sampled
+SAMPLED = {"sampled": True}
+
+_listener: Optional[QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limit per-call log lines
+
+    Only records logged with `extra=SAMPLED` at INFO or below are sampled;
+    everything else passes through. Sampled records are admitted by a token
+    bucket refilled at `rate` records per second, and the next admitted record
+    reports how many similar lines were suppressed since the last one.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.last_refill = time.monotonic()
+        self.suppressed = 0
+        self.total_suppressed = 0
+        self._last_record: Optional[logging.LogRecord] = None
+        self._last_decision = True
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not getattr(record, "sampled", False):
+            return True
+        # The same record may reach several handlers sharing this filter
+        if record is self._last_record:
+            return self._last_decision
+        self._last_record = record
+        self._last_decision = self._admit(record)
+        return self._last_decision
+
+    def _admit(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.last_refill) * self.rate
+        )
+        self.last_refill = now
+
+        if self.tokens < 1.0:
+            self.suppressed += 1
+            self.total_suppressed += 1
+            return False
+
+        self.tokens -= 1.0
+        if self.suppressed and isinstance(record.args, tuple):
+            record.msg = f"{record.msg} (%d similar lines suppressed)"
+            record.args = record.args + (self.suppressed,)
+            self.suppressed = 0
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sampling statistics"""
+        return {"rate": self.rate, "suppressed": self.total_suppressed}
+
+
+def start_queue_logging(
+    handlers: List[logging.Handler], logger: logging.Logger
+) -> QueueHandler:
+    """
+    Route a logger's records through a queue to a background listener thread
+
+    The handlers (file, console) run on the listener thread, so slow writes no
+    longer block the event loop. Any previously started listener is stopped.
+
+    Returns:
+        The QueueHandler installed on the logger
+    """
+    global _listener
+    stop_queue_logging()
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return queue_handler
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and stop the listener thread, if running"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_in_child() -> None:
+    """Give a forked worker its own listener thread for the inherited queue"""
+    global _listener
+    if _listener is not None:
+        _listener = QueueListener(
+            _listener.queue,
+            *_listener.handlers,
+            respect_handler_level=_listener.respect_handler_level,
+        )
+        _listener.start()
+
+
+atexit.register(stop_queue_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Lightweight metrics registry with Prometheus text exposition
+"""
+
+import asyncio
+import logging
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("ambivo-mcp.metrics")
+
+# Latency buckets in seconds, from cache hits to slow natural language queries
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # +Inf bucket, best estimate is its lower bound
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class _Metric:
+    """A named metric family whose children are keyed by label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], Any] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Get the child for a set of label values, creating it on first use"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            child = self.children[values] = self._new_child()
+        return child
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [
+            (self.name + "_total", _format_labels(self.labelnames, values), child.value)
+            for values, child in self.children.items()
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, e.g. in-flight requests
+
+    `aggregate` says how the values of several worker processes combine:
+    "sum" for amounts such as in-flight requests, "max" for states such as
+    an open circuit, which should not read 3 when three workers report 1.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        aggregate: str = "sum",
+    ):
+        if aggregate not in ("sum", "max"):
+            raise ValueError(f"Unknown gauge aggregation: {aggregate}")
+        super().__init__(name, documentation, labelnames)
+        self.aggregate = aggregate
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [
+            (self.name, _format_labels(self.labelnames, values), child.value)
+            for values, child in self.children.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values, e.g. latencies in seconds"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        samples = []
+        bucket_names = self.labelnames + ("le",)
+        for values, child in self.children.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_names, values + (_format_value(bound),))
+                samples.append((self.name + "_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, values)
+            samples.append((self.name + "_count", labels, child.count))
+            samples.append((self.name + "_sum", labels, child.sum))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Registry of counters, gauges and histograms
+
+    Recording is a dictionary lookup plus an increment, so metrics stay on for
+    every call; callers on hot paths can also keep the child returned by
+    `labels()`. Components that already keep their own statistics register a
+    collector instead, which is only called when metrics are read.
+    """
+
+    def __init__(self, namespace: str = "ambivo"):
+        self.namespace = namespace
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        metric = self.metrics.get(full_name)
+        if metric is None:
+            metric = self.metrics[full_name] = cls(full_name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {full_name} already registered as {metric.kind}")
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        aggregate: str = "sum",
+    ) -> Gauge:
+        """Get or create a gauge, summed or maxed across workers"""
+        return self._register(Gauge, name, documentation, labelnames, aggregate)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def register_collector(
+        self, name: str, collect: Callable[[], Optional[Dict[str, Any]]]
+    ) -> None:
+        """
+        Expose a component's stats dictionary as gauges
+
+        Numeric values of the dictionary returned by `collect` are rendered as
+        `<namespace>_<name>_<key>` gauges; other values are skipped.
+        """
+        self.collectors[name] = collect
+
+    def _collect(self) -> Dict[str, Dict[str, Any]]:
+        collected = {}
+        for name, collect in self.collectors.items():
+            try:
+                stats = collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+                continue
+            if stats is not None:
+                collected[name] = stats
+        return collected
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{labels} {_format_value(value)}")
+
+        for name, value in self._collected_gauges():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _collected_gauges(self) -> Iterator[Tuple[str, float]]:
+        """Yield the numeric collector stats as (gauge name, value)"""
+        for component, stats in self._collect().items():
+            for key, value in stats.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                yield f"{self.namespace}_{component}_{key}", value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all metrics as a dictionary, with latency percentiles for histograms"""
+        metrics: Dict[str, Any] = {}
+        for metric in self.metrics.values():
+            series = []
+            for values, child in metric.children.items():
+                entry: Dict[str, Any] = dict(zip(metric.labelnames, values))
+                if isinstance(child, _HistogramChild):
+                    entry.update(
+                        {
+                            "count": child.count,
+                            "sum": round(child.sum, 6),
+                            "p50": round(child.quantile(0.50), 6),
+                            "p95": round(child.quantile(0.95), 6),
+                            "p99": round(child.quantile(0.99), 6),
+                        }
+                    )
+                else:
+                    entry["value"] = child.value
+                series.append(entry)
+            metrics[metric.name] = series
+        return {"metrics": metrics, **self._collect()}
+
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Get the raw values of all metrics as JSON-serializable data
+
+        Used to aggregate metrics across worker processes with merge_state().
+        Collector stats are not exported; see export_collected().
+        """
+        state: Dict[str, Any] = {}
+        for metric in self.metrics.values():
+            entry: Dict[str, Any] = {
+                "kind": metric.kind,
+                "documentation": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "series": [],
+            }
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            elif isinstance(metric, Gauge):
+                entry["aggregate"] = metric.aggregate
+            for values, child in metric.children.items():
+                if isinstance(child, _HistogramChild):
+                    data: Any = {
+                        "counts": list(child.counts),
+                        "count": child.count,
+                        "sum": child.sum,
+                    }
+                else:
+                    data = child.value
+                entry["series"].append([list(values), data])
+            state[metric.name] = entry
+        return state
+
+    def export_collected(self, labels: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Get the numeric collector stats as gauges in the export_state() format
+
+        Collector stats such as ratios cannot be summed meaningfully, so each
+        process labels its own series, e.g. {"worker": "0"}, and merge_state()
+        keeps them side by side.
+        """
+        state: Dict[str, Any] = {}
+        for name, value in self._collected_gauges():
+            state[name] = {
+                "kind": "gauge",
+                "documentation": "Component statistic",
+                "labelnames": list(labels),
+                "aggregate": "sum",
+                "series": [[list(labels.values()), value]],
+            }
+        return state
+
+    def merge_state(
+        self, state: Dict[str, Any], kinds: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Add metric values exported by export_state() into this registry
+
+        Counters and histogram buckets are summed series by series. Gauges
+        are summed too, unless registered with aggregate="max".
+
+        Args:
+            state: Exported metric values
+            kinds: Only merge these metric kinds, e.g. ("counter", "histogram")
+        """
+        classes = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+        kinds = set(kinds) if kinds is not None else set(classes)
+        for name, entry in state.items():
+            if entry["kind"] not in kinds:
+                continue
+            metric = self.metrics.get(name)
+            if metric is None:
+                cls = classes[entry["kind"]]
+                args = (name, entry["documentation"], entry["labelnames"])
+                if cls is Histogram:
+                    metric = Histogram(*args, buckets=entry["buckets"])
+                elif cls is Gauge:
+                    metric = Gauge(*args, aggregate=entry.get("aggregate", "sum"))
+                else:
+                    metric = cls(*args)
+                self.metrics[name] = metric
+            elif metric.kind != entry["kind"]:
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            if isinstance(metric, Histogram) and list(metric.buckets) != entry.get(
+                "buckets"
+            ):
+                logger.warning(f"Skipping {name}: histogram buckets differ")
+                continue
+
+            maximum = getattr(metric, "aggregate", "sum") == "max"
+            for values, data in entry["series"]:
+                seen = tuple(values) in metric.children
+                child = metric.labels(*values)
+                if isinstance(child, _HistogramChild):
+                    for index, bucket_count in enumerate(data["counts"]):
+                        child.counts[index] += bucket_count
+                    child.count += data["count"]
+                    child.sum += data["sum"]
+                elif maximum and seen:
+                    child.value = max(child.value, data)
+                elif maximum:
+                    child.value = data
+                else:
+                    child.value += data
+
+
+async def serve_metrics(
+    registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464
+) -> asyncio.AbstractServer:
+    """
+    Serve GET /metrics in the Prometheus text format on a plain TCP listener
+
+    Used when the MCP server itself runs over stdio and has no HTTP app to
+    mount the endpoint on.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if (
+                len(parts) >= 2
+                and parts[0] == "GET"
+                and parts[1].split("?")[0] == "/metrics"
+            ):
+                status, content_type = "200 OK", PROMETHEUS_CONTENT_TYPE
+                body = registry.render_prometheus().encode("utf-8")
+            else:
+                status, content_type, body = (
+                    "404 Not Found",
+                    "text/plain",
+                    b"Not Found\n",
+                )
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode(
+                    "latin-1"
+                )
+                + body
+            )
+            await writer.drain()
+        except (ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            writer.close()
+
+    metrics_server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return metrics_server
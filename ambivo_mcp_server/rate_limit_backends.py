@@ -0,0 +1,714 @@
+#!/usr/bin/env python3
+"""
+Shared rate limit state for Ambivo MCP Server
+
+With several workers or replicas, in-process rate limiters give every client
+its limit once per process. SharedRateLimiter keeps the counts in a backend
+all processes share instead: a SQLite database in WAL mode for workers on one
+host, or a Redis-protocol server for a cluster.
+
+Counts are kept per client and fixed window, and a request is admitted with
+the sliding window counter estimate (see SlidingWindowRateLimiter). Each
+round trip atomically checks the estimate and adds as many of a batch of
+permits as fit under the limit to the client's count; the permits granted are
+then spent locally, so most calls never leave the process. Round trips made while admitting a
+request with acquire() or reconciling its cost with reconcile() run in a
+worker thread, off the event loop.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .security import (
+    BaseRateLimiter,
+    RateLimitPolicy,
+    SlidingWindowRateLimiter,
+    _whole_requests,
+)
+
+logger = logging.getLogger("ambivo-mcp.rate_limit")
+
+# Seconds to use the local fallback limiter after a backend failure
+BACKEND_RETRY_SECONDS = 5.0
+
+
+class RateLimitBackendError(Exception):
+    """Raised when the shared rate limit state cannot be read or updated"""
+
+
+class RateLimitBackend:
+    """
+    Per-client, per-window request counts shared between processes
+
+    Windows are identified by their integer start time in seconds.
+    """
+
+    def take(
+        self,
+        client_id: str,
+        window_start: int,
+        window_seconds: int,
+        count: int,
+        max_requests: Optional[int] = None,
+        overlap: float = 0.0,
+    ) -> Tuple[int, int, int]:
+        """
+        Atomically add up to `count` requests to a client's window
+
+        The requests granted are those that fit under the sliding window
+        estimate: int(max_requests - previous * overlap) minus the window's
+        count. The check and the increment are one atomic step, so concurrent
+        takes never see or leave a count over the limit.
+
+        Args:
+            client_id: Client identifier
+            window_start: Start of the current window
+            window_seconds: Window length
+            count: Requests wanted
+            max_requests: Limit of the window; None adds all `count` requests
+                regardless of the limit
+            overlap: Weight of the previous window's count
+
+        Returns:
+            (count of the window after the increment, count of the previous
+            window, requests granted)
+        """
+        raise NotImplementedError
+
+    def expire(self, before: int) -> None:
+        """Drop windows starting before `before`"""
+
+    def close(self) -> None:
+        """Release connections"""
+
+
+class SQLiteBackend(RateLimitBackend):
+    """
+    Rate limit counts in a SQLite database shared by the workers on one host
+
+    WAL mode lets workers read while another writes, and every update runs in
+    an immediate transaction, so increments from different processes never
+    interleave. The connection is opened lazily in the process that uses it,
+    so a backend created before a fork is safe to use in the children. It may
+    be used from any thread, one thread at a time.
+    """
+
+    def __init__(self, path: str, timeout: float = 0.1):
+        self.path = path
+        self.timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "client_id TEXT NOT NULL, "
+                "window_start INTEGER NOT NULL, "
+                "count INTEGER NOT NULL, "
+                "PRIMARY KEY (client_id, window_start)) WITHOUT ROWID"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def take(
+        self,
+        client_id: str,
+        window_start: int,
+        window_seconds: int,
+        count: int,
+        max_requests: Optional[int] = None,
+        overlap: float = 0.0,
+    ) -> Tuple[int, int, int]:
+        previous_start = window_start - window_seconds
+        try:
+            conn = self.conn
+            # The write lock is held from the read to the commit
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                counts = dict(
+                    conn.execute(
+                        "SELECT window_start, count FROM rate_limits "
+                        "WHERE client_id = ? AND window_start IN (?, ?)",
+                        (client_id, window_start, previous_start),
+                    ).fetchall()
+                )
+                current = counts.get(window_start, 0)
+                previous = counts.get(previous_start, 0)
+                granted = count
+                if max_requests is not None:
+                    capacity = int(max_requests - previous * overlap)
+                    granted = max(0, min(count, capacity - current))
+                if granted:
+                    conn.execute(
+                        "INSERT INTO rate_limits (client_id, window_start, count) "
+                        "VALUES (?, ?, ?) ON CONFLICT (client_id, window_start) "
+                        "DO UPDATE SET count = count + excluded.count",
+                        (client_id, window_start, granted),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            raise RateLimitBackendError(f"SQLite rate limit backend: {e}") from e
+        return current + granted, previous, granted
+
+    def expire(self, before: int) -> None:
+        try:
+            self.conn.execute(
+                "DELETE FROM rate_limits WHERE window_start < ?", (before,)
+            )
+        except sqlite3.Error as e:
+            raise RateLimitBackendError(f"SQLite rate limit backend: {e}") from e
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+
+class RedisConnection:
+    """
+    Minimal blocking RESP2 client
+
+    Supports exactly what the rate limiter needs: pipelined commands with
+    integer, string and nil replies, plus AUTH and SELECT from the URL.
+    """
+
+    def __init__(self, url: str, timeout: float = 0.1):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._pid = 0
+
+    def _connect(self) -> None:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+        self._pid = os.getpid()
+        setup = []
+        if self.password is not None:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._roundtrip(setup)
+
+    @staticmethod
+    def _encode(command: Tuple[Any, ...]) -> bytes:
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by Redis server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RateLimitBackendError(f"Redis error: {payload.decode()}")
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected Redis reply: {line[:20]!r}")
+
+    def _roundtrip(self, commands: List[Tuple[Any, ...]]) -> List[Any]:
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+        replies = []
+        error = None
+        # Read every reply so the connection stays in sync after an error
+        for _ in commands:
+            try:
+                replies.append(self._read_reply())
+            except RateLimitBackendError as e:
+                error = error or e
+                replies.append(None)
+        if error is not None:
+            raise error
+        return replies
+
+    def pipeline(self, *commands: Tuple[Any, ...]) -> List[Any]:
+        """Send commands in one write and return their replies"""
+        try:
+            if self._sock is None or self._pid != os.getpid():
+                self._connect()
+            return self._roundtrip(list(commands))
+        except (OSError, ConnectionError, ValueError) as e:
+            self.close()
+            raise RateLimitBackendError(f"Redis rate limit backend: {e}") from e
+
+    def close(self) -> None:
+        if self._sock is not None and self._pid == os.getpid():
+            self._reader.close()
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+
+# KEYS: current window, previous window
+# ARGV: requests wanted, expiry seconds, limit ("" for none), previous weight
+TAKE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local granted = tonumber(ARGV[1])
+if ARGV[3] ~= '' then
+    local capacity = math.floor(tonumber(ARGV[3]) - previous * tonumber(ARGV[4]))
+    granted = math.max(0, math.min(granted, capacity - current))
+end
+if granted > 0 then
+    current = redis.call('INCRBY', KEYS[1], granted)
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return {current, previous, granted}
+"""
+
+TAKE_SCRIPT_SHA = hashlib.sha1(TAKE_SCRIPT.encode()).hexdigest()
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    Rate limit counts in Redis, or any server speaking the Redis protocol
+
+    Taking permits runs one Lua script, so the limit check and the increment
+    are atomic and cost one round trip. The script is called by its SHA1 and
+    only sent again when the server does not know it. Windows expire on their
+    own after two window lengths.
+    """
+
+    def __init__(self, url: str, timeout: float = 0.1, key_prefix: str = "ambivo:rl:"):
+        self.redis = RedisConnection(url, timeout=timeout)
+        self.key_prefix = key_prefix
+
+    def _key(self, client_id: str, window_start: int) -> str:
+        return f"{self.key_prefix}{client_id}:{window_start}"
+
+    def take(
+        self,
+        client_id: str,
+        window_start: int,
+        window_seconds: int,
+        count: int,
+        max_requests: Optional[int] = None,
+        overlap: float = 0.0,
+    ) -> Tuple[int, int, int]:
+        args = (
+            2,
+            self._key(client_id, window_start),
+            self._key(client_id, window_start - window_seconds),
+            count,
+            2 * window_seconds,
+            "" if max_requests is None else max_requests,
+            repr(overlap),
+        )
+        try:
+            (reply,) = self.redis.pipeline(("EVALSHA", TAKE_SCRIPT_SHA) + args)
+        except RateLimitBackendError as e:
+            if "NOSCRIPT" not in str(e):
+                raise
+            (reply,) = self.redis.pipeline(("EVAL", TAKE_SCRIPT) + args)
+        current, previous, granted = reply
+        return current, previous, granted
+
+    def close(self) -> None:
+        self.redis.close()
+
+
+class PermitLease:
+    """Permits of one client's window already granted to this process"""
+
+    __slots__ = ("window_start", "permits", "used", "retry_at", "policy")
+
+    def __init__(self, window_start: int, policy: RateLimitPolicy):
+        self.window_start = window_start
+        self.permits = 0.0
+        self.used = 0  # shared count of the window at the last round trip
+        self.retry_at = 0.0
+        self.policy = policy
+
+
+class SharedRateLimiter(BaseRateLimiter):
+    """
+    Sliding window counter rate limiter over a shared backend
+
+    Permits are taken from the backend `lease_size` at a time and spent
+    locally. Leases shrink as a client nears its limit, so the permits held
+    by one process cannot starve the others. When the backend fails, requests
+    are limited by a per-process limiter until it is reachable again.
+
+    Backend calls are serialized by a lock, as they may come from the event
+    loop and from worker threads. Limiter state is only changed on the
+    calling thread, never in a worker.
+    """
+
+    algorithm = "shared_sliding_window"
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        max_requests: int = 100,
+        window_seconds: int = 3600,
+        sweep_interval: float = 60.0,
+        lease_size: int = 10,
+    ):
+        super().__init__(max_requests, window_seconds, sweep_interval)
+        self.backend = backend
+        self.backend_lock = threading.Lock()
+        self.lease_size = lease_size
+        self.fallback = SlidingWindowRateLimiter(
+            max_requests, window_seconds, sweep_interval
+        )
+        self.backend_down_until = 0.0
+        # Backend windows are kept for the longest window any policy uses
+        self.longest_window = window_seconds
+        self.round_trips = 0
+        self.backend_errors = 0
+
+    @classmethod
+    def from_config(cls, config) -> "SharedRateLimiter":
+        """Create a shared rate limiter from ServerConfig"""
+        if config.rate_limit_backend == "sqlite":
+            backend = SQLiteBackend(
+                config.rate_limit_sqlite_path, timeout=config.rate_limit_backend_timeout
+            )
+        else:
+            backend = RedisBackend(
+                config.rate_limit_redis_url, timeout=config.rate_limit_backend_timeout
+            )
+        return cls(
+            backend,
+            max_requests=config.rate_limit_requests,
+            window_seconds=config.rate_limit_window,
+            sweep_interval=config.rate_limit_sweep_interval,
+            lease_size=config.rate_limit_lease_size,
+        )
+
+    def _lease(
+        self, client_id: str, now: float, policy: RateLimitPolicy
+    ) -> PermitLease:
+        window_seconds = policy.window_seconds
+        window_start = int(now // window_seconds) * window_seconds
+        lease = self.clients.get(client_id)
+        if lease is None or lease.window_start != window_start:
+            # Permits of an earlier window were counted there and lapse
+            lease = self.clients[client_id] = PermitLease(window_start, policy)
+            if window_seconds > self.longest_window:
+                self.longest_window = window_seconds
+        else:
+            lease.policy = policy
+        return lease
+
+    def _charge(
+        self, client_id: str, window_start: int, window_seconds: int, count: int
+    ) -> int:
+        """
+        Add permits to the shared count regardless of the limit
+
+        Only touches the backend, so it can run in a worker thread.
+
+        Returns:
+            Shared count after the charge
+        """
+        with self.backend_lock:
+            self.round_trips += 1
+            total, _, _ = self.backend.take(
+                client_id, window_start, window_seconds, count
+            )
+        return total
+
+    def _round_trip(
+        self,
+        client_id: str,
+        window_start: int,
+        now: float,
+        requested: int,
+        policy: RateLimitPolicy,
+    ) -> Tuple[int, int, int]:
+        """
+        Take up to `requested` permits within the limit
+
+        Only touches the backend, so it can run in a worker thread.
+
+        Returns:
+            (shared count, previous window count, permits granted)
+        """
+        overlap = 1.0 - (now - window_start) / policy.window_seconds
+        with self.backend_lock:
+            self.round_trips += 1
+            return self.backend.take(
+                client_id,
+                window_start,
+                policy.window_seconds,
+                requested,
+                policy.max_requests,
+                overlap,
+            )
+
+    def _backend_failed(self, now: float, error: RateLimitBackendError) -> None:
+        self.backend_errors += 1
+        self.backend_down_until = now + BACKEND_RETRY_SECONDS
+        logger.warning(
+            f"Rate limit backend unavailable, limiting per process for "
+            f"{BACKEND_RETRY_SECONDS:g}s: {error}"
+        )
+
+    def _spend(self, lease: PermitLease, now: float, cost: float) -> Optional[bool]:
+        """Admit from leased permits; None when a round trip is needed"""
+        if lease.permits >= cost:
+            lease.permits -= cost
+            return True
+        if now < lease.retry_at:
+            return False
+        return None
+
+    def _request_size(
+        self, lease: PermitLease, cost: float, policy: RateLimitPolicy
+    ) -> int:
+        needed = math.ceil(cost - lease.permits)
+        return max(
+            needed, min(self.lease_size, (policy.max_requests - lease.used) // 4)
+        )
+
+    def _settle(
+        self,
+        lease: PermitLease,
+        cost: float,
+        used: int,
+        previous: int,
+        granted: int,
+    ) -> bool:
+        """Add the permits granted by a round trip and spend the cost"""
+        lease.used = used
+        # Permits granted short of the cost stay leased for later requests
+        lease.permits += granted
+        if lease.permits >= cost:
+            lease.permits -= cost
+            return True
+        lease.retry_at = self._next_permit_at(lease, previous, cost - lease.permits)
+        return False
+
+    def _admit(
+        self, client_id: str, now: float, cost: float, policy: RateLimitPolicy
+    ) -> bool:
+        lease = self._lease(client_id, now, policy)
+        allowed = self._spend(lease, now, cost)
+        if allowed is not None:
+            return allowed
+        if now < self.backend_down_until:
+            return self.fallback._admit(client_id, now, cost, policy)
+
+        requested = self._request_size(lease, cost, policy)
+        try:
+            used, previous, granted = self._round_trip(
+                client_id, lease.window_start, now, requested, policy
+            )
+        except RateLimitBackendError as e:
+            self._backend_failed(now, e)
+            return self.fallback._admit(client_id, now, cost, policy)
+        return self._settle(lease, cost, used, previous, granted)
+
+    async def acquire(
+        self,
+        client_id: str,
+        max_delay: float = 0.0,
+        cost: float = 1.0,
+        policy: Optional[RateLimitPolicy] = None,
+    ) -> Optional[float]:
+        """
+        Admit a request without blocking the event loop on the backend
+
+        Leased permits are spent on the loop; round trips to lease more, and
+        the periodic expiry of old windows, run in a worker thread. Shared
+        limits admit or reject immediately, so `max_delay` is not used.
+
+        Returns:
+            0.0, or None if the request is rejected
+        """
+        now = time.time()
+        policy = policy or self.default_policy
+        if now - self.last_sweep >= self.sweep_interval:
+            self._sweep_local(now)
+            await asyncio.to_thread(self._expire_windows, now)
+
+        lease = self._lease(client_id, now, policy)
+        allowed = self._spend(lease, now, cost)
+        if allowed is None and now < self.backend_down_until:
+            allowed = self.fallback._admit(client_id, now, cost, policy)
+        elif allowed is None:
+            requested = self._request_size(lease, cost, policy)
+            try:
+                used, previous, granted = await asyncio.to_thread(
+                    self._round_trip,
+                    client_id,
+                    lease.window_start,
+                    now,
+                    requested,
+                    policy,
+                )
+            except RateLimitBackendError as e:
+                self._backend_failed(now, e)
+                allowed = self.fallback._admit(client_id, now, cost, policy)
+            else:
+                allowed = self._settle(lease, cost, used, previous, granted)
+
+        if self.usage is not None:
+            self.usage.record(client_id, cost, allowed)
+        if not allowed:
+            logger.warning("Rate limit exceeded for client: %s", client_id)
+            return None
+        return 0.0
+
+    def _deficit(self, lease: PermitLease, now: float, delta: float) -> int:
+        """Apply a cost correction to the leased permits; returns permits to charge"""
+        if now >= lease.window_start + lease.policy.window_seconds:
+            return 0
+        lease.permits -= delta
+        if lease.permits >= 0 or now < self.backend_down_until:
+            return 0
+        # Charge extra cost beyond the leased permits even over the limit
+        deficit = math.ceil(-lease.permits)
+        lease.permits += deficit
+        return deficit
+
+    def _adjust(self, client_id: str, now: float, delta: float) -> None:
+        lease = self.clients[client_id]
+        deficit = self._deficit(lease, now, delta)
+        if not deficit:
+            return
+        try:
+            lease.used = self._charge(
+                client_id, lease.window_start, lease.policy.window_seconds, deficit
+            )
+        except RateLimitBackendError as e:
+            self._backend_failed(now, e)
+
+    async def reconcile(self, client_id: str, delta: float) -> None:
+        """
+        Correct the cost charged to a client without blocking the event loop
+
+        The backend round trip runs in a worker thread; the lease and the
+        backoff state are updated back on the loop.
+        """
+        lease = self.clients.get(client_id)
+        if not delta or lease is None:
+            return
+        now = time.time()
+        deficit = self._deficit(lease, now, delta)
+        if deficit:
+            try:
+                lease.used = await asyncio.to_thread(
+                    self._charge,
+                    client_id,
+                    lease.window_start,
+                    lease.policy.window_seconds,
+                    deficit,
+                )
+            except RateLimitBackendError as e:
+                self._backend_failed(now, e)
+        if self.usage is not None:
+            self.usage.charge(client_id, delta)
+
+    def _next_permit_at(
+        self, lease: PermitLease, previous: int, needed: float
+    ) -> float:
+        """Earliest time the shrinking previous-window weight frees the permits"""
+        policy = lease.policy
+        window_end = lease.window_start + policy.window_seconds
+        headroom = policy.max_requests - lease.used - needed
+        if headroom < 0 or previous <= 0:
+            return window_end
+        return min(
+            window_end,
+            lease.window_start + policy.window_seconds * (1.0 - headroom / previous),
+        )
+
+    def _is_idle(self, lease: PermitLease, now: float) -> bool:
+        return now >= lease.window_start + lease.policy.window_seconds
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop idle clients and windows no longer needed by any estimate"""
+        now = time.time() if now is None else now
+        removed = self._sweep_local(now)
+        self._expire_windows(now)
+        return removed
+
+    def _sweep_local(self, now: float) -> int:
+        self.fallback.sweep(now)
+        return super().sweep(now)
+
+    def _expire_windows(self, now: float) -> None:
+        if now < self.backend_down_until:
+            return
+        try:
+            with self.backend_lock:
+                self.backend.expire(int(now - 2 * self.longest_window))
+        except RateLimitBackendError as e:
+            logger.warning(f"Failed to expire rate limit windows: {e}")
+
+    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        """Get rate limit statistics for a client as of the last round trip"""
+        lease = self.clients.get(client_id)
+        if lease is None:
+            return {"requests": 0, "remaining": self.max_requests}
+
+        policy = lease.policy
+        requests = _whole_requests(lease.used - lease.permits)
+        return {
+            "requests": requests,
+            "remaining": max(0, policy.max_requests - requests),
+            "window_seconds": policy.window_seconds,
+            "reset_time": lease.window_start + policy.window_seconds,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        stats = super().get_stats()
+        stats["backend"] = type(self.backend).__name__
+        stats["round_trips"] = self.round_trips
+        stats["backend_errors"] = self.backend_errors
+        return stats
+
+    def close(self) -> None:
+        """Close the backend connection"""
+        with self.backend_lock:
+            self.backend.close()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Server-side storage of large query results for paged retrieval
+"""
+
+import json
+import logging
+import mmap
+import secrets
+import tempfile
+import time
+from array import array
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger("ambivo-mcp.results")
+
+RESULT_URI_SCHEME = "ambivo"
+RESULT_URI_TEMPLATE = "ambivo://results/{handle}?page={page}"
+
+# Keys that commonly hold table rows in natural_query responses
+ROW_KEYS = ("data", "rows", "records", "results", "table")
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+class ResultNotFoundError(Exception):
+    """Raised when a result handle is unknown, expired or owned by another tenant"""
+
+
+@dataclass
+class StoredResult:
+    """A stored result: rows encoded as JSON, addressed by byte offsets"""
+
+    client_id: str
+    data: Union[bytes, mmap.mmap]
+    offsets: array  # offsets[i]..offsets[i+1] is row i
+    size: int
+    expires_at: float
+    spill_file: Optional[Any] = None
+
+    @property
+    def total_rows(self) -> int:
+        return len(self.offsets) - 1
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        if self.spill_file is not None:
+            self.spill_file.close()
+
+
+def find_rows(result: Any) -> Tuple[Optional[List[Any]], Optional[List[str]]]:
+    """
+    Locate the list of table rows in a result
+
+    Returns:
+        Tuple of (rows, key path to the rows), or (None, None) if not found
+    """
+    if isinstance(result, list):
+        return result, []
+    if not isinstance(result, dict):
+        return None, None
+
+    for key in ROW_KEYS:
+        value = result.get(key)
+        if isinstance(value, list):
+            return value, [key]
+        if isinstance(value, dict):
+            for inner_key in ROW_KEYS:
+                inner = value.get(inner_key)
+                if isinstance(inner, list):
+                    return inner, [key, inner_key]
+    return None, None
+
+
+def parse_result_uri(uri: str) -> Tuple[str, int]:
+    """
+    Parse ambivo://results/{handle}?page={page}
+
+    Returns:
+        Tuple of (handle, page), page defaulting to 0
+    """
+    parsed = urlparse(str(uri))
+    if parsed.scheme != RESULT_URI_SCHEME or parsed.netloc != "results":
+        raise ValueError(f"Unknown resource URI: {uri}")
+
+    handle = parsed.path.strip("/")
+    if not handle:
+        raise ValueError("Result handle is required")
+
+    page_values = parse_qs(parsed.query).get("page", ["0"])
+    try:
+        page = int(page_values[0])
+    except ValueError:
+        raise ValueError("Page must be an integer")
+    return handle, page
+
+
+class ResultStore:
+    """
+    Store large results under opaque handles and serve them page by page
+
+    Rows are encoded once when stored and kept as concatenated JSON with an
+    offset index, so serving a page is a byte slice rather than a re-encode.
+    Results larger than `spill_bytes` are written to an anonymous temp file
+    and memory-mapped. Handles expire after `ttl` seconds and each tenant is
+    limited to `tenant_quota_bytes`, evicting its oldest results first.
+    """
+
+    def __init__(
+        self,
+        page_size: int = 100,
+        ttl: float = 900,
+        tenant_quota_bytes: int = 64 * 1024 * 1024,
+        spill_bytes: int = 1024 * 1024,
+        preview_rows: int = 5,
+    ):
+        self.page_size = page_size
+        self.ttl = ttl
+        self.tenant_quota_bytes = tenant_quota_bytes
+        self.spill_bytes = spill_bytes
+        self.preview_rows = preview_rows
+        self.results: "OrderedDict[str, StoredResult]" = OrderedDict()
+        self.tenant_bytes: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_config(cls, config) -> "ResultStore":
+        """Create a result store from ServerConfig"""
+        return cls(
+            page_size=config.result_page_size,
+            ttl=config.result_ttl,
+            tenant_quota_bytes=config.result_tenant_quota_bytes,
+            spill_bytes=config.result_spill_bytes,
+        )
+
+    def store(self, client_id: str, result: Any) -> Optional[Dict[str, Any]]:
+        """
+        Store the rows of a result and build a summary for the client
+
+        Args:
+            client_id: Tenant owning the result
+            result: Decoded natural_query result
+
+        Returns:
+            Summary dictionary with the handle, or None if the result has no
+            rows to page or does not fit in the tenant quota
+        """
+        self.cleanup()
+
+        rows, path = find_rows(result)
+        if not rows:
+            return None
+
+        buffer = bytearray()
+        offsets = array("Q", [0])
+        for row in rows:
+            buffer += _dumps(row).encode("utf-8")
+            offsets.append(len(buffer))
+
+        size = len(buffer)
+        if size > self.tenant_quota_bytes:
+            logger.warning(
+                f"Result of {size} bytes exceeds tenant quota, returning inline"
+            )
+            return None
+        self._make_room(client_id, size)
+
+        spill_file = None
+        data: Union[bytes, mmap.mmap]
+        if size > self.spill_bytes:
+            spill_file = tempfile.TemporaryFile(prefix="ambivo-result-")
+            spill_file.write(buffer)
+            spill_file.flush()
+            data = mmap.mmap(spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = bytes(buffer)
+        del buffer
+
+        handle = secrets.token_urlsafe(16)
+        self.results[handle] = StoredResult(
+            client_id=client_id,
+            data=data,
+            offsets=offsets,
+            size=size,
+            expires_at=time.monotonic() + self.ttl,
+            spill_file=spill_file,
+        )
+        self.tenant_bytes[client_id] += size
+
+        total_rows = len(rows)
+        summary: Dict[str, Any] = {}
+        if isinstance(result, dict):
+            # Keep non-row fields such as the natural language answer
+            summary = {k: v for k, v in result.items() if k != path[0]}
+            if len(path) == 2:
+                summary[path[0]] = {
+                    k: v for k, v in result[path[0]].items() if k != path[1]
+                }
+        first_row = rows[0]
+        summary.update(
+            {
+                "result_handle": handle,
+                "resource_uri": RESULT_URI_TEMPLATE.format(handle=handle, page=0),
+                "total_rows": total_rows,
+                "page_size": self.page_size,
+                "pages": (total_rows + self.page_size - 1) // self.page_size,
+                "columns": list(first_row) if isinstance(first_row, dict) else None,
+                "preview": rows[: self.preview_rows],
+                "expires_in_seconds": int(self.ttl),
+            }
+        )
+        return summary
+
+    def get_page(self, client_id: str, handle: str, page: int = 0) -> str:
+        """
+        Get one page of rows as JSON text
+
+        Raises:
+            ResultNotFoundError: If the handle is unknown, expired or owned
+                by another tenant
+            ValueError: If the page is out of range
+        """
+        self.cleanup()
+
+        stored = self.results.get(handle)
+        if stored is None or stored.client_id != client_id:
+            raise ResultNotFoundError(f"Result not found or expired: {handle}")
+
+        pages = max(1, (stored.total_rows + self.page_size - 1) // self.page_size)
+        if not 0 <= page < pages:
+            raise ValueError(f"Page out of range. Valid pages: 0-{pages - 1}")
+
+        first = page * self.page_size
+        last = min(first + self.page_size, stored.total_rows)
+        rows = [
+            stored.data[stored.offsets[i] : stored.offsets[i + 1]]
+            for i in range(first, last)
+        ]
+
+        header = _dumps(
+            {
+                "result_handle": handle,
+                "page": page,
+                "pages": pages,
+                "total_rows": stored.total_rows,
+            }
+        )
+        # Rows are already JSON, so the page is assembled without re-encoding
+        return header[:-1] + ',"rows":[' + b",".join(rows).decode("utf-8") + "]}"
+
+    def delete(self, handle: str) -> None:
+        """Release a stored result"""
+        stored = self.results.pop(handle, None)
+        if stored is None:
+            return
+        self.tenant_bytes[stored.client_id] -= stored.size
+        if self.tenant_bytes[stored.client_id] <= 0:
+            del self.tenant_bytes[stored.client_id]
+        stored.close()
+
+    def cleanup(self) -> int:
+        """Release expired results; handles expire in insertion order"""
+        now = time.monotonic()
+        expired = 0
+        while self.results:
+            handle, stored = next(iter(self.results.items()))
+            if stored.expires_at > now:
+                break
+            self.delete(handle)
+            expired += 1
+        return expired
+
+    def _make_room(self, client_id: str, size: int) -> None:
+        """Evict the tenant's oldest results until `size` more bytes fit"""
+        if self.tenant_bytes.get(client_id, 0) + size <= self.tenant_quota_bytes:
+            return
+        for handle in [h for h, r in self.results.items() if r.client_id == client_id]:
+            self.delete(handle)
+            if self.tenant_bytes.get(client_id, 0) + size <= self.tenant_quota_bytes:
+                return
+
+    def close(self) -> None:
+        """Release all stored results"""
+        for handle in list(self.results):
+            self.delete(handle)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get result store statistics"""
+        return {
+            "results": len(self.results),
+            "bytes": sum(self.tenant_bytes.values()),
+            "spilled": sum(1 for r in self.results.values() if r.spill_file),
+            "tenants": len(self.tenant_bytes),
+        }
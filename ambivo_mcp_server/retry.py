@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Retry policy for upstream Ambivo API requests
+"""
+
+import logging
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("ambivo-mcp.retry")
+
+
+def full_jitter_backoff(
+    attempt: int,
+    base: float,
+    cap: float,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """Capped exponential backoff with full jitter: uniform(0, min(cap, base * 2**n))"""
+    return rand() * min(cap, base * (2**attempt))
+
+
+def parse_retry_after(
+    value: Optional[str], now: Optional[float] = None
+) -> Optional[float]:
+    """
+    Parse a Retry-After header value
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date
+        now: Current epoch time, defaults to time.time()
+
+    Returns:
+        Delay in seconds, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None or retry_at.tzinfo is None:
+        return None
+
+    current_time = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - current_time)
+
+
+class RetryBudget:
+    """
+    Token-bucket retry budget
+
+    Every success deposits `ratio` tokens and every retry withdraws one, so
+    retries are limited to a fraction of recent successes. A small time-based
+    refill keeps a trickle of retries available after a full outage.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        max_tokens: float = 10.0,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.last_refill = time.monotonic()
+        self.exhausted = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.tokens = min(self.max_tokens, self.tokens + elapsed * self.min_per_second)
+
+    def record_success(self) -> None:
+        """Deposit tokens for a successful request"""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Withdraw a token for one retry, returning False if the budget is spent"""
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.exhausted += 1
+        return False
+
+
+class RetryPolicy:
+    """Backoff, Retry-After handling, retry budget and per-attempt latency stats"""
+
+    def __init__(
+        self,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        retry_statuses: Iterable[int] = (429, 502, 503, 504),
+        retry_after_max: float = 30.0,
+        budget: Optional[RetryBudget] = None,
+        latency_samples: int = 1000,
+    ):
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_after_max = retry_after_max
+        self.budget = budget or RetryBudget()
+        self.latencies: deque = deque(maxlen=latency_samples)
+        self.attempts = 0
+        self.retries = 0
+
+    @classmethod
+    def from_config(cls, config) -> "RetryPolicy":
+        """Create a retry policy from ServerConfig"""
+        return cls(
+            backoff_base=config.retry_backoff_base,
+            backoff_max=config.retry_backoff_max,
+            retry_statuses=config.retry_statuses,
+            retry_after_max=config.retry_after_max,
+            budget=RetryBudget(
+                ratio=config.retry_budget_ratio,
+                min_per_second=config.retry_budget_min_per_second,
+                max_tokens=config.retry_budget_max_tokens,
+            ),
+        )
+
+    def record_attempt(self, latency: float, outcome: str) -> None:
+        """Record the latency and outcome (status code or error name) of one attempt"""
+        self.attempts += 1
+        self.latencies.append(latency)
+        logger.debug("Upstream attempt finished in %.3fs: %s", latency, outcome)
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retrying after a failed attempt"""
+        return full_jitter_backoff(attempt, self.backoff_base, self.backoff_max)
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """Check whether a response status is worth retrying"""
+        return status_code in self.retry_statuses
+
+    def delay_for_status(
+        self, attempt: int, retry_after: Optional[str]
+    ) -> Optional[float]:
+        """
+        Delay before retrying a retryable status
+
+        Honors Retry-After when present. Returns None when the server asks us
+        to wait longer than retry_after_max, meaning the response should be
+        returned to the caller instead of retried.
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            return self.backoff(attempt)
+        if delay > self.retry_after_max:
+            return None
+        return delay
+
+    def allow_retry(self) -> bool:
+        """Spend retry budget for one retry"""
+        if self.budget.try_acquire():
+            self.retries += 1
+            return True
+        logger.warning("Retry budget exhausted, not retrying upstream request")
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry statistics"""
+        latencies = sorted(self.latencies)
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "budget_exhausted": self.budget.exhausted,
+            "attempt_latency_avg": (
+                sum(latencies) / len(latencies) if latencies else 0.0
+            ),
+            "attempt_latency_max": latencies[-1] if latencies else 0.0,
+        }
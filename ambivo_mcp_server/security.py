@@ -3,78 +3,822 @@
 Security utilities for Ambivo MCP Server
 """
 
+import asyncio
+import base64
 import hashlib
 import json
 import logging
+import math
+import os
 import re
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Set
 
 logger = logging.getLogger("ambivo-mcp.security")
 
 
+class RateLimitPolicy:
+    """
+    Limit applied to a client: max_requests per window_seconds
+
+    Each client's limiter state keeps a reference to its policy, so a policy
+    updated in place applies to what its clients have already used instead
+    of resetting them.
+    """
+
+    __slots__ = ("name", "max_requests", "window_seconds", "burst", "rate")
+
+    def __init__(
+        self,
+        name: str,
+        max_requests: int,
+        window_seconds: int,
+        burst: Optional[int] = None,
+    ):
+        self.name = name
+        self.update(max_requests, window_seconds, burst)
+
+    def update(
+        self, max_requests: int, window_seconds: int, burst: Optional[int] = None
+    ) -> None:
+        """Change the limits, keeping the state of clients under the policy"""
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.burst = burst or max_requests  # token bucket size
+        self.rate = max_requests / window_seconds  # requests per second
+
+    def __repr__(self) -> str:
+        return (
+            f"RateLimitPolicy({self.name!r}, {self.max_requests}, "
+            f"{self.window_seconds}, burst={self.burst})"
+        )
+
+
 @dataclass
 class RateLimitEntry:
     """Rate limit tracking entry"""
 
-    requests: deque = field(default_factory=deque)
+    requests: deque = field(default_factory=deque)  # [timestamp, cost] pairs
     window_start: float = field(default_factory=time.time)
+    used: float = 0.0  # total cost of the requests in the window
+    policy: Optional[RateLimitPolicy] = None
+
+
+def _whole_requests(cost: float) -> int:
+    """Round a charged cost up to whole requests for reporting"""
+    return int(math.ceil(round(cost, 6)))
+
+
+class BaseRateLimiter:
+    """
+    Shared bookkeeping of the in-memory rate limiters
 
+    Subclasses keep one state object per client in `clients` and say when a
+    client is idle, i.e. has no requests left in the window. Idle clients are
+    swept every `sweep_interval` seconds from is_allowed, so the table only
+    holds recently active clients.
 
-class RateLimiter:
-    """Simple in-memory rate limiter"""
+    Requests may cost more or less than one request of the limit: a cost is
+    charged on admission and can be corrected afterwards with adjust(), or
+    reconcile() from a coroutine. A request may also carry the policy of its client's tier; without one the
+    limiter's default policy applies.
+    """
 
-    def __init__(self, max_requests: int = 100, window_seconds: int = 3600):
+    algorithm = ""
+
+    def __init__(
+        self,
+        max_requests: int = 100,
+        window_seconds: int = 3600,
+        sweep_interval: float = 60.0,
+    ):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.clients: Dict[str, RateLimitEntry] = {}
-
-    def is_allowed(self, client_id: str) -> bool:
-        """Check if client is within rate limits"""
+        self.sweep_interval = sweep_interval
+        self.default_policy = RateLimitPolicy("default", max_requests, window_seconds)
+        self.clients: Dict[str, Any] = {}
+        self.last_sweep = time.time()
+        self.swept = 0
+        # Optional heavy-hitter tracker (heavy_hitters.RateLimitUsage)
+        self.usage: Optional[Any] = None
+
+    def is_allowed(
+        self,
+        client_id: str,
+        cost: float = 1.0,
+        policy: Optional[RateLimitPolicy] = None,
+    ) -> bool:
+        """Check if client is within rate limits, charging `cost` requests"""
         current_time = time.time()
+        if current_time - self.last_sweep >= self.sweep_interval:
+            self.sweep(current_time)
+
+        allowed = self._admit(
+            client_id, current_time, cost, policy or self.default_policy
+        )
+        if self.usage is not None:
+            self.usage.record(client_id, cost, allowed)
+        if not allowed:
+            logger.warning("Rate limit exceeded for client: %s", client_id)
+        return allowed
+
+    async def acquire(
+        self,
+        client_id: str,
+        max_delay: float = 0.0,
+        cost: float = 1.0,
+        policy: Optional[RateLimitPolicy] = None,
+    ) -> Optional[float]:
+        """
+        Admit a request, waiting up to `max_delay` seconds for a permit
+
+        Limiters that cannot queue requests admit or reject immediately.
+
+        Returns:
+            Seconds waited, or None if the request is rejected
+        """
+        return 0.0 if self.is_allowed(client_id, cost, policy) else None
+
+    def adjust(self, client_id: str, delta: float) -> None:
+        """
+        Correct the cost charged to a client by `delta` requests
+
+        Reconciles a provisional cost with the measured one after the request
+        has run: extra cost is charged even beyond the limit, and a negative
+        delta refunds part of the charge.
+        """
+        if delta and client_id in self.clients:
+            self._adjust(client_id, time.time(), delta)
+            if self.usage is not None:
+                self.usage.charge(client_id, delta)
+
+    async def reconcile(self, client_id: str, delta: float) -> None:
+        """
+        Correct the cost charged to a client from the event loop
+
+        Same as adjust(); limiters with shared state make their round trip
+        in a worker thread.
+        """
+        self.adjust(client_id, delta)
+
+    def policy_of(self, client_id: str) -> RateLimitPolicy:
+        """Get the policy a client was last limited by"""
+        state = self.clients.get(client_id)
+        return state.policy if state is not None else self.default_policy
+
+    def _admit(
+        self, client_id: str, now: float, cost: float, policy: RateLimitPolicy
+    ) -> bool:
+        raise NotImplementedError
+
+    def _adjust(self, client_id: str, now: float, delta: float) -> None:
+        raise NotImplementedError
+
+    def _is_idle(self, entry: Any, now: float) -> bool:
+        raise NotImplementedError
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop idle clients; returns how many were removed"""
+        now = time.time() if now is None else now
+        idle = [
+            client_id
+            for client_id, entry in self.clients.items()
+            if self._is_idle(entry, now)
+        ]
+        for client_id in idle:
+            del self.clients[client_id]
+        self.last_sweep = now
+        self.swept += len(idle)
+        return len(idle)
+
+    def release(self, client_id: str) -> bool:
+        """
+        Forget a client that has no requests left in the window
+
+        Clients with requests still in the window are kept, so releasing one
+        never hands it a fresh quota.
+        """
+        entry = self.clients.get(client_id)
+        if entry is None or not self._is_idle(entry, time.time()):
+            return False
+        del self.clients[client_id]
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        return {
+            "algorithm": self.algorithm,
+            "clients": len(self.clients),
+            "swept": self.swept,
+        }
+
+    def close(self) -> None:
+        """Release resources held by the limiter"""
+
+
+class RateLimiter(BaseRateLimiter):
+    """
+    Simple in-memory rate limiter
+
+    Exact sliding log: keeps the timestamp and cost of every request in the
+    window, so memory grows with clients x max_requests.
+    """
 
+    algorithm = "sliding_log"
+
+    def _admit(
+        self, client_id: str, now: float, cost: float, policy: RateLimitPolicy
+    ) -> bool:
         if client_id not in self.clients:
             self.clients[client_id] = RateLimitEntry()
 
         entry = self.clients[client_id]
+        entry.policy = policy
 
         # Clean old requests outside the window
-        cutoff_time = current_time - self.window_seconds
-        while entry.requests and entry.requests[0] < cutoff_time:
-            entry.requests.popleft()
+        cutoff_time = now - policy.window_seconds
+        while entry.requests and entry.requests[0][0] < cutoff_time:
+            entry.used -= entry.requests.popleft()[1]
+        if not entry.requests:
+            entry.used = 0.0
 
         # Check rate limit
-        if len(entry.requests) >= self.max_requests:
-            logger.warning(f"Rate limit exceeded for client: {client_id}")
+        if entry.used + cost > policy.max_requests:
             return False
 
         # Add current request
-        entry.requests.append(current_time)
+        entry.requests.append([now, cost])
+        entry.used += cost
         return True
 
+    def _adjust(self, client_id: str, now: float, delta: float) -> None:
+        entry = self.clients[client_id]
+        if delta > 0:
+            entry.requests.append([now, delta])
+            entry.used += delta
+            return
+        # Refund from the newest requests, which stay in the window longest
+        refund = -delta
+        for request in reversed(entry.requests):
+            taken = min(request[1], refund)
+            request[1] -= taken
+            entry.used -= taken
+            refund -= taken
+            if refund <= 0:
+                break
+
+    def _is_idle(self, entry: RateLimitEntry, now: float) -> bool:
+        return (
+            not entry.requests
+            or entry.requests[-1][0] < now - entry.policy.window_seconds
+        )
+
     def get_client_stats(self, client_id: str) -> Dict[str, Any]:
         """Get rate limit statistics for a client"""
         if client_id not in self.clients:
             return {"requests": 0, "remaining": self.max_requests}
 
         entry = self.clients[client_id]
-        current_requests = len(entry.requests)
-        remaining = max(0, self.max_requests - current_requests)
+        policy = entry.policy
+        current_requests = _whole_requests(entry.used)
+        remaining = max(0, policy.max_requests - current_requests)
 
         return {
             "requests": current_requests,
             "remaining": remaining,
-            "window_seconds": self.window_seconds,
+            "window_seconds": policy.window_seconds,
             "reset_time": (
-                entry.requests[0] + self.window_seconds
+                entry.requests[0][0] + policy.window_seconds
                 if entry.requests
                 else time.time()
             ),
         }
 
 
+class SlidingWindowState:
+    """Request counts of a client's current and previous fixed windows"""
+
+    __slots__ = ("window_start", "current", "previous", "policy")
+
+    def __init__(self, window_start: float, policy: RateLimitPolicy):
+        self.window_start = window_start
+        self.current = 0
+        self.previous = 0
+        self.policy = policy
+
+
+class SlidingWindowRateLimiter(BaseRateLimiter):
+    """
+    Sliding window counter rate limiter
+
+    Approximates the sliding log from two counters: the previous fixed
+    window's count, weighted by how much of it still overlaps the sliding
+    window, plus the current window's count. Memory per client is constant.
+    """
+
+    algorithm = "sliding_window"
+
+    @staticmethod
+    def _roll(state: SlidingWindowState, now: float) -> None:
+        """Advance a client's windows to the one containing `now`"""
+        window_seconds = state.policy.window_seconds
+        elapsed_windows = int((now - state.window_start) // window_seconds)
+        if elapsed_windows <= 0:
+            return
+        state.previous = state.current if elapsed_windows == 1 else 0
+        state.current = 0
+        state.window_start += elapsed_windows * window_seconds
+
+    @staticmethod
+    def _estimate(state: SlidingWindowState, now: float) -> float:
+        overlap = 1.0 - (now - state.window_start) / state.policy.window_seconds
+        return state.previous * overlap + state.current
+
+    def _admit(
+        self, client_id: str, now: float, cost: float, policy: RateLimitPolicy
+    ) -> bool:
+        state = self.clients.get(client_id)
+        if state is None:
+            state = self.clients[client_id] = SlidingWindowState(now, policy)
+        else:
+            state.policy = policy
+            self._roll(state, now)
+
+        if self._estimate(state, now) + cost > policy.max_requests:
+            return False
+        state.current += cost
+        return True
+
+    def _adjust(self, client_id: str, now: float, delta: float) -> None:
+        state = self.clients[client_id]
+        self._roll(state, now)
+        state.current = max(0, state.current + delta)
+
+    def _is_idle(self, state: SlidingWindowState, now: float) -> bool:
+        # Both counted windows are fully outside the sliding window
+        return now >= state.window_start + 2 * state.policy.window_seconds
+
+    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        """Get rate limit statistics for a client"""
+        state = self.clients.get(client_id)
+        if state is None:
+            return {"requests": 0, "remaining": self.max_requests}
+
+        now = time.time()
+        self._roll(state, now)
+        policy = state.policy
+        requests = _whole_requests(self._estimate(state, now))
+        return {
+            "requests": requests,
+            "remaining": max(0, policy.max_requests - requests),
+            "window_seconds": policy.window_seconds,
+            "reset_time": state.window_start + policy.window_seconds,
+        }
+
+
+class GCRAState:
+    """Theoretical arrival time of a client's next request"""
+
+    __slots__ = ("tat", "interval", "policy")
+
+    def __init__(self, tat: float, policy: RateLimitPolicy):
+        self.tat = tat
+        self.interval = 1 / policy.rate  # emission interval the tat is spaced by
+        self.policy = policy
+
+
+class GCRARateLimiter(BaseRateLimiter):
+    """
+    Generic cell rate algorithm (GCRA) rate limiter
+
+    Requests are spaced one emission interval (window / max_requests) apart,
+    with a burst of up to max_requests. A client's whole state is a single
+    timestamp, the theoretical arrival time of its next request.
+    """
+
+    algorithm = "gcra"
+
+    @staticmethod
+    def _rescale(state: GCRAState, now: float) -> None:
+        """Respace a client's backlog after its policy's rate changed"""
+        interval = 1 / state.policy.rate
+        if state.interval != interval:
+            if state.tat > now:
+                state.tat = now + (state.tat - now) / state.interval * interval
+            state.interval = interval
+
+    def _admit(
+        self, client_id: str, now: float, cost: float, policy: RateLimitPolicy
+    ) -> bool:
+        state = self.clients.get(client_id)
+        if state is None:
+            state = self.clients[client_id] = GCRAState(now, policy)
+        else:
+            state.policy = policy
+            self._rescale(state, now)
+
+        tat = max(state.tat, now)
+        new_tat = tat + cost * state.interval
+        if new_tat - now > policy.window_seconds:
+            return False
+        state.tat = new_tat
+        return True
+
+    def _adjust(self, client_id: str, now: float, delta: float) -> None:
+        state = self.clients[client_id]
+        self._rescale(state, now)
+        state.tat = max(state.tat, now) + delta * state.interval
+
+    def _is_idle(self, state: GCRAState, now: float) -> bool:
+        return state.tat <= now
+
+    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        """Get rate limit statistics for a client"""
+        state = self.clients.get(client_id)
+        if state is None:
+            return {"requests": 0, "remaining": self.max_requests}
+
+        now = time.time()
+        self._rescale(state, now)
+        policy = state.policy
+        emission_interval = state.interval
+        backlog = max(0.0, state.tat - now)
+        requests = min(
+            policy.max_requests, _whole_requests(backlog / emission_interval)
+        )
+        return {
+            "requests": requests,
+            "remaining": policy.max_requests - requests,
+            "window_seconds": policy.window_seconds,
+            # When the next request is admitted
+            "reset_time": now
+            + max(0.0, backlog + emission_interval - policy.window_seconds),
+        }
+
+
+class TokenBucketState:
+    """Tokens left in a client's bucket; negative while calls wait for one"""
+
+    __slots__ = ("tokens", "updated", "burst", "policy")
+
+    def __init__(self, tokens: float, updated: float, policy: RateLimitPolicy):
+        self.tokens = tokens
+        self.updated = updated
+        self.burst = policy.burst  # bucket size the tokens are counted against
+        self.policy = policy
+
+
+class TokenBucketRateLimiter(BaseRateLimiter):
+    """
+    Token bucket rate limiter that can queue requests
+
+    Each client's bucket holds up to `burst` tokens and refills at
+    max_requests per window. A call without a token available may reserve
+    the next one and wait for it in acquire(), as long as the wait stays
+    within its maximum delay; reservations are served in arrival order.
+    """
+
+    algorithm = "token_bucket"
+
+    def __init__(
+        self,
+        max_requests: int = 100,
+        window_seconds: int = 3600,
+        sweep_interval: float = 60.0,
+        burst: Optional[int] = None,
+    ):
+        super().__init__(max_requests, window_seconds, sweep_interval)
+        self.default_policy = RateLimitPolicy(
+            "default", max_requests, window_seconds, burst
+        )
+        self.burst = self.default_policy.burst
+        self.waiting = 0
+        self.queued = 0
+
+    @staticmethod
+    def _refill(state: TokenBucketState, now: float) -> None:
+        policy = state.policy
+        if state.burst != policy.burst:
+            # Keep the tokens already used when the bucket is resized
+            state.tokens += policy.burst - state.burst
+            state.burst = policy.burst
+        state.tokens = min(
+            policy.burst, state.tokens + (now - state.updated) * policy.rate
+        )
+        state.updated = now
+
+    def _reserve(
+        self,
+        client_id: str,
+        now: float,
+        max_delay: float,
+        cost: float,
+        policy: RateLimitPolicy,
+    ) -> Optional[float]:
+        """Take tokens, or reserve the next ones if they come within max_delay"""
+        state = self.clients.get(client_id)
+        if state is None:
+            state = self.clients[client_id] = TokenBucketState(
+                policy.burst, now, policy
+            )
+        else:
+            state.policy = policy
+            self._refill(state, now)
+
+        wait = max(0.0, (cost - state.tokens) / policy.rate)
+        if wait > max_delay:
+            return None
+        state.tokens -= cost
+        return wait
+
+    def _admit(
+        self, client_id: str, now: float, cost: float, policy: RateLimitPolicy
+    ) -> bool:
+        return self._reserve(client_id, now, 0.0, cost, policy) is not None
+
+    def _adjust(self, client_id: str, now: float, delta: float) -> None:
+        state = self.clients[client_id]
+        self._refill(state, now)
+        state.tokens = min(state.policy.burst, state.tokens - delta)
+
+    async def acquire(
+        self,
+        client_id: str,
+        max_delay: float = 0.0,
+        cost: float = 1.0,
+        policy: Optional[RateLimitPolicy] = None,
+    ) -> Optional[float]:
+        """
+        Admit a request, waiting up to `max_delay` seconds for a permit
+
+        Returns:
+            Seconds waited, or None if no permit is available in time
+        """
+        now = time.time()
+        if now - self.last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+        wait = self._reserve(
+            client_id, now, max_delay, cost, policy or self.default_policy
+        )
+        if self.usage is not None:
+            self.usage.record(client_id, cost, wait is not None)
+        if wait is None:
+            logger.warning("Rate limit exceeded for client: %s", client_id)
+            return None
+        if wait > 0:
+            self.queued += 1
+            self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Hand the reserved tokens back to the calls queued behind
+                state = self.clients.get(client_id)
+                if state is not None:
+                    state.tokens += cost
+                raise
+            finally:
+                self.waiting -= 1
+        return wait
+
+    def _is_idle(self, state: TokenBucketState, now: float) -> bool:
+        return state.tokens + (now - state.updated) * state.policy.rate >= state.burst
+
+    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        """Get rate limit statistics for a client"""
+        state = self.clients.get(client_id)
+        if state is None:
+            return {"requests": 0, "remaining": self.burst}
+
+        now = time.time()
+        self._refill(state, now)
+        policy = state.policy
+        tokens = state.tokens
+        return {
+            "requests": _whole_requests(policy.burst - tokens),
+            "remaining": max(0, int(tokens)),
+            "window_seconds": policy.window_seconds,
+            # When the next token is available
+            "reset_time": now + max(0.0, (1 - tokens) / policy.rate),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        stats = super().get_stats()
+        stats["waiting"] = self.waiting
+        stats["queued"] = self.queued
+        return stats
+
+
+RATE_LIMITERS = {
+    limiter.algorithm: limiter
+    for limiter in (
+        RateLimiter,
+        SlidingWindowRateLimiter,
+        GCRARateLimiter,
+        TokenBucketRateLimiter,
+    )
+}
+
+
+def create_rate_limiter(
+    algorithm: str = "sliding_log",
+    max_requests: int = 100,
+    window_seconds: int = 3600,
+    sweep_interval: float = 60.0,
+    burst: Optional[int] = None,
+) -> BaseRateLimiter:
+    """
+    Create a rate limiter
+
+    Args:
+        algorithm: "sliding_log" (exact, one timestamp per request),
+            "sliding_window" (two counters per client), "gcra" (one
+            timestamp per client) or "token_bucket" (queues requests)
+        max_requests: Requests allowed per window
+        window_seconds: Window length
+        sweep_interval: Seconds between sweeps of idle clients
+        burst: Bucket size of the token bucket; defaults to max_requests
+    """
+    try:
+        cls = RATE_LIMITERS[algorithm]
+    except KeyError:
+        raise ValueError(
+            f"Unknown rate limit algorithm: {algorithm}. "
+            f"Choose from: {', '.join(RATE_LIMITERS)}"
+        )
+    if cls is TokenBucketRateLimiter:
+        return cls(max_requests, window_seconds, sweep_interval, burst=burst)
+    return cls(max_requests, window_seconds, sweep_interval)
+
+
+def _token_claim(token: str, claim: str) -> Optional[str]:
+    """
+    Read a claim from a JWT payload without verifying the signature
+
+    Only used to pick a rate limit tier; the API verifies the token itself.
+    """
+    try:
+        payload = token.split(".")[1]
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        return None
+    value = data.get(claim) if isinstance(data, dict) else None
+    return str(value) if value is not None else None
+
+
+class RateLimitTiers:
+    """
+    Rate limit policies of tenant tiers
+
+    Tenants are assigned to tiers by client ID, or by the value of a token
+    claim (which may also name the tier directly); everyone else gets the
+    default policy. Assignments are resolved into one dict of policies when
+    loaded, and a tenant's policy is memoized by client ID, so the lookup on
+    each call is a single dict get.
+
+    update() changes the policies in place. Limiter state keeps a reference
+    to its policy, so new limits apply to what tenants have already used
+    rather than starting them over.
+    """
+
+    def __init__(
+        self,
+        default: RateLimitPolicy,
+        tiers: Optional[Dict[str, Dict[str, Any]]] = None,
+        tenants: Optional[Dict[str, str]] = None,
+        claim: Optional[str] = None,
+        path: Optional[str] = None,
+        reload_interval: float = 5.0,
+        max_memo: int = 100000,
+    ):
+        self.default = default
+        self.claim = claim
+        self.path = path
+        self.reload_interval = reload_interval
+        self.max_memo = max_memo
+        self.policies: Dict[str, RateLimitPolicy] = {}
+        self.assignments: Dict[str, RateLimitPolicy] = {}
+        self.memo: Dict[str, RateLimitPolicy] = {}
+        self.base_tiers = tiers or {}
+        self.base_tenants = tenants or {}
+        self.file_mtime: Optional[float] = None
+        self.next_reload = 0.0
+        self.reloads = 0
+        if not (path and self.reload()):
+            self.update(self.base_tiers, self.base_tenants)
+
+    @classmethod
+    def from_config(cls, config, default: RateLimitPolicy) -> "RateLimitTiers":
+        """Create the tiers from ServerConfig"""
+        return cls(
+            default,
+            tiers=config.rate_limit_tiers,
+            tenants=config.rate_limit_tenant_tiers,
+            claim=config.rate_limit_tier_claim,
+            path=config.rate_limit_tiers_file,
+        )
+
+    def update(self, tiers: Dict[str, Dict[str, Any]], tenants: Dict[str, str]) -> None:
+        """
+        Replace the tier policies and tenant assignments
+
+        Raises:
+            ValueError: If a tier's limits are invalid or a tenant is assigned
+                to an unknown tier
+        """
+        limits = {}
+        for name, spec in tiers.items():
+            requests = int(spec["requests"])
+            window = int(spec.get("window", self.default.window_seconds))
+            burst = spec.get("burst")
+            burst = int(burst) if burst is not None else None
+            if requests <= 0 or window <= 0 or (burst is not None and burst <= 0):
+                raise ValueError(f"Rate limit tier {name!r} must have positive limits")
+            limits[name] = (requests, window, burst)
+        unknown = sorted(set(tenants.values()) - set(limits))
+        if unknown:
+            raise ValueError(f"Unknown rate limit tiers: {', '.join(unknown)}")
+
+        for name, (requests, window, burst) in limits.items():
+            policy = self.policies.get(name)
+            if policy is None:
+                self.policies[name] = RateLimitPolicy(name, requests, window, burst)
+            else:
+                policy.update(requests, window, burst)
+        # Dropped tiers fall back to the default on the tenants' next call
+        for name in set(self.policies) - set(limits):
+            del self.policies[name]
+        self.assignments = {key: self.policies[tier] for key, tier in tenants.items()}
+        self.memo.clear()
+
+    def reload(self) -> bool:
+        """
+        Reload the tiers file if it changed
+
+        The file holds {"tiers": {...}, "tenants": {...}}, merged over the
+        tiers and tenants given at construction. An unreadable or invalid
+        file is logged and the current policies are kept.
+
+        Returns:
+            True if new policies were loaded
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self.file_mtime:
+                return False
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.update(
+                {**self.base_tiers, **data.get("tiers", {})},
+                {**self.base_tenants, **data.get("tenants", {})},
+            )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Failed to load rate limit tiers from {self.path}: {e}")
+            return False
+        self.file_mtime = mtime
+        self.reloads += 1
+        return True
+
+    def resolve(self, client_id: str, token: Optional[str] = None) -> RateLimitPolicy:
+        """Get the rate limit policy of a tenant"""
+        if self.path:
+            now = time.monotonic()
+            if now >= self.next_reload:
+                self.next_reload = now + self.reload_interval
+                self.reload()
+
+        policy = self.memo.get(client_id)
+        if policy is not None:
+            return policy
+
+        policy = self.assignments.get(client_id)
+        if policy is None and self.claim and token:
+            value = _token_claim(token, self.claim)
+            if value is not None:
+                policy = self.assignments.get(value) or self.policies.get(value)
+        policy = policy or self.default
+        if len(self.memo) >= self.max_memo:
+            self.memo.clear()
+        self.memo[client_id] = policy
+        return policy
+
+    def forget(self, client_id: str) -> None:
+        """Drop a tenant's memoized policy"""
+        self.memo.pop(client_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tier statistics"""
+        return {
+            "tiers": len(self.policies),
+            "assignments": len(self.assignments),
+            "memoized": len(self.memo),
+            "reloads": self.reloads,
+        }
+
+
 class InputValidator:
     """Input validation utilities"""
 
@@ -122,7 +866,7 @@ class InputValidator:
         if self.dangerous_regex.search(query):
             raise ValueError("Query contains potentially dangerous content")
 
-        logger.debug(f"Query validation passed for: {query[:50]}...")
+        logger.debug("Query validation passed for: %.50s...", query)
 
     def validate_entity_type(self, entity_type: str, allowed_types: List[str]) -> None:
         """Validate entity type"""
@@ -252,16 +996,41 @@ class InputValidator:
 
 
 class TokenValidator:
-    """JWT token validation utilities"""
+    """
+    JWT token validation utilities
 
-    def __init__(self, cache_ttl: int = 300):
+    Validated tokens are cached for cache_ttl seconds in an OrderedDict kept
+    in expiry order: every token gets the same TTL and is moved to the end
+    when cached again, so expired tokens are always at the front and cleanup
+    never scans the cache. At most max_cache_size tokens are kept, the ones
+    expiring soonest are evicted first.
+
+    The cache holds no raw tokens: it is keyed by the token's SHA-256 digest,
+    which is also where client IDs come from. Callers that need both can
+    compute the digest once with token_digest() and pass it along.
+    """
+
+    def __init__(self, cache_ttl: int = 300, max_cache_size: int = 10000):
         self.cache_ttl = cache_ttl
-        self.token_cache: Dict[str, Dict[str, Any]] = {}
+        self.max_cache_size = max_cache_size
+        self.token_cache: "OrderedDict[bytes, float]" = OrderedDict()  # -> expiry
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def token_digest(token: str) -> bytes:
+        """SHA-256 digest of a token, keying the cache and its client ID"""
+        return hashlib.sha256(token.encode()).digest()
+
+    @staticmethod
+    def client_id_from_digest(digest: bytes) -> str:
+        """Client ID of the token with this digest"""
+        return digest[:8].hex()
 
     def get_client_id_from_token(self, token: str) -> str:
         """Extract client ID from token for rate limiting"""
         # Use hash of token as client ID for privacy
-        return hashlib.sha256(token.encode()).hexdigest()[:16]
+        return self.client_id_from_digest(self.token_digest(token))
 
     def validate_token_format(self, token: str) -> None:
         """Basic JWT token format validation"""
@@ -283,39 +1052,47 @@ class TokenValidator:
         if not re.match(r"^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$", token):
             raise ValueError("Token contains invalid characters")
 
-    def is_token_cached(self, token: str) -> bool:
+    def is_token_cached(self, token: str, digest: Optional[bytes] = None) -> bool:
         """Check if token is in cache and still valid"""
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
-
-        if token_hash in self.token_cache:
-            cache_entry = self.token_cache[token_hash]
-            if time.time() - cache_entry["timestamp"] < self.cache_ttl:
-                return True
-            else:
-                # Remove expired entry
-                del self.token_cache[token_hash]
+        digest = digest or self.token_digest(token)
+        expires_at = self.token_cache.get(digest)
+        if expires_at is None:
+            return False
+        if time.time() < expires_at:
+            return True
 
+        # Remove expired entry
+        del self.token_cache[digest]
+        self.expirations += 1
         return False
 
-    def cache_token(self, token: str) -> None:
+    def cache_token(self, token: str, digest: Optional[bytes] = None) -> None:
         """Cache a validated token"""
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
-        self.token_cache[token_hash] = {
-            "timestamp": time.time(),
-            "client_id": self.get_client_id_from_token(token),
+        now = time.time()
+        digest = digest or self.token_digest(token)
+        self.token_cache[digest] = now + self.cache_ttl
+        self.token_cache.move_to_end(digest)
+
+        self._cleanup_cache(now)
+        while len(self.token_cache) > self.max_cache_size:
+            self.token_cache.popitem(last=False)
+            self.evictions += 1
+
+    def _cleanup_cache(self, now: Optional[float] = None) -> None:
+        """Remove expired cache entries, which are at the front"""
+        now = time.time() if now is None else now
+        token_cache = self.token_cache
+        while token_cache:
+            digest, expires_at = next(iter(token_cache.items()))
+            if expires_at > now:
+                break
+            del token_cache[digest]
+            self.expirations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get token cache statistics"""
+        return {
+            "cached": len(self.token_cache),
+            "expirations": self.expirations,
+            "evictions": self.evictions,
         }
-
-        # Clean old entries periodically
-        self._cleanup_cache()
-
-    def _cleanup_cache(self) -> None:
-        """Remove expired cache entries"""
-        current_time = time.time()
-        expired_keys = [
-            key
-            for key, value in self.token_cache.items()
-            if current_time - value["timestamp"] > self.cache_ttl
-        ]
-
-        for key in expired_keys:
-            del self.token_cache[key]
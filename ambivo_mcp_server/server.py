@@ -5,360 +5,154 @@ MCP Server for Ambivo API Endpoints
 This MCP server provides access to Ambivo's entity/natural_query endpoint
 through standardized MCP tools. It handles authentication via JWT Bearer tokens with
 enhanced security, configuration management, and error handling.
+
+Importing this module is cheap: configuration, logging, the HTTP client and
+the MCP server are built by create_app(), which main() calls, and the mcp
+SDK and httpx are only imported then.
 """
 
-import asyncio
-import json
+import argparse
 import logging
 import os
-import time
-from typing import Any, Dict, List, Optional
-
-import httpx
-from mcp import types
-from mcp.server import NotificationOptions, Server
-from mcp.server.models import InitializationOptions
+from typing import TYPE_CHECKING, Any, List, Optional
 
-# Import from package modules
 from .config import ServerConfig, load_config
-from .security import InputValidator, RateLimiter, TokenValidator
-
-# Load configuration
-try:
-    config_path = os.getenv("AMBIVO_CONFIG_FILE")
-    config = load_config(config_path)
-    logger = config.setup_logging()
-except Exception as e:
-    # Fallback logging if config fails
-    logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger("ambivo-mcp")
-    logger.error(f"Failed to load configuration: {e}")
-    # Use default config
-    config = ServerConfig()
-
-# Initialize  security components
-rate_limiter = RateLimiter(
-    max_requests=config.rate_limit_requests, window_seconds=config.rate_limit_window
-)
-input_validator = InputValidator(
-    max_query_length=config.max_query_length, max_payload_size=config.max_payload_size
-)
-token_validator = TokenValidator(cache_ttl=config.token_cache_ttl)
-
-# Server configuration
-server = Server(config.server_name)
-
-
-class AmbivoAPIClient:
-    """Client for interacting with Ambivo API endpoints with enhanced error handling"""
-
-    def __init__(self, config: ServerConfig, auth_token: Optional[str] = None):
-        self.config = config
-        self.base_url = config.base_url.rstrip("/")
-        self.auth_token = auth_token
-        self.client = httpx.AsyncClient(timeout=config.timeout)
-        self.logger = logging.getLogger("ambivo-mcp.client")
-
-    def set_auth_token(self, token: str):
-        """Set the authentication token with validation"""
-        try:
-            if self.config.token_validation_enabled:
-                token_validator.validate_token_format(token)
-            self.auth_token = token
-            self.logger.info("Authentication token set successfully")
-        except ValueError as e:
-            self.logger.error(f"Invalid token format: {e}")
-            raise
-
-    def _get_headers(self) -> Dict[str, str]:
-        """Get headers for API requests"""
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        if self.auth_token:
-            headers["Authorization"] = f"Bearer {self.auth_token}"
-        return headers
-
-    async def _make_request_with_retry(
-        self, method: str, url: str, **kwargs
-    ) -> httpx.Response:
-        """Make HTTP request with retry logic"""
-        last_exception = None
-
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                response = await self.client.request(method, url, **kwargs)
-                return response
-            except (httpx.TimeoutException, httpx.ConnectError, httpx.ReadError) as e:
-                last_exception = e
-                if attempt < self.config.max_retries:
-                    wait_time = 2**attempt  # Exponential backoff
-                    self.logger.warning(
-                        f"Request attempt {attempt + 1} failed, retrying in {wait_time}s: {e}"
-                    )
-                    await asyncio.sleep(wait_time)
-                else:
-                    self.logger.error(
-                        f"All {self.config.max_retries + 1} request attempts failed"
-                    )
-                    raise
-
-        # This should never be reached, but just in case
-        raise last_exception
-
-    async def natural_query(
-        self, query: str, response_format: str = "both"
-    ) -> Dict[str, Any]:
-        """
-        Execute a natural language query against entity data with validation and error handling
-
-        Args:
-            query: Natural language query string
-            response_format: Response format - "table", "natural", or "both"
-
-        Returns:
-            API response dictionary
-        """
-        # Validate inputs
-        input_validator.validate_query(query)
-
-        if response_format not in ["table", "natural", "both"]:
-            raise ValueError(
-                "Invalid response_format. Must be 'table', 'natural', or 'both'"
-            )
 
-        payload = {"query": query, "response_format": response_format}
-
-        url = f"{self.base_url}/entity/natural_query"
+if TYPE_CHECKING:
+    import socket
+
+    from .app import AmbivoMCPApp
+    from .workers import WorkerRuntime
+
+logger = logging.getLogger("ambivo-mcp")
+
+# Application built by the first create_app() call without an explicit config
+_app: Optional["AmbivoMCPApp"] = None
+
+# Names this module exposed before the application factory, now served lazily
+_APP_ATTRIBUTES = {
+    "config": "config",
+    "rate_limiter": "rate_limiter",
+    "input_validator": "input_validator",
+    "token_validator": "token_validator",
+    "server": "server",
+    "metrics": "metrics",
+    "tracer": "tracer",
+    "api_client": "api_client",
+    "result_store": "result_store",
+    "handle_list_tools": "list_tools",
+    "handle_list_resource_templates": "list_resource_templates",
+    "handle_read_resource": "read_resource",
+    "handle_call_tool": "call_tool",
+    "run_batch_natural_query": "run_batch_natural_query",
+}
+
+
+def load_server_config() -> ServerConfig:
+    """Load configuration and set up logging, falling back to defaults"""
+    global logger
+    try:
+        config_path = os.getenv("AMBIVO_CONFIG_FILE")
+        config = load_config(config_path)
+        logger = config.setup_logging()
+    except Exception as e:
+        # Fallback logging if config fails
+        logging.basicConfig(level=logging.INFO)
+        logger = logging.getLogger("ambivo-mcp")
+        logger.error(f"Failed to load configuration: {e}")
+        # Use default config
+        config = ServerConfig()
+    return config
 
-        try:
-            self.logger.info(f"Executing natural query: {query[:100]}...")
-            start_time = time.time()
 
-            response = await self._make_request_with_retry(
-                "POST", url, json=payload, headers=self._get_headers()
-            )
+def create_app(config: Optional[ServerConfig] = None) -> "AmbivoMCPApp":
+    """
+    Build the MCP application
 
-            elapsed_time = time.time() - start_time
-            self.logger.info(f"Natural query completed in {elapsed_time:.2f}s")
+    Args:
+        config: Server configuration; loaded from AMBIVO_CONFIG_FILE or the
+            environment when omitted
 
-            response.raise_for_status()
-            result = response.json()
+    Returns:
+        AmbivoMCPApp with its API client, security components and MCP server
+    """
+    global _app
+    from .app import AmbivoMCPApp
 
-            self.logger.debug(f"API response: {json.dumps(result, indent=2)[:500]}...")
-            return result
+    if config is not None:
+        return AmbivoMCPApp(config, logger)
 
-        except httpx.TimeoutException as e:
-            self.logger.error(f"Natural query timeout: {e}")
-            raise Exception(f"Request timeout after {self.config.timeout}s")
-        except httpx.HTTPStatusError as e:
-            self.logger.error(
-                f"Natural query HTTP error: {e.response.status_code} - {e.response.text}"
-            )
-            raise
-        except Exception as e:
-            self.logger.error(f"Natural query unexpected error: {e}")
-            raise
+    if _app is None:
+        _app = AmbivoMCPApp(load_server_config(), logger)
+    return _app
 
-    async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
 
+def __getattr__(name: str) -> Any:
+    """Build the default application on first access to its components"""
+    if name == "AmbivoAPIClient":
+        from .api_client import AmbivoAPIClient
 
-# Global client instance
-api_client = AmbivoAPIClient(config, auth_token=config.auth_token)
+        return AmbivoAPIClient
+    if name in _APP_ATTRIBUTES:
+        return getattr(create_app(), _APP_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-@server.list_tools()
-async def handle_list_tools() -> List[types.Tool]:
-    """
-    List available tools.
+async def main(
+    app: Optional["AmbivoMCPApp"] = None,
+    sock: Optional["socket.socket"] = None,
+    runtime: Optional["WorkerRuntime"] = None,
+):
     """
-    return [
-        types.Tool(
-            name="natural_query",
-            description="Execute natural language queries against Ambivo entity data. "
-            "This tool processes natural language queries and returns structured data "
-            "about leads, contacts, opportunities, and other entities.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Natural language query describing what data you want to retrieve. "
-                        "Examples: 'Show me leads created this week', 'Find contacts with gmail addresses', "
-                        "'List opportunities worth more than $10,000'",
-                    },
-                    "response_format": {
-                        "type": "string",
-                        "enum": ["table", "natural", "both"],
-                        "default": "both",
-                        "description": "Format of the response: 'table' for structured data, "
-                        "'natural' for natural language description, 'both' for both formats",
-                    },
-                },
-                "required": ["query"],
-            },
-        ),
-        types.Tool(
-            name="set_auth_token",
-            description="Set the authentication token for API requests. "
-            "This must be called before using other tools to authenticate with the Ambivo API.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "token": {
-                        "type": "string",
-                        "description": "JWT Bearer token for authentication with Ambivo API",
-                    }
-                },
-                "required": ["token"],
-            },
-        ),
-    ]
-
-
-@server.call_tool()
-async def handle_call_tool(
-    name: str, arguments: Dict[str, Any] | None
-) -> List[types.TextContent]:
-    """
-    Handle tool calls with security and rate limiting.
-    """
-    if arguments is None:
-        arguments = {}
-
-    start_time = time.time()
-    logger.info(f"Tool call started: {name}")
-
-    try:
-        # Rate limiting (except for auth token setting)
-        if name != "set_auth_token" and api_client.auth_token:
-            client_id = token_validator.get_client_id_from_token(api_client.auth_token)
-            if not rate_limiter.is_allowed(client_id):
-                stats = rate_limiter.get_client_stats(client_id)
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=f"Rate limit exceeded. Requests: {stats['requests']}/{config.rate_limit_requests}. "
-                        f"Reset in {stats['reset_time'] - time.time():.0f}s",
-                    )
-                ]
-
-        if name == "set_auth_token":
-            token = arguments.get("token")
-            if not token:
-                return [
-                    types.TextContent(
-                        type="text", text="Error: Authentication token is required"
-                    )
-                ]
-
-            # Validate and set token
-            api_client.set_auth_token(token)
-
-            # Cache the token if validation is enabled
-            if config.token_validation_enabled:
-                token_validator.cache_token(token)
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text="Authentication token set successfully. You can now use other tools to query the Ambivo API.",
-                )
-            ]
-
-        elif name == "natural_query":
-            if not api_client.auth_token:
-                return [
-                    types.TextContent(
-                        type="text",
-                        text="Error: Authentication required. Please use the 'set_auth_token' tool first.",
-                    )
-                ]
-
-            query = arguments.get("query")
-            if not query:
-                return [
-                    types.TextContent(
-                        type="text", text="Error: Query parameter is required"
-                    )
-                ]
-
-            response_format = arguments.get("response_format", "both")
-
-            try:
-                result = await api_client.natural_query(query, response_format)
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=f"Natural Query Results:\n\n{json.dumps(result, indent=2)}",
-                    )
-                ]
-            except httpx.HTTPStatusError as e:
-                error_msg = f"HTTP {e.response.status_code}: {e.response.text}"
-                return [types.TextContent(type="text", text=f"API Error: {error_msg}")]
-            except Exception as e:
-                return [
-                    types.TextContent(
-                        type="text", text=f"Error executing natural query: {str(e)}"
-                    )
-                ]
-
-        else:
-            return [types.TextContent(type="text", text=f"Unknown tool: {name}")]
-
-    except ValueError as e:
-        # Input validation errors
-        logger.warning(f"Validation error in tool {name}: {e}")
-        return [types.TextContent(type="text", text=f"Validation Error: {str(e)}")]
-
-    except httpx.HTTPStatusError as e:
-        # HTTP errors from API
-        logger.error(f"HTTP error in tool {name}: {e.response.status_code}")
-        error_msg = f"API Error (HTTP {e.response.status_code})"
-        try:
-            error_detail = e.response.json()
-            if "error_code" in error_detail:
-                error_msg += f": {error_detail['error_code']}"
-        except:
-            error_msg += f": {e.response.text[:200]}"
-
-        return [types.TextContent(type="text", text=error_msg)]
-
-    except Exception as e:
-        # Unexpected errors
-        logger.exception(f"Unexpected error in tool {name}")
-        return [types.TextContent(type="text", text=f"Unexpected error: {str(e)}")]
-
-    finally:
-        elapsed_time = time.time() - start_time
-        logger.info(f"Tool call completed: {name} in {elapsed_time:.2f}s")
+    Main entry point for the MCP server with enhanced initialization
 
+    Args:
+        app: Application to serve; built from the loaded configuration if omitted
+        sock: Listening socket for the HTTP transport, e.g. in a worker process
+        runtime: Worker runtime when running as one of several HTTP workers
+    """
+    app = app or create_app()
+    config = app.config
 
-async def main():
-    """Main entry point for the MCP server with enhanced initialization"""
     logger.info(f"Starting {config.server_name} v{config.server_version}")
     logger.info(f"Configuration: Base URL: {config.base_url}")
     logger.info(
         f"Security: Rate limit: {config.rate_limit_requests}/{config.rate_limit_window}s"
     )
+    logger.info(
+        f"HTTP pool: max {config.pool_max_connections} connections, "
+        f"{config.pool_max_keepalive_connections} keep-alive, "
+        f"HTTP/2 {'on' if config.http2_enabled else 'off'}"
+    )
 
-    # Import here to avoid issues with event loops
-    import mcp.server.stdio
+    from .logging_pipeline import stop_queue_logging
 
+    metrics_server = None
     try:
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name=config.server_name,
-                    server_version=config.server_version,
-                    capabilities=server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
-                    ),
-                ),
+        if config.transport == "http":
+            from .http_transport import serve_http
+
+            # /metrics is served by the HTTP app itself
+            await serve_http(
+                app, config.http_host, config.http_port, sock=sock, runtime=runtime
             )
+        else:
+            # Import here to avoid issues with event loops
+            import mcp.server.stdio
+
+            from .metrics import serve_metrics
+
+            if config.metrics_port:
+                metrics_server = await serve_metrics(
+                    app.metrics, config.metrics_host, config.metrics_port
+                )
+
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await app.server.run(
+                    read_stream,
+                    write_stream,
+                    app.initialization_options(),
+                )
     except KeyboardInterrupt:
         logger.info("Server shutdown requested")
     except Exception as e:
@@ -366,15 +160,68 @@ async def main():
         raise
     finally:
         # Cleanup
-        await api_client.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        await app.close()
         logger.info("Server shutdown complete")
+        stop_queue_logging()
 
 
-def run_server():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options; unset options keep their configured values"""
+    parser = argparse.ArgumentParser(
+        prog="ambivo-mcp-server", description="MCP server for Ambivo API endpoints"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "http"],
+        help="Serve MCP over stdio or HTTP (default: stdio, or http with --port)",
+    )
+    parser.add_argument("--host", help="HTTP listen address")
+    parser.add_argument("--port", type=int, help="HTTP listen port")
+    parser.add_argument(
+        "--workers", type=int, help="HTTP worker processes sharing the port"
+    )
+    return parser.parse_args(argv)
+
+
+def apply_args(config: ServerConfig, args: argparse.Namespace) -> ServerConfig:
+    """Override configuration with command line options"""
+    if args.host is not None:
+        config.http_host = args.host
+    if args.port is not None:
+        config.http_port = args.port
+        config.transport = "http"
+    if args.transport is not None:
+        config.transport = args.transport
+    if args.workers is not None:
+        config.workers = args.workers
+    config.validate()
+    return config
+
+
+def run_server(argv: Optional[List[str]] = None):
     """Synchronous wrapper for the async main function"""
     import asyncio
 
-    asyncio.run(main())
+    config = apply_args(load_server_config(), parse_args(argv))
+    if config.transport != "http" or config.workers == 1:
+        asyncio.run(main(create_app(config)))
+        return
+
+    from .workers import Supervisor
+
+    if config.result_handles_enabled:
+        logger.warning(
+            "Result handles are stored per worker; pages may not be found "
+            "when a request lands on another worker"
+        )
+
+    def run_worker(sock: "socket.socket", runtime: "WorkerRuntime") -> None:
+        # Each worker builds its own application, HTTP client and event loop
+        asyncio.run(main(create_app(config), sock=sock, runtime=runtime))
+
+    Supervisor(config, run_worker).run()
 
 
 if __name__ == "__main__":
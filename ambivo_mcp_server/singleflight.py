@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Single-flight request coalescing for Ambivo MCP Server
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger("ambivo-mcp.singleflight")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one shared execution
+
+    The first caller for a key starts the call as a task; callers that arrive
+    while it is still running await the same task. Waiters are shielded, so
+    cancelling one of them never cancels the shared call.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once per key among concurrent callers
+
+        Args:
+            key: Identity of the call; must include the tenant for isolation
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            The shared result of fn()
+        """
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Coalescing identical in-flight call")
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get coalescing statistics"""
+        return {
+            "in_flight": len(self.calls),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Streaming response handling for Ambivo MCP Server
+"""
+
+import json
+import logging
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger("ambivo-mcp.streaming")
+
+try:
+    import ijson
+except ImportError:  # Optional dependency
+    ijson = None
+
+
+class PayloadTooLargeError(Exception):
+    """Raised when an upstream response exceeds the configured size limit"""
+
+    def __init__(self, max_bytes: int, received: int):
+        self.max_bytes = max_bytes
+        self.received = received
+        super().__init__(
+            f"Response too large: exceeded {max_bytes} bytes "
+            f"(received {received} bytes before aborting)"
+        )
+
+
+class StreamingJSONReader:
+    """
+    Read a streamed JSON response body with an early size limit
+
+    The size limit is enforced against Content-Length up front and against the
+    bytes received as they arrive, so oversized results are aborted instead of
+    being fully downloaded. When the optional ijson package is installed each
+    chunk is fed to an incremental parser and then discarded, so the raw body
+    never has to be held in memory alongside the decoded result.
+    """
+
+    def __init__(self, max_bytes: int, use_ijson: bool = True):
+        self.max_bytes = max_bytes
+        self.use_ijson = use_ijson and ijson is not None
+
+    def _check_declared_length(self, response) -> None:
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            # Content-Length is the encoded size; decoded bodies are checked below
+            raise PayloadTooLargeError(self.max_bytes, 0)
+
+    async def read_bytes(self, response) -> bytes:
+        """
+        Read a streamed response body without decoding it
+
+        Raises:
+            PayloadTooLargeError: If the body exceeds max_bytes
+        """
+        self._check_declared_length(response)
+
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > self.max_bytes:
+                logger.warning(
+                    f"Aborting upstream response after {len(body)} bytes "
+                    f"(limit {self.max_bytes})"
+                )
+                raise PayloadTooLargeError(self.max_bytes, len(body))
+        return bytes(body)
+
+    async def read(
+        self, response, keep_body: bool = False
+    ) -> Tuple[Any, Optional[bytes], int]:
+        """
+        Read and decode a streamed JSON response
+
+        Args:
+            response: httpx.Response opened with stream=True
+            keep_body: Also return the raw body bytes (e.g. for caching)
+
+        Returns:
+            Tuple of (decoded JSON, raw body bytes or None, decoded body size)
+
+        Raises:
+            PayloadTooLargeError: If the body exceeds max_bytes
+        """
+        self._check_declared_length(response)
+
+        received = 0
+        body = bytearray() if keep_body or not self.use_ijson else None
+        parser = None
+        items = None
+        if self.use_ijson:
+            items = ijson.sendable_list()
+            parser = ijson.items_coro(items, "", use_float=True)
+
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if received > self.max_bytes:
+                logger.warning(
+                    f"Aborting upstream response after {received} bytes "
+                    f"(limit {self.max_bytes})"
+                )
+                raise PayloadTooLargeError(self.max_bytes, received)
+            if body is not None:
+                body.extend(chunk)
+            if parser is not None:
+                parser.send(chunk)
+
+        if parser is not None:
+            parser.close()
+            if not items:
+                raise ValueError("Empty JSON response body")
+            result = items[0]
+        else:
+            result = json.loads(bytes(body))
+
+        logger.debug("Streamed %d byte response", received)
+        return result, (bytes(body) if keep_body else None), received
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tenant sessions for Ambivo MCP Server
+
+A tenant session holds the per-tenant state of one bearer token: the token
+itself and its client ID, which keys the tenant's rate-limit entry, cache
+namespace and stored results. Sessions are lightweight; every tenant shares
+the one API client and its connection pool.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger("ambivo-mcp.tenants")
+
+
+class TenantSession:
+    """Per-tenant state for one bearer token"""
+
+    __slots__ = ("token", "client_id", "created_at", "last_used", "requests")
+
+    def __init__(self, token: str, client_id: str):
+        self.token = token
+        self.client_id = client_id
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.requests = 0
+
+
+# Tenant of the request being handled; unset for stdio sessions
+_tenant_session: ContextVar[Optional[TenantSession]] = ContextVar(
+    "ambivo_tenant_session", default=None
+)
+
+
+def get_tenant_session() -> Optional[TenantSession]:
+    """Get the tenant session of the request being handled"""
+    return _tenant_session.get()
+
+
+@contextmanager
+def tenant_context(session: Optional[TenantSession]) -> Iterator[None]:
+    """
+    Run the handling of one request as `session`'s tenant
+
+    Without a session the surrounding tenant is kept, so stdio sessions fall
+    back to the token set with set_auth_token.
+    """
+    if session is None:
+        yield
+        return
+    reset = _tenant_session.set(session)
+    try:
+        yield
+    finally:
+        _tenant_session.reset(reset)
+
+
+class TenantSessionPool:
+    """
+    LRU pool of tenant sessions keyed by client ID
+
+    Sessions idle for longer than idle_ttl are dropped, and the least recently
+    used ones are evicted beyond max_sessions, so memory stays flat however
+    many tenants call in. Because a session moves to the end on every use,
+    the idle ones are always at the front and expiry never scans the pool.
+    """
+
+    def __init__(
+        self,
+        client_id_for: Callable[[str], str],
+        max_sessions: int = 10000,
+        idle_ttl: float = 1800,
+        on_evict: Optional[Callable[[TenantSession], None]] = None,
+    ):
+        self.client_id_for = client_id_for
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self.sessions: "OrderedDict[str, TenantSession]" = OrderedDict()
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def acquire(self, token: str, client_id: Optional[str] = None) -> TenantSession:
+        """
+        Get the session for a token, creating it on the tenant's first call
+
+        Args:
+            token: Bearer token of the call
+            client_id: The token's client ID, when the caller already has it
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        client_id = client_id or self.client_id_for(token)
+        session = self.sessions.get(client_id)
+        if session is None:
+            session = TenantSession(token, client_id)
+            self.sessions[client_id] = session
+            self.created += 1
+            while len(self.sessions) > self.max_sessions:
+                self._drop(next(iter(self.sessions)))
+                self.evictions += 1
+        else:
+            self.sessions.move_to_end(client_id)
+
+        session.last_used = now
+        session.requests += 1
+        return session
+
+    def _expire(self, now: float) -> None:
+        """Drop sessions idle for longer than idle_ttl, oldest first"""
+        cutoff = now - self.idle_ttl
+        while self.sessions:
+            client_id, session = next(iter(self.sessions.items()))
+            if session.last_used > cutoff:
+                break
+            self._drop(client_id)
+            self.expirations += 1
+
+    def _drop(self, client_id: str) -> None:
+        session = self.sessions.pop(client_id)
+        if self.on_evict is not None:
+            try:
+                self.on_evict(session)
+            except Exception:
+                logger.exception("Failed to release tenant session state")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tenant session pool statistics"""
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
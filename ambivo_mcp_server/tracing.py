@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Phase-level request tracing with a local JSONL span exporter
+"""
+
+import json
+import logging
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("ambivo-mcp.tracing")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# httpcore trace events (e.g. "http11.receive_response_headers.started") by phase
+HTTP_PHASES = {
+    "connect_tcp": "connect",  # includes DNS resolution
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "send_headers",
+    "send_request_body": "send_body",
+    "receive_response_headers": "wait",  # time to first byte
+    "receive_response_body": "download",
+}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("ambivo_span", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("ambivo_request_id", default=None)
+
+
+def new_request_id() -> str:
+    """Generate a request ID, also used as the trace ID"""
+    return secrets.token_hex(16)
+
+
+def get_request_id() -> Optional[str]:
+    """Get the request ID of the tool call being handled"""
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """Set the request ID for the duration of a tool call"""
+    request_id = request_id or new_request_id()
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+class Span:
+    """A timed phase of a request"""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start",
+        "duration",
+        "attributes",
+        "status",
+        "_start_perf",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.attributes = attributes or {}
+        self.status = "ok"
+        self._start_perf = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._start_perf
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span stand-in used when tracing is disabled"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_CONTEXT = nullcontext(_NoopSpan())
+
+
+class JSONLSpanExporter:
+    """Append finished spans to a local file, one JSON object per line"""
+
+    def __init__(self, path: str, buffer_size: int = 64):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer: List[str] = []
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+        self.exported = 0
+
+    def export(self, span: Span) -> None:
+        """Queue a finished span, writing in batches"""
+        line = json.dumps(span.to_dict(), separators=(",", ":"), default=str)
+        with self.lock:
+            self.buffer.append(line)
+            self.exported += 1
+            if len(self.buffer) >= self.buffer_size:
+                self._write()
+
+    def _write(self) -> None:
+        if self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.file.flush()
+            self.buffer.clear()
+
+    def flush(self) -> None:
+        """Write buffered spans"""
+        with self.lock:
+            self._write()
+
+    def close(self) -> None:
+        """Write buffered spans and close the file"""
+        with self.lock:
+            self._write()
+            self.file.close()
+
+
+class Tracer:
+    """
+    Create spans for request phases and hand them to an exporter
+
+    Spans nest through a context variable, so child phases started anywhere
+    in the same task (or in tasks it spawns) attach to the current span. The
+    root span of a tool call uses the request ID as its trace ID. Without an
+    exporter tracing is off and `span()` returns a shared no-op context.
+    """
+
+    def __init__(self, exporter: Optional[JSONLSpanExporter] = None):
+        self.exporter = exporter
+
+    @classmethod
+    def from_config(cls, config) -> "Tracer":
+        """Create a tracer from ServerConfig"""
+        if not config.trace_file:
+            return cls()
+        return cls(JSONLSpanExporter(config.trace_file))
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, **attributes: Any):
+        """Context manager timing one phase; yields the span"""
+        if self.exporter is None:
+            return _NOOP_CONTEXT
+        return self._span(name, attributes)
+
+    @contextmanager
+    def _span(self, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+        span = self._start(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def _start(
+        self, name: str, parent: Optional[Span], attributes: Dict[str, Any]
+    ) -> Span:
+        if parent is not None:
+            return Span(name, parent.trace_id, parent.span_id, attributes)
+        return Span(name, get_request_id() or new_request_id(), None, attributes)
+
+    def _finish(self, span: Span) -> None:
+        span.end()
+        try:
+            self.exporter.export(span)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to export span {span.name}: {e}")
+
+    def httpx_trace(self) -> Optional[Callable]:
+        """
+        Build an httpx "trace" extension callback for one request
+
+        Connection-level events become child spans of the current span:
+        connect (including DNS), tls, send_headers, send_body, wait (time to
+        first byte) and download.
+        """
+        if self.exporter is None:
+            return None
+
+        parent = _current_span.get()
+        open_spans: Dict[str, Span] = {}
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            prefix, _, stage = event_name.rpartition(".")
+            phase = HTTP_PHASES.get(prefix.rpartition(".")[2])
+            if phase is None:
+                return
+            if stage == "started":
+                open_spans[phase] = self._start(phase, parent, {})
+                return
+            span = open_spans.pop(phase, None)
+            if span is None:
+                return
+            if stage == "failed":
+                span.status = "error"
+                exception = info.get("exception")
+                if exception is not None:
+                    span.attributes["error"] = type(exception).__name__
+            self._finish(span)
+
+        return trace
+
+    def close(self) -> None:
+        """Flush and close the exporter"""
+        if self.exporter is not None:
+            self.exporter.close()
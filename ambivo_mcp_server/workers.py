@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Pre-forked worker processes for the HTTP transport
+
+A supervisor forks `workers` processes that each run their own event loop and
+MCP application behind the same port, so throughput scales across cores. With
+SO_REUSEPORT every worker binds its own socket and the kernel spreads
+connections evenly; otherwise the workers share one inherited socket. Workers
+are recycled after a number of requests or above an RSS threshold, crashed
+workers are restarted, SIGHUP replaces them one at a time, and metrics are
+aggregated across workers through per-worker state files.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import json_codec
+from .metrics import MetricsRegistry
+
+logger = logging.getLogger("ambivo-mcp.workers")
+
+# Worker counters and histograms survive recycling through this file
+RETIRED_STATE_FILE = "retired.json"
+
+# Restart delay for workers that crash right after starting
+CRASH_BACKOFF_BASE = 0.5
+CRASH_BACKOFF_MAX = 10.0
+
+# How often the supervisor checks on its workers
+SUPERVISE_INTERVAL = 0.1
+
+# How long a rolling reload waits for a replacement worker to start serving
+WORKER_READY_TIMEOUT = 30.0
+
+
+def reuse_port_available() -> bool:
+    """Check whether the platform supports SO_REUSEPORT"""
+    return hasattr(socket, "SO_REUSEPORT")
+
+
+def bind_socket(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    """Create a listening TCP socket, optionally with SO_REUSEPORT"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        sock.listen(socket.SOMAXCONN)
+        sock.set_inheritable(True)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def current_rss_bytes() -> int:
+    """Get the resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _read_state(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            return json_codec.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable worker metrics {path}: {e}")
+        return None
+
+
+def _write_state(path: str, state: Dict[str, Any]) -> None:
+    """Write a state file atomically so readers never see a partial one"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(json_codec.dumps(state))
+    os.replace(tmp_path, path)
+
+
+class WorkerRuntime:
+    """
+    Recycling and metrics export inside one worker process
+
+    The worker's metrics are written to the shared metrics directory every
+    worker_metrics_interval seconds; /metrics on any worker merges them.
+    Collector stats are exported as gauges labeled with the worker index.
+    The first write also tells the supervisor the worker is serving.
+    """
+
+    def __init__(self, config, index: int, metrics_dir: str):
+        self.config = config
+        self.index = index
+        self.metrics_dir = metrics_dir
+        self.state_path = os.path.join(metrics_dir, f"worker-{os.getpid()}.json")
+        self.max_requests = None
+        if config.worker_max_requests:
+            # Jitter so workers started together do not all recycle at once
+            jitter = random.randint(0, config.worker_max_requests // 10)
+            self.max_requests = config.worker_max_requests + jitter
+        self.max_rss_bytes = int(config.worker_max_rss_mb * 1024 * 1024)
+        self.metrics: Optional[MetricsRegistry] = None
+
+    def attach(self, metrics: MetricsRegistry) -> None:
+        """Export this registry for aggregation"""
+        self.metrics = metrics
+
+    def _export(self) -> Dict[str, Any]:
+        return {
+            **self.metrics.export_state(),
+            **self.metrics.export_collected({"worker": str(self.index)}),
+        }
+
+    def write_state(self) -> None:
+        """Publish this worker's metric values"""
+        if self.metrics is None:
+            return
+        try:
+            _write_state(self.state_path, self._export())
+        except OSError as e:
+            logger.warning(f"Failed to write worker metrics: {e}")
+
+    def aggregate(self) -> MetricsRegistry:
+        """Merge the live metrics of this worker with those of all others"""
+        namespace = self.metrics.namespace if self.metrics else "ambivo"
+        registry = MetricsRegistry(namespace)
+        if self.metrics is not None:
+            registry.merge_state(self._export())
+
+        workers = 1
+        for name in os.listdir(self.metrics_dir):
+            path = os.path.join(self.metrics_dir, name)
+            if path == self.state_path or not name.endswith(".json"):
+                continue
+            state = _read_state(path)
+            if state is None:
+                continue
+            registry.merge_state(state)
+            if name != RETIRED_STATE_FILE:
+                workers += 1
+        registry.gauge("workers", "Live worker processes").set(workers)
+        return registry
+
+    def render_prometheus(self) -> str:
+        """Render metrics aggregated across all workers"""
+        return self.aggregate().render_prometheus()
+
+    async def watch(self, server) -> None:
+        """Publish metrics and stop the server once RSS exceeds the limit"""
+        while not server.started and not server.should_exit:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+        while not server.should_exit:
+            self.write_state()
+            if self.max_rss_bytes:
+                rss = current_rss_bytes()
+                if rss > self.max_rss_bytes:
+                    logger.info(
+                        f"Worker {self.index} RSS {rss // 1048576}MB over the "
+                        f"{self.config.worker_max_rss_mb:g}MB limit, recycling"
+                    )
+                    server.should_exit = True
+                    return
+            await asyncio.sleep(self.config.worker_metrics_interval)
+
+    def close(self) -> None:
+        """Publish the final metric values before the worker exits"""
+        self.write_state()
+
+
+class Supervisor:
+    """
+    Fork, watch and restart HTTP worker processes
+
+    SIGTERM and SIGINT stop the workers gracefully. SIGHUP recycles them one
+    at a time, e.g. to pick up a new deployment: each replacement is started
+    first and the worker it replaces is only stopped once the replacement
+    serves, so capacity never drops.
+    """
+
+    def __init__(
+        self,
+        config,
+        run_worker: Callable[[socket.socket, WorkerRuntime], None],
+    ):
+        self.config = config
+        self.run_worker = run_worker
+        self.reuse_port = config.worker_reuse_port and reuse_port_available()
+        self.workers: Dict[int, int] = {}  # pid -> worker index
+        self.started_at: Dict[int, float] = {}
+        self.crashes: Dict[int, int] = {}  # worker index -> consecutive crashes
+        self.restarts = 0
+        self.running = False
+        self.reload_requested = False
+        self.reload_queue: List[int] = []  # pids still to replace
+        self.replacing: Optional[Tuple[int, int, float]] = None  # old, new, deadline
+        self.replaced: Set[int] = set()  # stopped workers not to restart
+        self.shared_socket: Optional[socket.socket] = None
+        self.metrics_dir = ""
+
+    def run(self) -> None:
+        """Start the workers and supervise them until stopped"""
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Worker processes require a platform with fork()")
+
+        config = self.config
+        # Bind up front so an unavailable port fails before any worker starts
+        sock = bind_socket(config.http_host, config.http_port, self.reuse_port)
+        if self.reuse_port:
+            sock.close()
+        else:
+            self.shared_socket = sock
+
+        self.metrics_dir = tempfile.mkdtemp(prefix="ambivo-mcp-workers-")
+        self.running = True
+        previous_handlers = {
+            signum: signal.signal(signum, handler)
+            for signum, handler in (
+                (signal.SIGTERM, self._stop),
+                (signal.SIGINT, self._stop),
+                (signal.SIGHUP, self._reload),
+            )
+        }
+        logger.info(
+            f"Starting {config.workers} workers on {config.http_host}:"
+            f"{config.http_port} ({'SO_REUSEPORT' if self.reuse_port else 'shared socket'})"
+        )
+
+        try:
+            for index in range(config.workers):
+                self._spawn(index)
+            self._supervise()
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            if self.shared_socket is not None:
+                self.shared_socket.close()
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+            logger.info("All workers stopped")
+
+    def _supervise(self) -> None:
+        while self.workers:
+            if self.running:
+                self._roll()
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                # Polled so SIGHUP can drive a rolling reload between exits
+                time.sleep(SUPERVISE_INTERVAL)
+                continue
+            index = self.workers.pop(pid, None)
+            if index is None:
+                continue
+            lifetime = time.monotonic() - self.started_at.pop(pid)
+            self._retire(pid)
+            if not self.running:
+                continue
+            if pid in self.replaced:
+                self.replaced.discard(pid)
+                logger.info(f"Worker {index} (pid {pid}) replaced")
+                continue
+
+            exit_code = os.waitstatus_to_exitcode(status)
+            if self.replacing is not None and pid in self.replacing[:2]:
+                old, new, _ = self.replacing
+                self.replacing = None
+                if pid == old:
+                    # Its replacement is already starting
+                    logger.error(f"Worker {index} (pid {pid}) exited with {exit_code}")
+                    continue
+                logger.error(
+                    f"Replacement worker {index} (pid {pid}) exited with "
+                    f"{exit_code}, stopping the reload"
+                )
+                self.reload_queue.clear()
+                continue
+            if exit_code == 0:
+                logger.info(f"Worker {index} (pid {pid}) recycled")
+                self.crashes.pop(index, None)
+            else:
+                logger.error(f"Worker {index} (pid {pid}) exited with {exit_code}")
+                crashes = self.crashes.get(index, 0) + 1 if lifetime < 5 else 1
+                self.crashes[index] = crashes
+                if crashes > 1:
+                    # Back off while a worker keeps failing right after start
+                    time.sleep(
+                        min(CRASH_BACKOFF_MAX, CRASH_BACKOFF_BASE * 2 ** (crashes - 2))
+                    )
+                    if not self.running:
+                        continue
+            self.restarts += 1
+            self._spawn(index)
+
+    def _spawn(self, index: int) -> int:
+        pid = os.fork()
+        if pid == 0:
+            self._run_child(index)
+        self.workers[pid] = index
+        self.started_at[pid] = time.monotonic()
+        return pid
+
+    def _roll(self) -> None:
+        """Advance a rolling reload by at most one step"""
+        if self.reload_requested:
+            self.reload_requested = False
+            logger.info("Recycling workers one at a time")
+            new = self.replacing[1] if self.replacing is not None else None
+            self.reload_queue = [pid for pid in self.workers if pid != new]
+
+        if self.replacing is None:
+            while self.reload_queue:
+                old = self.reload_queue.pop(0)
+                if old in self.workers and old not in self.replaced:
+                    new = self._spawn(self.workers[old])
+                    self.replacing = (old, new, time.monotonic() + WORKER_READY_TIMEOUT)
+                    return
+            return
+
+        old, new, deadline = self.replacing
+        if os.path.exists(os.path.join(self.metrics_dir, f"worker-{new}.json")):
+            self.replacing = None
+            self._stop_worker(old)
+            if not self.reload_queue:
+                logger.info("All workers recycled")
+        elif time.monotonic() > deadline:
+            logger.error(
+                f"Replacement worker {self.workers[new]} (pid {new}) did not "
+                f"start within {WORKER_READY_TIMEOUT:g}s, stopping the reload"
+            )
+            self.replacing = None
+            self.reload_queue.clear()
+            self._stop_worker(new)
+
+    def _stop_worker(self, pid: int) -> None:
+        """Stop a worker for good, without restarting it"""
+        self.replaced.add(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _run_child(self, index: int) -> None:
+        """Body of a forked worker; never returns"""
+        exit_code = 0
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(signum, signal.SIG_DFL)
+            sock = self.shared_socket or bind_socket(
+                self.config.http_host, self.config.http_port, reuse_port=True
+            )
+            self.run_worker(sock, WorkerRuntime(self.config, index, self.metrics_dir))
+        except BaseException:
+            logger.exception(f"Worker {index} failed")
+            exit_code = 1
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+
+    def _retire(self, pid: int) -> None:
+        """Fold a dead worker's counters and histograms into the retired totals"""
+        path = os.path.join(self.metrics_dir, f"worker-{pid}.json")
+        state = _read_state(path)
+        if state is None:
+            return
+        retired_path = os.path.join(self.metrics_dir, RETIRED_STATE_FILE)
+        registry = MetricsRegistry()
+        retired = _read_state(retired_path)
+        if retired is not None:
+            registry.merge_state(retired)
+        # Gauges describe live workers only
+        registry.merge_state(state, kinds=("counter", "histogram"))
+        try:
+            _write_state(retired_path, registry.export_state())
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to retire worker metrics: {e}")
+
+    def _signal_workers(self, signum: int) -> None:
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _stop(self, signum, frame) -> None:
+        if self.running:
+            logger.info("Stopping workers")
+            self.running = False
+            self._signal_workers(signal.SIGTERM)
+
+    def _reload(self, signum, frame) -> None:
+        # The supervise loop does the work; a handler must not fork or block
+        self.reload_requested = True
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Cold-start import-time benchmark for the server entry point
+
+Runs `python -X importtime -c "import ambivo_mcp_server.server"` in fresh
+interpreters and reports the median total import time and the slowest
+modules. Fails when a module that should be deferred (mcp, httpx, ...) is
+imported eagerly, when the median exceeds --max-ms, or when it regresses
+against a stored baseline.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 9 --save-baseline import_baseline.json
+    python benchmarks/bench_import_time.py --baseline import_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy packages that must only be imported by create_app()
+DEFAULT_FORBIDDEN = ("mcp", "httpx", "httpcore", "pydantic", "anyio")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse -X importtime output
+
+    Returns:
+        (module, self microseconds, cumulative microseconds) per imported module
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(module: str) -> List[Tuple[str, int, int]]:
+    """Import `module` in a fresh interpreter and return its import profile"""
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT, "PYTHONDONTWRITEBYTECODE": "1"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    # The first run warms the bytecode and filesystem caches
+    measure(args.module)
+
+    totals = []
+    profiles = []
+    for _ in range(args.runs):
+        modules = measure(args.module)
+        totals.append(sum(self_us for _, self_us, _ in modules) / 1000)
+        profiles.append(modules)
+
+    median_run = profiles[totals.index(sorted(totals)[len(totals) // 2])]
+    slowest = sorted(median_run, key=lambda m: m[1], reverse=True)[: args.top]
+    imported = {name for name, _, _ in median_run}
+    forbidden = sorted(
+        name
+        for name in imported
+        if any(name == f or name.startswith(f + ".") for f in args.forbid)
+    )
+    return {
+        "import_median_ms": round(statistics.median(totals), 2),
+        "import_min_ms": round(min(totals), 2),
+        "import_max_ms": round(max(totals), 2),
+        "modules_imported": len(imported),
+        "slowest_modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 2)}
+            for name, self_us, _ in slowest
+        ],
+        "forbidden_imports": forbidden,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure cold-start import time of the server entry point"
+    )
+    parser.add_argument("--module", default="ambivo_mcp_server.server")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument(
+        "--forbid",
+        type=lambda value: tuple(filter(None, value.split(","))),
+        default=DEFAULT_FORBIDDEN,
+        help="comma-separated packages that must not be imported",
+    )
+    parser.add_argument("--max-ms", type=float, help="fail above this median")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="fail if results regress against this file")
+    parser.add_argument("--save-baseline", help="write results as a new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative regression (default 0.25)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = run_benchmark(args)
+    report = {
+        "benchmark": "import_time",
+        "parameters": {"module": args.module, "runs": args.runs},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+
+    failures = []
+    if results["forbidden_imports"]:
+        failures.append(
+            "eagerly imported: " + ", ".join(results["forbidden_imports"][:10])
+        )
+    median = results["import_median_ms"]
+    if args.max_ms is not None and median > args.max_ms:
+        failures.append(f"median import time {median}ms exceeds {args.max_ms}ms")
+    if args.baseline:
+        with open(args.baseline) as f:
+            previous = json.load(f)["results"]["import_median_ms"]
+        if median > previous * (1 + args.tolerance):
+            failures.append(
+                f"median import time {median}ms vs baseline {previous}ms "
+                f"({(median - previous) / previous:+.1%})"
+            )
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}", file=sys.stderr)
+        return 1
+    print(f"OK: {args.module} imports in {median}ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Rate limiter microbenchmark
+
+Measures the per-call cost of is_allowed and the memory held per client for
+each rate limiting algorithm. Memory is traced with tracemalloc while
+--clients distinct clients each make --calls-per-client requests, and is
+reported per 100k clients.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py
+    python benchmarks/bench_rate_limiter.py --clients 100000 --max-requests 100
+    python benchmarks/bench_rate_limiter.py --algorithms gcra,sliding_window --output rl.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ambivo_mcp_server.security import RATE_LIMITERS, create_rate_limiter  # noqa: E402
+
+
+def measure_call_cost(algorithm: str, args: argparse.Namespace) -> Dict[str, float]:
+    """Time is_allowed on a hot client set, within and over the limit"""
+    limiter = create_rate_limiter(
+        algorithm, max_requests=args.max_requests, window_seconds=args.window
+    )
+    client_ids = [f"client-{i}" for i in range(args.hot_clients)]
+    is_allowed = limiter.is_allowed
+
+    # The limit is reached early, so most calls are rejections as in a flood
+    start = time.perf_counter_ns()
+    for _ in range(args.rounds):
+        for client_id in client_ids:
+            is_allowed(client_id)
+    elapsed = time.perf_counter_ns() - start
+    calls = args.rounds * len(client_ids)
+    return {"ns_per_call": round(elapsed / calls, 1), "calls": calls}
+
+
+def measure_memory(algorithm: str, args: argparse.Namespace) -> Dict[str, float]:
+    """Trace the memory the limiter holds for many distinct clients"""
+    client_ids = [f"client-{i}" for i in range(args.clients)]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        limiter = create_rate_limiter(
+            algorithm, max_requests=args.max_requests, window_seconds=args.window
+        )
+        for _ in range(args.calls_per_client):
+            for client_id in client_ids:
+                limiter.is_allowed(client_id)
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return {
+        "bytes_per_client": round(held / args.clients, 1),
+        "mb_per_100k_clients": round(held / args.clients * 100_000 / 1048576, 2),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure rate limiter call cost and memory per client"
+    )
+    parser.add_argument(
+        "--algorithms",
+        type=lambda value: [a for a in value.split(",") if a],
+        default=list(RATE_LIMITERS),
+        help="comma-separated algorithms (default: all)",
+    )
+    parser.add_argument("--max-requests", type=int, default=100)
+    parser.add_argument("--window", type=int, default=3600, help="window seconds")
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument(
+        "--calls-per-client",
+        type=int,
+        default=10,
+        help="requests per client in the memory run",
+    )
+    parser.add_argument("--hot-clients", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--output", help="write JSON results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # Rejections log a warning; measure the limiter, not the log handler
+    logging.disable(logging.WARNING)
+    unknown = [a for a in args.algorithms if a not in RATE_LIMITERS]
+    if unknown:
+        print(f"Unknown algorithms: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    results: Dict[str, Any] = {}
+    for algorithm in args.algorithms:
+        results[algorithm] = {
+            **measure_call_cost(algorithm, args),
+            **measure_memory(algorithm, args),
+        }
+
+    report = {
+        "benchmark": "rate_limiter",
+        "parameters": {
+            "max_requests": args.max_requests,
+            "window_seconds": args.window,
+            "clients": args.clients,
+            "calls_per_client": args.calls_per_client,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Token cache microbenchmark
+
+Measures the per-call cost of the token cache with --tokens cached tokens
+(100k by default): inserting tokens, the per-request auth path (one SHA-256
+digest shared by the cache check and the client ID, as the HTTP transport
+does), a standalone client ID lookup that hashes the token itself, the digest
+alone, and expiring the whole cache. Memory held per cached token is traced
+with tracemalloc.
+
+Usage:
+    python benchmarks/bench_token_cache.py
+    python benchmarks/bench_token_cache.py --tokens 100000 --lookups 1000000
+    python benchmarks/bench_token_cache.py --output tokens.json
+"""
+
+import argparse
+import base64
+import gc
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ambivo_mcp_server.security import TokenValidator  # noqa: E402
+
+
+def make_tokens(count: int, payload_bytes: int) -> List[str]:
+    """JWT-shaped tokens with random payloads"""
+    rng = random.Random(0)
+    header = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+    def part(size: int) -> str:
+        raw = bytes(rng.getrandbits(8) for _ in range(size))
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    return [
+        f"{header.decode()}.{part(payload_bytes)}.{part(32)}" for _ in range(count)
+    ]
+
+
+def per_call_ns(func, items: List[str]) -> float:
+    start = time.perf_counter_ns()
+    for item in items:
+        func(item)
+    return round((time.perf_counter_ns() - start) / len(items), 1)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    tokens = make_tokens(args.tokens, args.payload_bytes)
+    validator = TokenValidator(cache_ttl=3600, max_cache_size=args.tokens)
+    results: Dict[str, Any] = {}
+
+    def insert(token: str) -> None:
+        validator.cache_token(token, validator.token_digest(token))
+
+    results["insert_ns_per_token"] = per_call_ns(insert, tokens)
+
+    # Memory is traced on a second fill, as tracing slows the timed one
+    traced = TokenValidator(cache_ttl=3600, max_cache_size=args.tokens)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for token in tokens:
+            traced.cache_token(token)
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    # Excludes the token strings themselves, which the caller holds anyway
+    results["bytes_per_token"] = round(held / len(tokens), 1)
+
+    # Requests arrive from a random mix of the cached tenants
+    rng = random.Random(1)
+    lookups = [rng.choice(tokens) for _ in range(args.lookups)]
+
+    def auth_path(token: str) -> None:
+        digest = validator.token_digest(token)
+        validator.is_token_cached(token, digest)
+        validator.client_id_from_digest(digest)
+
+    results["auth_path_ns_per_call"] = per_call_ns(auth_path, lookups)
+    results["client_id_ns_per_call"] = per_call_ns(
+        validator.get_client_id_from_token, lookups
+    )
+    results["sha256_digest_ns_per_call"] = per_call_ns(
+        lambda token: hashlib.sha256(token.encode()).digest(), lookups
+    )
+
+    # Every token expires at once; cleanup walks only the expired front
+    start = time.perf_counter_ns()
+    validator._cleanup_cache(time.time() + 7200)
+    results["expire_all_ms"] = round((time.perf_counter_ns() - start) / 1e6, 2)
+    assert not validator.token_cache
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure token cache and auth path costs"
+    )
+    parser.add_argument("--tokens", type=int, default=100_000, help="cached tokens")
+    parser.add_argument("--lookups", type=int, default=500_000)
+    parser.add_argument(
+        "--payload-bytes", type=int, default=180, help="raw bytes of JWT payload"
+    )
+    parser.add_argument("--output", help="write JSON results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = {
+        "benchmark": "token_cache",
+        "parameters": {
+            "tokens": args.tokens,
+            "lookups": args.lookups,
+            "payload_bytes": args.payload_bytes,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": run(args),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
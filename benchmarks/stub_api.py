@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Ambivo /entity/natural_query endpoint for benchmarks
+
+Speaks plain HTTP/1.1 with keep-alive, waits a configurable latency before
+answering, and returns a pre-built JSON payload of a configurable number of
+rows, so results are reproducible without network access or credentials.
+
+Usage:
+    python benchmarks/stub_api.py --port 8765 --latency-ms 20 --rows 100
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import sys
+
+
+def build_payload(rows: int, row_bytes: int = 100, seed: int = 0) -> bytes:
+    """Build a natural_query style response with `rows` table rows"""
+    rand = random.Random(seed)
+    filler_length = max(0, row_bytes - 80)
+    data = [
+        {
+            "id": f"lead_{i:08d}",
+            "name": f"Lead {i}",
+            "email": f"lead{i}@example.com",
+            "score": rand.randint(0, 100),
+            "notes": "x" * filler_length,
+        }
+        for i in range(rows)
+    ]
+    return json.dumps(
+        {
+            "success": True,
+            "natural_response": f"Found {rows} leads matching the query.",
+            "data": data,
+        }
+    ).encode("utf-8")
+
+
+class StubAPI:
+    """Minimal keep-alive HTTP server answering every POST with the same body"""
+
+    def __init__(self, payload: bytes, latency: float, jitter: float = 0.0):
+        self.payload = payload
+        self.gzipped = gzip.compress(payload, compresslevel=6)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", "0"))
+                if length:
+                    await reader.readexactly(length)
+                self.requests += 1
+
+                delay = self.latency
+                if self.jitter:
+                    delay += random.uniform(0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+
+                body, encoding = self.payload, b""
+                if "gzip" in headers.get("accept-encoding", ""):
+                    body, encoding = self.gzipped, b"Content-Encoding: gzip\r\n"
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + encoding
+                    + b"Content-Length: %d\r\n\r\n" % len(body)
+                    + body
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    stub = StubAPI(
+        build_payload(args.rows, args.row_bytes),
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+    )
+    server = await asyncio.start_server(stub.handle, args.host, args.port)
+    port = server.sockets[0].getsockname()[1]
+    # The benchmark runner waits for this line to learn the port
+    print(f"listening on {args.host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--row-bytes", type=int, default=100)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        sys.exit(0)
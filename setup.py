@@ -27,7 +27,7 @@ setup(
     },
     packages=find_packages(),
     install_requires=[
-        "mcp>=1.0.0",
+        "mcp>=1.8.0",
         "httpx>=0.25.0",
         "pyyaml>=6.0.0"
     ],
@@ -43,6 +43,20 @@ setup(
             "pytest-asyncio>=0.21.0",
             "httpx[test]>=0.25.0",
         ],
+        "http2": [
+            "httpx[http2]>=0.25.0",
+        ],
+        "streaming": [
+            "ijson>=3.2.0",
+        ],
+        "fast": [
+            "orjson>=3.9.0",
+        ],
+        "compression": [
+            "brotli>=1.0.9",
+            "zstandard>=0.18.0",
+            "httpx>=0.27.1",
+        ],
     },
     python_requires=">=3.11",
     entry_points={
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Shared test fixtures
+"""
+
+import pytest
+from unittest.mock import patch
+
+
+class FakeClock:
+    """Controllable replacement for time.time"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Patch time.time with a FakeClock starting at 1000.0 for the test"""
+    fake = FakeClock()
+    with patch("time.time", fake):
+        yield fake
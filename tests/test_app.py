@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Tests for the MCP tool handlers
+"""
+
+import asyncio
+import json
+import pytest
+
+pytest.importorskip("mcp")
+
+import httpx
+
+try:
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.server import create_app
+    from ambivo_mcp_server.tenants import tenant_context
+except ImportError:
+    import sys
+    import os
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.server import create_app
+    from ambivo_mcp_server.tenants import tenant_context
+
+TOKEN_A = "aaaaaaaaaa.tenant_a.signature"
+TOKEN_B = "bbbbbbbbbb.tenant_b.signature"
+
+
+def make_app(handler, **overrides):
+    """Build an application whose upstream is answered by `handler`"""
+    config = ServerConfig(base_url="http://upstream.test", **overrides)
+    mcp_app = create_app(config)
+    mcp_app.api_client.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    return mcp_app
+
+
+async def call(mcp_app, name, arguments, token=TOKEN_A):
+    """Call a tool as the tenant owning `token`, returning its text"""
+    with tenant_context(mcp_app.tenant_sessions.acquire(token)):
+        result = await mcp_app.call_tool(name, arguments)
+    return result[0].text
+
+
+class TestNaturalQuery:
+    """Test the natural_query tool"""
+
+    async def test_passthrough_returns_upstream_body(self):
+        """Test upstream JSON reaches the client byte for byte"""
+        body = b'{"success": true,  "rows": [{"name": "Ada"}]}'
+        mcp_app = make_app(lambda request: httpx.Response(200, content=body))
+
+        text = await call(mcp_app, "natural_query", {"query": "list leads"})
+        assert text == f"Natural Query Results:\n\n{body.decode()}"
+
+    @pytest.mark.parametrize(
+        "failure",
+        [b'{"success": false, "error": "busy"}', b"upstream busy"],
+    )
+    async def test_passthrough_failures_not_cached(self, failure):
+        """Test failed or non-JSON bodies are passed on but not cached"""
+        bodies = [failure, b'{"success": true, "rows": []}']
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, content=bodies[min(len(calls), 2) - 1])
+
+        mcp_app = make_app(handler, response_cache_enabled=True)
+        arguments = {"query": "list leads"}
+
+        assert (await call(mcp_app, "natural_query", arguments)).endswith(
+            failure.decode()
+        )
+        for _ in range(2):
+            text = await call(mcp_app, "natural_query", arguments)
+            assert text.endswith('"rows": []}')
+        # The failure went upstream again, the success was then served cached
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    async def test_shared_responses_not_reconciled(self, concurrent):
+        """Test cache hits and coalesced calls only pay the provisional cost"""
+        body = b'{"success": true, "rows": "' + b"x" * 10211 + b'"}'
+        assert len(body) == 10240
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, content=body)
+
+        mcp_app = make_app(
+            handler,
+            response_passthrough=True,
+            response_cache_enabled=True,
+            rate_limit_cost_per_mb=1024.0,
+        )
+        arguments = {"query": "list leads"}
+        if concurrent:
+            await asyncio.gather(
+                *(call(mcp_app, "natural_query", arguments) for _ in range(2))
+            )
+        else:
+            for _ in range(2):
+                await call(mcp_app, "natural_query", arguments)
+
+        assert len(calls) == 1
+        # 10KB at 1024 per MB costs 10, charged once; the shared call costs 1
+        client_id = mcp_app.token_validator.get_client_id_from_token(TOKEN_A)
+        assert mcp_app.rate_limiter.get_client_stats(client_id)["requests"] == 11
+
+
+class TestResultHandles:
+    """Test large results are stored server-side and paged"""
+
+    @pytest.mark.parametrize("passthrough", [True, False])
+    async def test_spill_and_page(self, passthrough):
+        """Test a large result returns a handle whose pages hold every row"""
+        rows = [{"id": i, "name": f"lead {i}"} for i in range(45)]
+        mcp_app = make_app(
+            lambda request: httpx.Response(
+                200, json={"success": True, "answer": "45 leads", "data": rows}
+            ),
+            response_passthrough=passthrough,
+            result_handles_enabled=True,
+            result_inline_max_bytes=1024,
+            result_page_size=20,
+        )
+
+        text = await call(mcp_app, "natural_query", {"query": "list leads"})
+        assert "large result stored server-side" in text
+        summary = json.loads(text.split("\n\n", 1)[1])
+        assert summary["answer"] == "45 leads"
+        assert summary["total_rows"] == 45
+        assert summary["pages"] == 3
+        assert "data" not in summary
+
+        paged = []
+        for page in range(summary["pages"]):
+            text = await call(
+                mcp_app,
+                "get_result_page",
+                {"result_handle": summary["result_handle"], "page": page},
+            )
+            paged += json.loads(text)["rows"]
+        assert paged == rows
+
+    async def test_size_counted_in_bytes(self):
+        """Test decoded results are measured in UTF-8 bytes, not characters"""
+        rows = [{"name": "Zoë Ångström"} for _ in range(40)]
+        mcp_app = make_app(
+            lambda request: httpx.Response(200, json={"success": True, "data": rows}),
+            response_passthrough=False,
+            result_handles_enabled=True,
+            result_inline_max_bytes=1000,
+        )
+        text = json.dumps(
+            {"success": True, "data": rows}, separators=(",", ":"), ensure_ascii=False
+        )
+        assert len(text) < 1000 < len(text.encode("utf-8"))
+
+        text = await call(mcp_app, "natural_query", {"query": "list leads"})
+        assert "large result stored server-side" in text
+
+    async def test_handle_scoped_to_tenant(self):
+        """Test a tenant cannot read another tenant's stored result"""
+        rows = [{"id": i} for i in range(200)]
+        mcp_app = make_app(
+            lambda request: httpx.Response(200, json={"success": True, "data": rows}),
+            result_handles_enabled=True,
+            result_inline_max_bytes=1024,
+        )
+
+        text = await call(mcp_app, "natural_query", {"query": "list leads"}, TOKEN_B)
+        handle = json.loads(text.split("\n\n", 1)[1])["result_handle"]
+
+        arguments = {"result_handle": handle}
+        text = await call(mcp_app, "get_result_page", arguments, TOKEN_A)
+        assert text == f"Error: Result not found or expired: {handle}"
+        text = await call(mcp_app, "get_result_page", arguments, TOKEN_B)
+        assert json.loads(text)["total_rows"] == 200
+
+
+def batch_items(text):
+    """Decode the items of a batch_natural_query result"""
+    return json.loads(text.split("\n\n", 1)[1])
+
+
+class TestBatchNaturalQuery:
+    """Test the batch_natural_query tool"""
+
+    async def test_concurrency_capped(self):
+        """Test at most batch_max_concurrency queries run upstream at once"""
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(request)
+            return httpx.Response(200, json={"success": True})
+
+        mcp_app = make_app(handler, batch_max_concurrency=2)
+        queries = [f"query {i}" for i in range(6)]
+
+        text = await call(mcp_app, "batch_natural_query", {"queries": queries})
+        assert text.startswith("Batch Natural Query Results (6/6 succeeded)")
+        assert [item["query"] for item in batch_items(text)] == queries
+        assert max(peak) == 2
+
+    async def test_item_timeout(self):
+        """Test a slow query times out without failing the others"""
+
+        async def handler(request):
+            if json.loads(request.content)["query"] == "slow":
+                await asyncio.sleep(1)
+            return httpx.Response(200, json={"success": True})
+
+        mcp_app = make_app(handler, batch_item_timeout=0.05)
+
+        text = await call(mcp_app, "batch_natural_query", {"queries": ["slow", "fast"]})
+        slow, fast = batch_items(text)
+        assert slow == {
+            "index": 0,
+            "query": "slow",
+            "success": False,
+            "error": "Query timed out after 0.05s",
+        }
+        assert fast["success"] is True
+
+    async def test_items_charged_separately(self):
+        """Test each query takes its own rate limit permit"""
+        mcp_app = make_app(
+            lambda request: httpx.Response(200, json={"success": True}),
+            rate_limit_requests=2,
+        )
+
+        text = await call(mcp_app, "batch_natural_query", {"queries": ["a", "b", "c"]})
+        assert text.startswith("Batch Natural Query Results (2/3 succeeded)")
+        errors = [item.get("error") for item in batch_items(text)]
+        assert errors.count("Rate limit exceeded") == 1
+        client_id = mcp_app.token_validator.get_client_id_from_token(TOKEN_A)
+        assert mcp_app.rate_limiter.get_client_stats(client_id)["requests"] == 2
+
+    @pytest.mark.parametrize("passthrough", [True, False])
+    async def test_mixed_results(self, passthrough):
+        """Test successes and failures are reported per item as valid JSON"""
+
+        def handler(request):
+            query = json.loads(request.content)["query"]
+            if query == "broken":
+                return httpx.Response(500, text="upstream failure")
+            if query == "plain":
+                return httpx.Response(200, content=b'"ok" not json')
+            return httpx.Response(200, json={"success": True, "rows": [1]})
+
+        mcp_app = make_app(handler, response_passthrough=passthrough)
+
+        text = await call(
+            mcp_app,
+            "batch_natural_query",
+            {"queries": ["leads", {"query": "broken"}, 42, "plain"]},
+        )
+        leads, broken, invalid, plain = batch_items(text)
+        assert leads["result"] == {"success": True, "rows": [1]}
+        assert broken["error"] == "HTTP 500: upstream failure"
+        assert invalid == {
+            "index": 2,
+            "query": None,
+            "success": False,
+            "error": "Query must be a non-empty string",
+        }
+        if passthrough:
+            assert plain["result"] == '"ok" not json'
+        else:
+            assert plain["success"] is False
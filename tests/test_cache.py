@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for response caching
+"""
+
+import pytest
+import time
+from unittest.mock import patch
+try:
+    from cache import ResponseCache
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test tenant-isolated response cache"""
+    
+    def test_hit_and_miss(self):
+        """Test basic get/set with hit and miss counters"""
+        cache = ResponseCache(max_bytes=1024, ttl=60)
+        
+        assert cache.get("tenant_a", "show leads", "both") is None
+        cache.set("tenant_a", "show leads", "both", b'{"ok": true}')
+        assert cache.get("tenant_a", "show leads", "both") == b'{"ok": true}'
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+    
+    def test_tenant_isolation(self):
+        """Test results never cross tenants"""
+        cache = ResponseCache(max_bytes=1024, ttl=60)
+        cache.set("tenant_a", "show leads", "both", b"a")
+        
+        assert cache.get("tenant_b", "show leads", "both") is None
+        assert cache.get("tenant_a", "show leads", "both") == b"a"
+    
+    def test_response_format_in_key(self):
+        """Test different response formats are cached separately"""
+        cache = ResponseCache(max_bytes=1024, ttl=60)
+        cache.set("tenant_a", "show leads", "table", b"table")
+        
+        assert cache.get("tenant_a", "show leads", "natural") is None
+    
+    def test_query_normalization(self):
+        """Test whitespace differences share an entry"""
+        cache = ResponseCache(max_bytes=1024, ttl=60)
+        cache.set("tenant_a", "  show   leads\n", "both", b"a")
+        
+        assert cache.get("tenant_a", "show leads", "both") == b"a"
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after TTL"""
+        cache = ResponseCache(max_bytes=1024, ttl=60)
+        cache.set("tenant_a", "q", "both", b"a")
+        
+        with patch("cache.time.monotonic", return_value=time.monotonic() + 61):
+            assert cache.get("tenant_a", "q", "both") is None
+        
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["bytes"] == 0
+    
+    def test_lru_eviction_by_bytes(self):
+        """Test least recently used entries are evicted to fit the byte budget"""
+        cache = ResponseCache(max_bytes=25, ttl=60)
+        cache.set("t", "q1", "both", b"x" * 10)
+        cache.set("t", "q2", "both", b"x" * 10)
+        cache.get("t", "q1", "both")  # q1 is now most recently used
+        cache.set("t", "q3", "both", b"x" * 10)
+        
+        assert cache.get("t", "q2", "both") is None
+        assert cache.get("t", "q1", "both") is not None
+        assert cache.get("t", "q3", "both") is not None
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.total_bytes == 20
+    
+    def test_oversized_entry_rejected(self):
+        """Test values larger than the whole budget are not cached"""
+        cache = ResponseCache(max_bytes=10, ttl=60)
+        
+        assert cache.set("t", "q", "both", b"x" * 11) is False
+        assert cache.get_stats()["rejections"] == 1
+        assert cache.total_bytes == 0
+    
+    def test_compression(self):
+        """Test compressed entries round-trip and use fewer bytes"""
+        cache = ResponseCache(max_bytes=1024 * 1024, ttl=60, compress=True)
+        value = b'{"rows": [' + b'{"name": "lead"},' * 500 + b"{}]}"
+        cache.set("t", "q", "both", value)
+        
+        assert cache.total_bytes < len(value)
+        assert cache.get("t", "q", "both") == value
+    
+    def test_overwrite_updates_bytes(self):
+        """Test replacing an entry keeps byte accounting accurate"""
+        cache = ResponseCache(max_bytes=1024, ttl=60)
+        cache.set("t", "q", "both", b"x" * 10)
+        cache.set("t", "q", "both", b"x" * 4)
+        
+        assert cache.total_bytes == 4
+        assert len(cache.entries) == 1
+    
+    def test_invalidate_tenant(self):
+        """Test invalidating one tenant leaves others intact"""
+        cache = ResponseCache(max_bytes=1024, ttl=60)
+        cache.set("tenant_a", "q", "both", b"a")
+        cache.set("tenant_b", "q", "both", b"b")
+        
+        assert cache.invalidate("tenant_a") == 1
+        assert cache.get("tenant_a", "q", "both") is None
+        assert cache.get("tenant_b", "q", "both") == b"b"
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the upstream circuit breaker
+"""
+
+import httpx
+import pytest
+import time
+from unittest.mock import patch
+try:
+    from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+from ambivo_mcp_server import circuit_breaker as client_circuit
+from ambivo_mcp_server.api_client import AmbivoAPIClient
+from ambivo_mcp_server.config import ServerConfig
+
+
+def _open_breaker(**kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=30, **kwargs)
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure()
+    return breaker
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state machine"""
+    
+    def test_starts_closed(self):
+        """Test requests pass while closed"""
+        breaker = CircuitBreaker()
+        
+        breaker.before_request()
+        assert breaker.state == CircuitState.CLOSED
+    
+    def test_trips_on_consecutive_failures(self):
+        """Test consecutive failures open the circuit"""
+        breaker = _open_breaker()
+        
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        assert breaker.get_stats()["rejected"] == 1
+    
+    def test_success_resets_consecutive_failures(self):
+        """Test a success breaks a failure streak"""
+        breaker = CircuitBreaker(failure_threshold=3, min_requests=100)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitState.CLOSED
+    
+    def test_trips_on_error_rate(self):
+        """Test the rolling-window error rate opens the circuit"""
+        breaker = CircuitBreaker(
+            failure_threshold=100, error_rate_threshold=0.5, min_requests=4
+        )
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        
+        breaker.record_failure()  # 2/4 failed
+        assert breaker.state == CircuitState.OPEN
+    
+    def test_old_outcomes_leave_window(self):
+        """Test outcomes older than the window do not count"""
+        breaker = CircuitBreaker(
+            failure_threshold=100, min_requests=2, window_seconds=10
+        )
+        breaker.record_failure()
+        
+        with patch("circuit_breaker.time.monotonic", return_value=time.monotonic() + 11):
+            breaker.record_success()
+            breaker.record_success()
+        
+        assert breaker.get_stats()["window_failures"] == 0
+        assert breaker.state == CircuitState.CLOSED
+    
+    def test_half_open_after_open_period(self):
+        """Test the circuit allows a limited probe after the open period"""
+        breaker = _open_breaker(half_open_max_probes=1)
+        
+        with patch("circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+            assert breaker.state == CircuitState.HALF_OPEN
+            breaker.before_request()  # the probe
+            with pytest.raises(CircuitOpenError):
+                breaker.before_request()  # probe slots exhausted
+    
+    def test_half_open_success_closes(self):
+        """Test a successful probe closes the circuit"""
+        breaker = _open_breaker()
+        
+        with patch("circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+            breaker.before_request()
+            breaker.record_success()
+            assert breaker.state == CircuitState.CLOSED
+    
+    def test_half_open_failure_reopens(self):
+        """Test a failed probe re-opens the circuit"""
+        breaker = _open_breaker()
+        
+        with patch("circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+            breaker.before_request()
+            breaker.record_failure()
+            assert breaker._state == CircuitState.OPEN
+    
+    def test_release_probe(self):
+        """Test an abandoned probe frees its slot"""
+        breaker = _open_breaker()
+        
+        with patch("circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+            breaker.before_request()
+            breaker.release_probe()
+            breaker.before_request()  # Should not raise
+    
+    def test_state_change_callback(self):
+        """Test state changes are reported to the callback"""
+        changes = []
+        _open_breaker(on_state_change=lambda old, new: changes.append((old, new)))
+        
+        assert changes == [(CircuitState.CLOSED, CircuitState.OPEN)]
+
+
+class TestClientCircuitBreaker:
+    """Test the API client trips its circuit on upstream failures"""
+    
+    async def test_fails_fast_when_open(self):
+        """Test failed calls are recorded and open the circuit"""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+        
+        config = ServerConfig(
+            base_url="http://upstream.test",
+            max_retries=0,
+            circuit_failure_threshold=2,
+            circuit_open_seconds=30,
+        )
+        client = AmbivoAPIClient(config)
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        url = "http://upstream.test/entity/natural_query"
+        
+        for _ in range(2):
+            response = await client._make_request_with_retry("POST", url, json={})
+            assert response.status_code == 500
+        assert client.circuit_breaker.state == client_circuit.CircuitState.OPEN
+        assert client.circuit_breaker.get_stats()["window_failures"] == 2
+        
+        with pytest.raises(client_circuit.CircuitOpenError, match="circuit open"):
+            await client._make_request_with_retry("POST", url, json={})
+        assert len(calls) == 2
+        assert client.circuit_breaker.get_stats()["rejected"] == 1
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for transfer compression
+"""
+
+import gzip
+import os
+import pytest
+from unittest.mock import patch
+try:
+    from compression import (
+        TransferStats,
+        accept_encoding_header,
+        available_encodings,
+        compress_body,
+    )
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from compression import (
+        TransferStats,
+        accept_encoding_header,
+        available_encodings,
+        compress_body,
+    )
+
+
+class TestAcceptEncoding:
+    """Test the Accept-Encoding policy"""
+    
+    def test_only_installed_codecs(self):
+        """Test codecs that cannot be decoded are left out"""
+        with patch("compression.available_encodings", return_value=["gzip", "deflate"]):
+            assert accept_encoding_header(["zstd", "br", "gzip"]) == "gzip"
+    
+    def test_preference_order(self):
+        """Test installed codecs keep the configured order"""
+        with patch(
+            "compression.available_encodings",
+            return_value=["gzip", "deflate", "br", "zstd"],
+        ):
+            assert accept_encoding_header(["zstd", "br", "gzip"]) == "zstd, br, gzip"
+    
+    def test_gzip_always_included(self):
+        """Test gzip is always accepted"""
+        with patch("compression.available_encodings", return_value=["gzip", "br"]):
+            assert accept_encoding_header(["br"]) == "br, gzip"
+    
+    def test_optional_codecs_detected(self):
+        """Test br and zstd are offered only when their packages are installed"""
+        with patch("importlib.util.find_spec", return_value=None):
+            assert available_encodings() == ["gzip", "deflate"]
+        with patch(
+            "importlib.util.find_spec",
+            side_effect=lambda name: object() if name == "brotlicffi" else None,
+        ):
+            assert available_encodings() == ["gzip", "deflate", "br"]
+
+
+class TestCompressBody:
+    """Test request body compression"""
+    
+    def test_disabled(self):
+        """Test a zero threshold disables compression"""
+        body = b"x" * 10000
+        assert compress_body(body, 0) == (body, None)
+    
+    def test_below_threshold(self):
+        """Test small bodies are sent as is"""
+        assert compress_body(b"x" * 100, 1000) == (b"x" * 100, None)
+    
+    def test_compressed(self):
+        """Test large bodies are gzipped"""
+        body = b'{"query": "' + b"leads " * 1000 + b'"}'
+        compressed, encoding = compress_body(body, 1000)
+        
+        assert encoding == "gzip"
+        assert len(compressed) < len(body)
+        assert gzip.decompress(compressed) == body
+    
+    def test_incompressible(self):
+        """Test bodies that do not shrink are sent as is"""
+        body = os.urandom(512)
+        assert compress_body(body, 10) == (body, None)
+
+
+class TestTransferStats:
+    """Test per-tenant byte counters"""
+    
+    def test_record_per_tenant(self):
+        """Test totals and per-tenant counters"""
+        stats = TransferStats()
+        stats.record("tenant_a", 100, 40, 1000, 200)
+        stats.record("tenant_b", 100, 100, 500, 500)
+        
+        total = stats.get_stats()
+        assert total["requests"] == 2
+        assert total["received_bytes"] == 1500
+        assert total["received_wire_bytes"] == 700
+        assert total["tenants"] == 2
+        assert stats.get_stats("tenant_a")["received_compression_ratio"] == 0.2
+    
+    def test_tenants_bounded(self):
+        """Test the least recently active tenant is dropped past the cap"""
+        stats = TransferStats(max_tenants=2)
+        stats.record("tenant_a", 1, 1, 1, 1)
+        stats.record("tenant_b", 1, 1, 1, 1)
+        stats.record("tenant_a", 1, 1, 1, 1)
+        stats.record("tenant_c", 1, 1, 1, 1)
+        
+        assert list(stats.tenants) == ["tenant_a", "tenant_c"]
+        assert stats.get_stats()["requests"] == 4
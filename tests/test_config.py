@@ -99,6 +99,24 @@ class TestServerConfig:
         with pytest.raises(ValueError, match="Rate limit requests must be positive"):
             config.validate()
     
+    def test_validation_rate_limit_tiers(self):
+        """Test validation of rate limit tiers"""
+        tiers = {"gold": {"requests": 1000, "window": 3600}}
+        ServerConfig(
+            rate_limit_tiers=tiers, rate_limit_tenant_tiers={"client": "gold"}
+        ).validate()
+        
+        with pytest.raises(ValueError, match="positive limits"):
+            ServerConfig(rate_limit_tiers={"gold": {"requests": 0}}).validate()
+        
+        with pytest.raises(ValueError, match="Unknown rate limit tiers: silver"):
+            ServerConfig(
+                rate_limit_tiers=tiers, rate_limit_tenant_tiers={"client": "silver"}
+            ).validate()
+        
+        with pytest.raises(ValueError, match="usage period must be positive"):
+            ServerConfig(rate_limit_usage_period=0).validate()
+    
     def test_validation_invalid_url(self):
         """Test validation with invalid base URL"""
         config = ServerConfig(base_url="not-a-url")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for heavy-hitter tracking
+"""
+
+import random
+import pytest
+
+try:
+    from ambivo_mcp_server.heavy_hitters import (
+        CountMinSketch,
+        HeavyHitters,
+        RateLimitUsage,
+        SpaceSaving,
+    )
+    from ambivo_mcp_server.security import RateLimiter, TokenBucketRateLimiter
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from ambivo_mcp_server.heavy_hitters import (
+        CountMinSketch,
+        HeavyHitters,
+        RateLimitUsage,
+        SpaceSaving,
+    )
+    from ambivo_mcp_server.security import RateLimiter, TokenBucketRateLimiter
+
+
+def skewed_stream(heavy=5, light=20000, seed=7):
+    """A few heavy clients mixed into many clients calling once or twice"""
+    rng = random.Random(seed)
+    stream = [f"heavy-{i}" for i in range(heavy) for _ in range(500 * (i + 1))]
+    stream += [f"light-{rng.randrange(light)}" for _ in range(2 * light)]
+    rng.shuffle(stream)
+    return stream
+
+
+class TestCountMinSketch:
+    """Test count-min estimates"""
+
+    def test_never_undercounts(self):
+        """Test estimates are at least the true counts and close to them"""
+        sketch = CountMinSketch(width=1024, depth=4)
+        counts = {}
+        for key in skewed_stream():
+            sketch.add(key)
+            counts[key] = counts.get(key, 0) + 1
+        errors = [sketch.estimate(key) - count for key, count in counts.items()]
+        assert min(errors) >= 0
+        # Overcount bound total x e / width, for nearly all keys
+        bound = sketch.total * 2.72 / 1024
+        assert sum(error > bound for error in errors) < len(errors) * 0.02
+        assert sketch.estimate("never-seen") <= bound
+
+    def test_weighted_counts(self):
+        """Test fractional counts add up"""
+        sketch = CountMinSketch()
+        sketch.add("client", 0.25)
+        assert sketch.add("client", 2.5) == pytest.approx(2.75)
+        sketch.clear()
+        assert sketch.estimate("client") == 0
+
+
+class TestSpaceSaving:
+    """Test the top-K summary"""
+
+    def test_keeps_frequent_keys(self):
+        """Test keys counted more than total / capacity are kept with bounds"""
+        summary = SpaceSaving(capacity=20)
+        stream = skewed_stream()
+        for key in stream:
+            summary.add(key)
+        kept = {key: (count, error) for key, count, error in summary.top()}
+        for i in range(5):
+            true_count = 500 * (i + 1)
+            if true_count > len(stream) / 20:
+                count, error = kept[f"heavy-{i}"]
+                assert count - error <= true_count <= count
+        assert summary.min_count() == min(count for count, _ in kept.values())
+
+    def test_memory_bounded(self):
+        """Test the summary and its heap stay bounded by the capacity"""
+        summary = SpaceSaving(capacity=10)
+        for i in range(50000):
+            summary.add(f"client-{i}")
+            summary.add("hot")
+        assert len(summary.counts) == 10
+        assert len(summary.heap) <= 4 * 10 + 64
+        assert summary.top(1)[0][0] == "hot"
+
+
+class TestRateLimitUsage:
+    """Test heavy hitters fed by the rate limiter"""
+
+    def test_fed_by_is_allowed(self):
+        """Test admitted cost, rejections and adjustments are counted"""
+        limiter = RateLimiter(max_requests=5, window_seconds=60)
+        limiter.usage = RateLimitUsage(capacity=3)
+        for _ in range(8):
+            limiter.is_allowed("heavy")
+        limiter.is_allowed("light", cost=2)
+        limiter.adjust("light", 1.5)
+
+        stats = limiter.usage.get_stats()
+        assert stats["top_consumers"] == [
+            {"client_id": "heavy", "count": 5, "error": 0},
+            {"client_id": "light", "count": 3.5, "error": 0},
+        ]
+        assert stats["top_rejected"] == [{"client_id": "heavy", "count": 3, "error": 0}]
+        assert limiter.usage.get_client_stats("light") == {
+            "consumed": 3.5,
+            "rejected": 0,
+        }
+
+        limiter.usage.reset()
+        assert limiter.usage.get_stats()["consumed"] == 0
+
+    def test_reset_every_period(self, clock):
+        """Test counts start over each period, keeping the last period's top"""
+        usage = RateLimitUsage(capacity=3, period=60)
+        usage.record("stale", 5, True)
+        clock.now += 30
+        usage.record("current", 1, True)
+        assert usage.get_stats()["period_elapsed"] == 30
+
+        clock.now += 30
+        usage.record("current", 2, True)
+        stats = usage.get_stats()
+        assert usage.get_client_stats("stale") == {"consumed": 0, "rejected": 0}
+        assert stats["top_consumers"] == [
+            {"client_id": "current", "count": 2, "error": 0}
+        ]
+        assert stats["previous_period"]["consumed"] == 6
+        assert [e["client_id"] for e in stats["previous_period"]["top_consumers"]] == [
+            "stale",
+            "current",
+        ]
+
+    async def test_fed_by_acquire(self):
+        """Test token bucket acquisitions are counted"""
+        limiter = TokenBucketRateLimiter(max_requests=60, window_seconds=60, burst=2)
+        limiter.usage = RateLimitUsage()
+        for _ in range(3):
+            await limiter.acquire("client")
+        assert limiter.usage.get_client_stats("client") == {
+            "consumed": 2,
+            "rejected": 1,
+        }
+
+    def test_finds_heavy_hitters(self):
+        """Test the heaviest keys are ranked first among many light ones"""
+        hitters = HeavyHitters(capacity=20)
+        for key in skewed_stream():
+            hitters.add(key)
+        top = hitters.top(5)
+        assert [entry["client_id"] for entry in top] == [
+            f"heavy-{i}" for i in range(4, -1, -1)
+        ]
+        for i, entry in enumerate(reversed(top)):
+            true_count = 500 * (i + 1)
+            assert entry["count"] - entry["error"] <= true_count <= entry["count"]
+
+    def test_top_bounded_by_estimate(self):
+        """Test a summary count inflated by evictions is capped by the sketch"""
+        hitters = HeavyHitters(capacity=2)
+        hitters.add("a", 10)
+        hitters.add("b", 5)
+        hitters.add("c", 6)  # replaces b and inherits its count as error
+        assert hitters.top() == [
+            {"client_id": "a", "count": 10, "error": 0},
+            {"client_id": "c", "count": 6, "error": 5},
+        ]
+        # Keys estimated below the smallest kept count are not admitted
+        hitters.add("d", 1)
+        assert "d" not in hitters.summary.counts
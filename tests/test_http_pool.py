@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for HTTP connection pool management
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+try:
+    from config import ServerConfig
+    from http_pool import build_limits, build_timeout, create_http_client, get_pool_stats
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import ServerConfig
+    from http_pool import build_limits, build_timeout, create_http_client, get_pool_stats
+
+
+class TestPoolConfig:
+    """Test pool limits and timeouts built from configuration"""
+    
+    def test_timeouts_default_to_global_timeout(self):
+        """Test that unset split timeouts fall back to timeout"""
+        timeout = build_timeout(ServerConfig(timeout=12.0))
+        
+        assert timeout.connect == 12.0
+        assert timeout.read == 12.0
+        assert timeout.write == 12.0
+        assert timeout.pool == 12.0
+    
+    def test_split_timeouts(self):
+        """Test explicit connect/read/write/pool timeouts"""
+        config = ServerConfig(
+            connect_timeout=2.0, read_timeout=60.0, write_timeout=5.0, pool_timeout=1.0
+        )
+        timeout = build_timeout(config)
+        
+        assert timeout.connect == 2.0
+        assert timeout.read == 60.0
+        assert timeout.write == 5.0
+        assert timeout.pool == 1.0
+    
+    def test_limits(self):
+        """Test pool limits and keep-alive expiry"""
+        config = ServerConfig(
+            pool_max_connections=50,
+            pool_max_keepalive_connections=10,
+            pool_keepalive_expiry=15.0,
+        )
+        limits = build_limits(config)
+        
+        assert limits.max_connections == 50
+        assert limits.max_keepalive_connections == 10
+        assert limits.keepalive_expiry == 15.0
+    
+    def test_validation_keepalive_exceeds_max(self):
+        """Test validation rejects more keep-alive than total connections"""
+        config = ServerConfig(pool_max_connections=5, pool_max_keepalive_connections=10)
+        
+        with pytest.raises(ValueError, match="keepalive"):
+            config.validate()
+    
+    def test_validation_invalid_split_timeout(self):
+        """Test validation rejects non-positive split timeouts"""
+        config = ServerConfig(read_timeout=0)
+        
+        with pytest.raises(ValueError, match="read_timeout"):
+            config.validate()
+
+
+class TestHttpClient:
+    """Test shared HTTP client creation"""
+    
+    async def test_http2_falls_back_without_h2(self):
+        """Test HTTP/2 falls back to HTTP/1.1 when h2 is missing"""
+        with patch("http_pool.http2_available", return_value=False):
+            client = create_http_client(ServerConfig(http2_enabled=True))
+        
+        try:
+            assert client._transport._pool._http2 is False
+        finally:
+            await client.aclose()
+    
+    async def test_pool_stats_empty(self):
+        """Test pool stats on a fresh client"""
+        client = create_http_client(ServerConfig())
+        
+        try:
+            stats = get_pool_stats(client)
+            assert stats["connections_active"] == 0
+            assert stats["connections_idle"] == 0
+            assert stats["requests_waiting"] == 0
+        finally:
+            await client.aclose()
+    
+    async def test_pool_stats_idle_after_request(self):
+        """Test a completed request leaves an idle keep-alive connection"""
+        async def handle(reader, writer):
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = create_http_client(ServerConfig())
+        try:
+            response = await client.get(f"http://127.0.0.1:{port}/")
+            assert response.status_code == 200
+            
+            stats = get_pool_stats(client)
+            assert stats["connections_idle"] == 1
+            assert stats["connections_active"] == 0
+            assert stats["requests_active"] == 0
+        finally:
+            await client.aclose()
+            server.close()
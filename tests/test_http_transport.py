@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-tenant HTTP transport
+"""
+
+import asyncio
+import json
+import sys
+import pytest
+from unittest.mock import patch
+
+pytest.importorskip("starlette")
+pytest.importorskip("mcp")
+
+import httpx
+from starlette.testclient import TestClient
+
+try:
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.server import create_app
+    from ambivo_mcp_server.http_transport import create_http_app
+    from ambivo_mcp_server.security import TokenValidator
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.server import create_app
+    from ambivo_mcp_server.http_transport import create_http_app
+    from ambivo_mcp_server.security import TokenValidator
+
+TOKEN_A = "aaaaaaaaaa.tenant_a.signature"
+TOKEN_B = "bbbbbbbbbb.tenant_b.signature"
+
+
+def make_app(**overrides):
+    """Build an application whose upstream echoes the caller's token"""
+    seen = []
+
+    async def handler(request):
+        seen.append(request.headers["authorization"])
+        # Interleave concurrent requests before answering
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            200, json={"success": True, "auth": request.headers["authorization"]}
+        )
+
+    config = ServerConfig(
+        base_url="http://upstream.test",
+        http_json_response=True,
+        **overrides,
+    )
+    mcp_app = create_app(config)
+    mcp_app.api_client.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    return mcp_app, seen
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestHTTPTransport:
+    """Test authentication and per-request tenant isolation"""
+
+    def test_health_is_public(self):
+        """Test /health needs no token"""
+        mcp_app, _ = make_app()
+        with TestClient(create_http_app(mcp_app)) as client:
+            response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+
+    def test_missing_or_invalid_token_rejected(self):
+        """Test protected endpoints answer 401 without a valid bearer token"""
+        mcp_app, _ = make_app()
+        with TestClient(create_http_app(mcp_app)) as client:
+            assert client.get("/tools").status_code == 401
+            response = client.get("/tools", headers=bearer("not-a-jwt"))
+            assert response.status_code == 401
+            assert response.headers["www-authenticate"] == "Bearer"
+
+    def test_list_tools(self):
+        """Test /tools lists the MCP tools"""
+        mcp_app, _ = make_app()
+        with TestClient(create_http_app(mcp_app)) as client:
+            response = client.get("/tools", headers=bearer(TOKEN_A))
+        names = [tool["name"] for tool in response.json()["tools"]]
+        assert "natural_query" in names
+
+    def test_query_uses_request_token(self):
+        """Test each request authenticates upstream with its own token"""
+        mcp_app, seen = make_app()
+        with TestClient(create_http_app(mcp_app)) as client:
+            for token in (TOKEN_A, TOKEN_B):
+                response = client.post(
+                    "/query", json={"query": "list leads"}, headers=bearer(token)
+                )
+                assert response.status_code == 200
+                assert f"Bearer {token}" in response.json()["result"]
+        assert seen == [f"Bearer {TOKEN_A}", f"Bearer {TOKEN_B}"]
+        # The request token never becomes the process-wide token
+        assert mcp_app.api_client.session_token is None
+        assert mcp_app.tenant_sessions.get_stats()["sessions"] == 2
+
+    def test_set_auth_token_refused_over_http(self):
+        """Test one tenant cannot set the token used by others"""
+        mcp_app, _ = make_app()
+        with TestClient(create_http_app(mcp_app)) as client:
+            response = client.post(
+                "/tools",
+                json={"name": "set_auth_token", "arguments": {"token": TOKEN_B}},
+                headers=bearer(TOKEN_A),
+            )
+        assert "Authorization header" in response.json()["result"]
+        assert mcp_app.api_client.session_token is None
+
+    def test_streamable_http_tool_call(self):
+        """Test a tools/call over /mcp runs with the request's token"""
+        mcp_app, seen = make_app()
+        message = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": {"name": "natural_query", "arguments": {"query": "list leads"}},
+        }
+        with TestClient(create_http_app(mcp_app)) as client:
+            response = client.post(
+                "/mcp",
+                json=message,
+                headers={
+                    **bearer(TOKEN_B),
+                    "Accept": "application/json, text/event-stream",
+                },
+            )
+        assert response.status_code == 200
+        text = response.json()["result"]["content"][0]["text"]
+        assert f"Bearer {TOKEN_B}" in text
+        assert seen == [f"Bearer {TOKEN_B}"]
+
+    async def test_concurrent_tenants_isolated(self):
+        """Test concurrent requests from different tenants keep their tokens"""
+        mcp_app, seen = make_app(single_flight_enabled=False)
+        transport = httpx.ASGITransport(app=create_http_app(mcp_app))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://server.test"
+        ) as client:
+
+            async def query(token):
+                response = await client.post(
+                    "/query", json={"query": "list leads"}, headers=bearer(token)
+                )
+                return token, response.json()["result"]
+
+            results = await asyncio.gather(
+                *(query(TOKEN_A if i % 2 else TOKEN_B) for i in range(20))
+            )
+        for token, text in results:
+            assert json.loads(text.split("\n\n", 1)[1])["auth"] == f"Bearer {token}"
+        assert len(seen) == 20
+
+    async def test_sse_session_bound_to_tenant(self):
+        """Test a tenant cannot post messages to another tenant's SSE session"""
+        mcp_app, _ = make_app()
+        http_app = create_http_app(mcp_app)
+        endpoint = asyncio.get_running_loop().create_future()
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            body = message.get("body", b"")
+            if b"event: endpoint" in body and not endpoint.done():
+                endpoint.set_result(body.decode().split("data: ")[1].split()[0])
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/sse",
+            "raw_path": b"/sse",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"host", b"server.test"),
+                (b"authorization", f"Bearer {TOKEN_A}".encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("server.test", 80),
+        }
+        stream = asyncio.create_task(http_app(scope, receive, send))
+        url = await asyncio.wait_for(endpoint, 5)
+
+        message = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+        transport = httpx.ASGITransport(app=http_app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://server.test"
+        ) as client:
+            response = await client.post(url, json=message, headers=bearer(TOKEN_B))
+            assert response.status_code == 403
+            response = await client.post(url, json=message, headers=bearer(TOKEN_A))
+            assert response.status_code == 202
+
+            disconnected.set()
+            await asyncio.wait_for(stream, 5)
+            # The binding goes with the session
+            response = await client.post(url, json=message, headers=bearer(TOKEN_B))
+            assert response.status_code == 404
+
+    def test_rate_limited_calls_queue_for_permit(self):
+        """Test over-limit calls wait for a token instead of failing"""
+        mcp_app, seen = make_app(
+            rate_limit_algorithm="token_bucket",
+            rate_limit_requests=20,
+            rate_limit_window=1,
+            rate_limit_burst=1,
+            rate_limit_max_delay=1.0,
+        )
+        with TestClient(create_http_app(mcp_app)) as client:
+            for _ in range(3):
+                response = client.post(
+                    "/query", json={"query": "list leads"}, headers=bearer(TOKEN_A)
+                )
+                assert "Rate limit exceeded" not in response.json()["result"]
+        assert len(seen) == 3
+        waits = mcp_app.metrics.snapshot()["metrics"]["ambivo_rate_limit_wait_seconds"]
+        assert waits[0]["count"] == 3
+        assert mcp_app.rate_limiter.get_stats()["queued"] >= 1
+
+    def test_large_responses_cost_more(self):
+        """Test calls are charged their tool weight plus their response size"""
+        mcp_app, seen = make_app(
+            rate_limit_requests=10,
+            rate_limit_tool_weights={"natural_query": 2},
+            rate_limit_cost_per_mb=1048576 / 5,  # one request per 5 bytes
+        )
+        with TestClient(create_http_app(mcp_app)) as client:
+            results = [
+                client.post(
+                    "/query", json={"query": "list leads"}, headers=bearer(token)
+                ).json()["result"]
+                for token in (TOKEN_A, TOKEN_A, TOKEN_B)
+            ]
+        # The ~60 byte reply costs about 12 requests, more than the limit
+        assert "Rate limit exceeded" not in results[0]
+        assert "Rate limit exceeded" in results[1]
+        assert "Rate limit exceeded" not in results[2]
+        assert len(seen) == 2
+        charged = mcp_app.rate_limiter.get_client_stats(
+            mcp_app.token_validator.get_client_id_from_token(TOKEN_A)
+        )["requests"]
+        assert charged > 10
+
+    def test_token_hashed_once_per_request(self):
+        """Test the token cache and tenant session share one token digest"""
+        mcp_app, _ = make_app()
+        module = sys.modules[TokenValidator.__module__]
+        with TestClient(create_http_app(mcp_app)) as client:
+            for _ in range(2):
+                with patch.object(
+                    module.hashlib, "sha256", wraps=module.hashlib.sha256
+                ) as sha256:
+                    response = client.post(
+                        "/tools", json={"name": "server_stats"}, headers=bearer(TOKEN_A)
+                    )
+                assert response.status_code == 200
+                assert sha256.call_count == 1
+
+    def test_tenants_limited_by_tier(self):
+        """Test each tenant gets the limit of its tier"""
+        client_id_a = TokenValidator().get_client_id_from_token(TOKEN_A)
+        mcp_app, seen = make_app(
+            rate_limit_requests=1,
+            rate_limit_tiers={"gold": {"requests": 3}},
+            rate_limit_tenant_tiers={client_id_a: "gold"},
+        )
+        with TestClient(create_http_app(mcp_app)) as client:
+            results = {
+                token: [
+                    client.post(
+                        "/query", json={"query": "list leads"}, headers=bearer(token)
+                    ).json()["result"]
+                    for _ in range(4)
+                ]
+                for token in (TOKEN_A, TOKEN_B)
+            }
+        assert ["Rate limit exceeded" in r for r in results[TOKEN_A]] == [
+            False, False, False, True
+        ]
+        assert "Requests: 3/3" in results[TOKEN_A][3]
+        assert ["Rate limit exceeded" in r for r in results[TOKEN_B]] == [
+            False, True, True, True
+        ]
+        assert len(seen) == 4
+
+        # Rejections show up among the heavy hitters in server_stats
+        usage = mcp_app.metrics.snapshot()["rate_limit_usage"]
+        assert usage["top_rejected"][0]["count"] == 3
+        assert usage["top_consumers"][0] == {
+            "client_id": client_id_a,
+            "count": 3,
+            "error": 0,
+        }
+
+    def test_server_stats_scoped_to_tenant(self):
+        """Test a tenant's server_stats shows its own usage only"""
+        client_id_a = TokenValidator().get_client_id_from_token(TOKEN_A)
+        mcp_app, _ = make_app(rate_limit_requests=2)
+        with TestClient(create_http_app(mcp_app)) as client:
+            for token in (TOKEN_A, TOKEN_B, TOKEN_B, TOKEN_B):
+                client.post(
+                    "/query", json={"query": "list leads"}, headers=bearer(token)
+                )
+            response = client.post(
+                "/tools", json={"name": "server_stats"}, headers=bearer(TOKEN_A)
+            )
+        stats = json.loads(response.json()["result"].split("\n\n", 1)[1])
+        assert stats["rate_limit_usage"] == {
+            "client_id": client_id_a,
+            "consumed": 1,
+            "rejected": 0,
+        }
+        assert stats["transfer"]["client_id"] == client_id_a
+        assert stats["transfer"]["requests"] == 1
+        # The full report stays available to the operator
+        snapshot = mcp_app.metrics.snapshot()
+        assert snapshot["transfer"]["requests"] == 3
+        usage = snapshot["rate_limit_usage"]
+        assert len(usage["top_consumers"]) == 2
+        assert usage["top_rejected"][0]["count"] == 1
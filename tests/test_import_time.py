@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for a cheap server entry-point import
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+try:
+    import ambivo_mcp_server
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    import ambivo_mcp_server
+
+REPO_ROOT = os.path.dirname(
+    os.path.dirname(os.path.abspath(ambivo_mcp_server.__file__))
+)
+DEFERRED = ("mcp", "httpx", "httpcore", "pydantic")
+
+
+def imported_modules(statement):
+    """Run an import in a fresh interpreter and list the modules it loaded"""
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(completed.stdout.split())
+
+
+class TestLazyImports:
+    """Test heavy dependencies are deferred until the app is created"""
+
+    @pytest.mark.parametrize(
+        "statement",
+        ["import ambivo_mcp_server", "import ambivo_mcp_server.server"],
+    )
+    def test_entry_point_defers_heavy_imports(self, statement):
+        """Test importing the entry point loads neither mcp nor httpx"""
+        modules = imported_modules(statement)
+
+        assert "ambivo_mcp_server" in modules
+        eager = [m for m in modules if m.split(".")[0] in DEFERRED]
+        assert eager == []
+
+    def test_create_app_imports_on_demand(self):
+        """Test the factory pulls in the MCP application"""
+        modules = imported_modules(
+            "from ambivo_mcp_server.server import create_app; "
+            "from ambivo_mcp_server.config import ServerConfig; "
+            "create_app(ServerConfig())"
+        )
+
+        assert "mcp" in modules
+        assert "ambivo_mcp_server.app" in modules
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for JSON encoding helpers
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+try:
+    import json_codec
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import json_codec
+
+
+RESULT = {"success": True, "data": [{"name": "Zoë", "amount": 10.5, "tags": None}]}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def codec(request):
+    if request.param == "orjson" and json_codec.orjson is None:
+        pytest.skip("orjson not installed")
+    if request.param == "stdlib":
+        with patch.object(json_codec, "orjson", None):
+            yield json_codec
+    else:
+        yield json_codec
+
+
+class TestJsonCodec:
+    """Test compact encoding with and without orjson"""
+    
+    def test_dumps_compact(self, codec):
+        """Test output has no indentation or separator padding"""
+        text = codec.dumps(RESULT)
+        
+        assert "\n" not in text
+        assert ", " not in text
+        assert json.loads(text) == RESULT
+    
+    def test_dumps_keeps_unicode(self, codec):
+        """Test non-ASCII text is not escaped"""
+        assert "Zoë" in codec.dumps(RESULT)
+    
+    def test_loads_bytes_and_text(self, codec):
+        """Test decoding from bytes and str"""
+        encoded = json.dumps(RESULT)
+        
+        assert codec.loads(encoded) == RESULT
+        assert codec.loads(encoded.encode("utf-8")) == RESULT
+    
+    def test_is_container(self, codec):
+        """Test objects and arrays are recognised from their delimiters"""
+        assert codec.is_container(b' {"success": true}\n')
+        assert codec.is_container(b"[1, 2]")
+        assert not codec.is_container(b"upstream busy")
+        assert not codec.is_container(b'"text"')
+        assert not codec.is_container(b'{"truncated": ')
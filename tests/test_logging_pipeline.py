@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the logging pipeline
+"""
+
+import logging
+import logging.handlers
+import os
+import tempfile
+import pytest
+from unittest.mock import patch
+try:
+    from config import ServerConfig
+    from logging_pipeline import SAMPLED, SamplingFilter, stop_queue_logging
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import ServerConfig
+    from logging_pipeline import SAMPLED, SamplingFilter, stop_queue_logging
+
+
+def make_record(level=logging.INFO, sampled=True, msg="Tool call started: %s", args=("natural_query",)):
+    record = logging.LogRecord("ambivo-mcp", level, __file__, 1, msg, args, None)
+    if sampled:
+        record.__dict__.update(SAMPLED)
+    return record
+
+
+class TestSamplingFilter:
+    """Test per-call log sampling"""
+    
+    def test_unsampled_records_pass(self):
+        """Test records not marked as sampled are never dropped"""
+        sampling = SamplingFilter(rate=1)
+        assert sampling.filter(make_record())
+        for _ in range(10):
+            assert sampling.filter(make_record(sampled=False))
+            assert sampling.filter(make_record(level=logging.WARNING))
+    
+    def test_rate_limited(self):
+        """Test sampled records beyond the rate are suppressed"""
+        sampling = SamplingFilter(rate=2)
+        with patch("logging_pipeline.time.monotonic", return_value=sampling.last_refill):
+            passed = sum(sampling.filter(make_record()) for _ in range(10))
+        
+        assert passed == 2
+        assert sampling.get_stats()["suppressed"] == 8
+    
+    def test_reports_suppressed(self):
+        """Test the next admitted record reports suppressed lines"""
+        sampling = SamplingFilter(rate=1)
+        start = sampling.last_refill
+        with patch("logging_pipeline.time.monotonic", return_value=start):
+            sampling.filter(make_record())
+            sampling.filter(make_record())
+            sampling.filter(make_record())
+        
+        record = make_record()
+        with patch("logging_pipeline.time.monotonic", return_value=start + 1.0):
+            assert sampling.filter(record)
+        assert record.getMessage() == (
+            "Tool call started: natural_query (2 similar lines suppressed)"
+        )
+    
+    def test_same_record_one_decision(self):
+        """Test a record reaching several handlers is only charged once"""
+        sampling = SamplingFilter(rate=1)
+        record = make_record()
+        with patch("logging_pipeline.time.monotonic", return_value=sampling.last_refill):
+            assert sampling.filter(record)
+            assert sampling.filter(record)
+            assert not sampling.filter(make_record())
+
+
+class TestQueueLogging:
+    """Test the queue-backed logging setup"""
+    
+    def test_records_written_by_listener(self):
+        """Test records reach the log file through the queue listener"""
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        root.handlers = []
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = os.path.join(tmpdir, "server.log")
+            config = ServerConfig(log_file=log_file, log_queue_enabled=True)
+            logger = config.setup_logging()
+            try:
+                assert any(
+                    isinstance(h, logging.handlers.QueueHandler) for h in root.handlers
+                )
+                logger.info("Executing natural query: %s", "show leads")
+            finally:
+                stop_queue_logging()
+                for handler in root.handlers + logger.handlers:
+                    handler.close()
+                root.handlers = saved_handlers
+                root.setLevel(saved_level)
+                logger.handlers = []
+            
+            with open(log_file) as f:
+                assert "Executing natural query: show leads" in f.read()
+    
+    def test_validate_sample_rate(self):
+        """Test negative sample rates are rejected"""
+        with pytest.raises(ValueError, match="Log sample rate"):
+            ServerConfig(log_sample_rate=-1).validate()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for the metrics registry
+"""
+
+import asyncio
+import json
+import pytest
+try:
+    from metrics import MetricsRegistry, serve_metrics
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from metrics import MetricsRegistry, serve_metrics
+
+
+class TestMetricsRegistry:
+    """Test metric recording and exposition"""
+    
+    def test_counter_and_gauge(self):
+        """Test counters and gauges render in Prometheus format"""
+        registry = MetricsRegistry()
+        responses = registry.counter("upstream_responses", "Responses", ("status",))
+        in_flight = registry.gauge("in_flight", "In flight")
+        
+        responses.labels("200").inc()
+        responses.labels("200").inc()
+        responses.labels("503").inc()
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+        
+        text = registry.render_prometheus()
+        assert "# TYPE ambivo_upstream_responses counter" in text
+        assert 'ambivo_upstream_responses_total{status="200"} 2' in text
+        assert 'ambivo_upstream_responses_total{status="503"} 1' in text
+        assert "ambivo_in_flight 1" in text
+    
+    def test_histogram_buckets(self):
+        """Test histogram buckets are cumulative"""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            latency.observe(value)
+        
+        text = registry.render_prometheus()
+        assert 'ambivo_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'ambivo_latency_seconds_bucket{le="1"} 3' in text
+        assert 'ambivo_latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "ambivo_latency_seconds_count 4" in text
+        assert "ambivo_latency_seconds_sum 6.05" in text
+    
+    def test_snapshot_percentiles(self):
+        """Test snapshots estimate percentiles from buckets"""
+        registry = MetricsRegistry()
+        latency = registry.histogram(
+            "tool_seconds", "Latency", ("tool",), buckets=(1.0, 2.0, 4.0)
+        )
+        for _ in range(50):
+            latency.labels("natural_query").observe(0.5)
+        for _ in range(50):
+            latency.labels("natural_query").observe(3.0)
+        
+        series = registry.snapshot()["metrics"]["ambivo_tool_seconds"][0]
+        assert series["tool"] == "natural_query"
+        assert series["count"] == 100
+        assert series["p50"] == pytest.approx(1.0)
+        assert 2.0 < series["p99"] <= 4.0
+    
+    def test_label_count_checked(self):
+        """Test the wrong number of label values is rejected"""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls", "Calls", ("tool",))
+        with pytest.raises(ValueError):
+            counter.labels("natural_query", "extra")
+    
+    def test_get_or_create(self):
+        """Test registering a name twice returns the same metric"""
+        registry = MetricsRegistry()
+        assert registry.counter("calls", "Calls") is registry.counter("calls", "Calls")
+        with pytest.raises(ValueError):
+            registry.gauge("calls", "Calls")
+    
+    def test_collectors(self):
+        """Test component stats are exposed as gauges"""
+        registry = MetricsRegistry()
+        registry.register_collector(
+            "cache", lambda: {"hits": 3, "hit_ratio": 0.75, "state": "closed"}
+        )
+        registry.register_collector("disabled", lambda: None)
+        
+        text = registry.render_prometheus()
+        assert "ambivo_cache_hits 3" in text
+        assert "ambivo_cache_hit_ratio 0.75" in text
+        assert "state" not in text
+        assert registry.snapshot()["cache"]["hits"] == 3
+        assert "disabled" not in registry.snapshot()
+    
+    def test_export_and_merge_state(self):
+        """Test metrics from several registries sum when merged"""
+        workers = []
+        for value in (0.5, 5.0):
+            worker = MetricsRegistry()
+            worker.counter("calls", "Calls", ("tool",)).labels("natural_query").inc()
+            worker.gauge("in_flight", "In flight").inc()
+            worker.histogram("latency", "Latency", buckets=(1.0,)).observe(value)
+            workers.append(json.loads(json.dumps(worker.export_state())))
+        
+        merged = MetricsRegistry()
+        for state in workers:
+            merged.merge_state(state)
+        text = merged.render_prometheus()
+        assert 'ambivo_calls_total{tool="natural_query"} 2' in text
+        assert "ambivo_in_flight 2" in text
+        assert 'ambivo_latency_bucket{le="1"} 1' in text
+        assert 'ambivo_latency_bucket{le="+Inf"} 2' in text
+        assert "ambivo_latency_sum 5.5" in text
+    
+    def test_merge_gauges_by_max(self):
+        """Test state gauges take the largest worker value instead of the sum"""
+        merged = MetricsRegistry()
+        for value in (1, 0, 1):
+            worker = MetricsRegistry()
+            worker.gauge("circuit_open", "Circuit open", aggregate="max").set(value)
+            worker.gauge("in_flight", "In flight").set(value)
+            merged.merge_state(json.loads(json.dumps(worker.export_state())))
+        
+        text = merged.render_prometheus()
+        assert "ambivo_circuit_open 1" in text
+        assert "ambivo_in_flight 2" in text
+        
+        with pytest.raises(ValueError, match="aggregation"):
+            merged.gauge("other", "Other", aggregate="mean")
+    
+    def test_merge_state_kinds(self):
+        """Test merging can be limited to some metric kinds"""
+        worker = MetricsRegistry()
+        worker.counter("calls", "Calls").inc()
+        worker.gauge("in_flight", "In flight").inc()
+        
+        merged = MetricsRegistry()
+        merged.merge_state(worker.export_state(), kinds=("counter",))
+        assert "ambivo_calls" in merged.metrics
+        assert "ambivo_in_flight" not in merged.metrics
+
+
+class TestMetricsEndpoint:
+    """Test the standalone /metrics listener"""
+    
+    async def test_serve_metrics(self):
+        """Test GET /metrics returns the exposition text"""
+        registry = MetricsRegistry()
+        registry.counter("calls", "Calls").inc()
+        metrics_server = await serve_metrics(registry, "127.0.0.1", 0)
+        port = metrics_server.sockets[0].getsockname()[1]
+        
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            response = (await reader.read()).decode()
+            writer.close()
+        finally:
+            metrics_server.close()
+        
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert "ambivo_calls_total 1" in response
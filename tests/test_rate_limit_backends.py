@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Tests for shared rate limit backends
+"""
+
+import hashlib
+import os
+import socket
+import socketserver
+import threading
+import pytest
+
+try:
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.rate_limit_backends import (
+        RateLimitBackendError,
+        RedisBackend,
+        SQLiteBackend,
+        SharedRateLimiter,
+    )
+    from ambivo_mcp_server.security import RateLimitPolicy
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.rate_limit_backends import (
+        RateLimitBackendError,
+        RedisBackend,
+        SQLiteBackend,
+        SharedRateLimiter,
+    )
+    from ambivo_mcp_server.security import RateLimitPolicy
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """Tiny Redis-protocol server with the commands the backend uses"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RedisStandInHandler)
+        self.data = {}
+        self.expiry = {}
+        self.scripts = set()
+        self.commands = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def execute(self, command):
+        name, args = command[0].upper(), command[1:]
+        with self.lock:
+            self.commands.append(name)
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name == b"EVAL":
+                self.scripts.add(hashlib.sha1(args[0]).hexdigest().encode())
+                return self.take(*args[2:])
+            if name == b"EVALSHA":
+                if args[0] not in self.scripts:
+                    return b"-NOSCRIPT No matching script\r\n"
+                return self.take(*args[2:])
+            if name == b"EXPIRE":
+                self.expiry[args[0]] = int(args[1])
+                return b":1\r\n"
+            if name == b"GET":
+                value = self.data.get(args[0])
+                if value is None:
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(value), value)
+        return b"-ERR unknown command\r\n"
+
+    def take(self, key, previous_key, count, expiry, max_requests, overlap):
+        """What the backend's take script does; Lua itself is not run"""
+        current = int(self.data.get(key, 0))
+        previous = int(self.data.get(previous_key, 0))
+        granted = int(count)
+        if max_requests:
+            capacity = int(int(max_requests) - previous * float(overlap))
+            granted = max(0, min(granted, capacity - current))
+        if granted:
+            current += granted
+            self.data[key] = str(current).encode()
+            self.expiry[key] = int(expiry)
+        return b"*3\r\n:%d\r\n:%d\r\n:%d\r\n" % (current, previous, granted)
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                command.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.execute(command))
+
+
+@pytest.fixture
+def redis_server():
+    server = RedisStandIn()
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_backend(request, tmp_path):
+    """Factory of backends sharing one store, like separate workers would"""
+    if request.param == "sqlite":
+        path = str(tmp_path / "rate_limits.sqlite")
+        yield lambda: SQLiteBackend(path)
+    else:
+        server = request.getfixturevalue("redis_server")
+        yield lambda: RedisBackend(server.url)
+
+
+class TestSharedRateLimiter:
+    """Test rate limits shared between processes"""
+
+    def test_limit_shared_between_workers(self, make_backend, clock):
+        """Test two limiters on one backend admit the limit once in total"""
+        workers = [
+            SharedRateLimiter(make_backend(), max_requests=20, window_seconds=60)
+            for _ in range(2)
+        ]
+        allowed = sum(
+            worker.is_allowed("client") for _ in range(30) for worker in workers
+        )
+        assert allowed == 20
+
+    def test_permits_leased_in_batches(self, make_backend, clock):
+        """Test most calls are served from locally leased permits"""
+        limiter = SharedRateLimiter(
+            make_backend(), max_requests=1000, window_seconds=60, lease_size=10
+        )
+        for _ in range(100):
+            assert limiter.is_allowed("client") == True
+        assert limiter.round_trips == 10
+
+    def test_previous_window_weighted(self, make_backend, clock):
+        """Test the previous window's count limits the start of the next one"""
+        clock.now = 960.0
+        limiter = SharedRateLimiter(
+            make_backend(), max_requests=10, window_seconds=60, lease_size=1
+        )
+        for _ in range(10):
+            assert limiter.is_allowed("client") == True
+
+        # Halfway through the next window half the old requests still count
+        clock.now = 1050.0
+        allowed = sum(limiter.is_allowed("client") for _ in range(10))
+        assert allowed == 5
+
+    def test_rejections_not_counted(self, make_backend, clock):
+        """Test rejected calls do not use up the next window's quota"""
+        clock.now = 960.0
+        limiter = SharedRateLimiter(
+            make_backend(), max_requests=5, window_seconds=60, lease_size=1
+        )
+        for _ in range(50):
+            limiter.is_allowed("client")
+        assert limiter.get_client_stats("client")["requests"] == 5
+
+        clock.now = 1080.0
+        assert limiter.is_allowed("client") == True
+
+    def test_weighted_costs(self, make_backend, clock):
+        """Test costs are spent from leased permits and reconciled"""
+        workers = [
+            SharedRateLimiter(make_backend(), max_requests=20, window_seconds=60)
+            for _ in range(2)
+        ]
+        # Worker 0 leases 5 permits and keeps 2.5 for later calls
+        assert workers[0].is_allowed("client", cost=2.5) == True
+        assert workers[1].is_allowed("client", cost=12) == True
+        # Extra cost is charged to the shared count even over the limit
+        workers[1].adjust("client", 8)
+        assert workers[1].get_client_stats("client")["requests"] == 25
+        assert workers[0].is_allowed("client", cost=2.5) == True
+        assert workers[0].is_allowed("client", cost=1) == False
+
+    async def test_acquire_off_event_loop(self, make_backend):
+        """Test round trips made by acquire run outside the event loop thread"""
+        backend = make_backend()
+        threads = []
+        take = backend.take
+
+        def recording_take(*args):
+            threads.append(threading.get_ident())
+            return take(*args)
+
+        backend.take = recording_take
+        limiter = SharedRateLimiter(
+            backend, max_requests=3, window_seconds=60, lease_size=1
+        )
+        results = [await limiter.acquire("client") for _ in range(5)]
+        assert results == [0.0, 0.0, 0.0, None, None]
+        assert len(threads) == 4
+        assert threading.get_ident() not in threads
+
+    async def test_reconcile_off_event_loop(self, make_backend, clock):
+        """Test extra cost is charged from a worker thread and applied on the loop"""
+        backend = make_backend()
+        threads = []
+        take = backend.take
+
+        def recording_take(*args):
+            threads.append(threading.get_ident())
+            return take(*args)
+
+        backend.take = recording_take
+        limiter = SharedRateLimiter(backend, max_requests=20, window_seconds=60)
+        assert await limiter.acquire("client", cost=2) == 0.0
+        await limiter.reconcile("client", 10)
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+        assert limiter.get_client_stats("client")["requests"] == 12
+
+        # A failed charge backs off to the local limiter, set on the loop
+        def failing_take(*args):
+            raise RateLimitBackendError("down")
+
+        backend.take = failing_take
+        await limiter.reconcile("client", 5)
+        assert limiter.backend_errors == 1
+        assert limiter.backend_down_until == clock.now + 5.0
+
+    def test_backend_failure_falls_back_to_local_limits(self):
+        """Test an unreachable backend limits requests per process"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        limiter = SharedRateLimiter(
+            RedisBackend(f"redis://127.0.0.1:{port}"), max_requests=3, window_seconds=60
+        )
+        allowed = sum(limiter.is_allowed("client") for _ in range(5))
+        assert allowed == 3
+        assert limiter.get_stats()["backend_errors"] == 1
+
+    def test_redis_takes_permits_in_one_round_trip(self, redis_server):
+        """Test taking permits is one script call, sent in full only once"""
+        backend = RedisBackend(redis_server.url)
+        assert backend.take("client", 960, 60, 4) == (4, 0, 4)
+        assert backend.take("client", 960, 60, 4) == (8, 0, 4)
+        assert backend.take("client", 1020, 60, 1) == (1, 8, 1)
+        assert redis_server.expiry[b"ambivo:rl:client:1020"] == 120
+        assert redis_server.commands == [b"EVALSHA", b"EVAL", b"EVALSHA", b"EVALSHA"]
+        backend.close()
+
+    def test_take_grants_only_within_limit(self, make_backend):
+        """Test permits over the limit are never added to the shared count"""
+        backend = make_backend()
+        assert backend.take("client", 960, 60, 6, max_requests=10) == (6, 0, 6)
+        assert backend.take("client", 960, 60, 6, max_requests=10) == (10, 0, 4)
+        assert backend.take("client", 960, 60, 6, max_requests=10) == (10, 0, 0)
+        # Half of the previous window's 10 still count at the next one's midpoint
+        assert backend.take(
+            "client", 1020, 60, 6, max_requests=10, overlap=0.5
+        ) == (5, 10, 5)
+        # Without a limit every permit is added
+        assert backend.take("client", 1020, 60, 3) == (8, 10, 3)
+        backend.close()
+
+    def test_redis_error_reply(self, redis_server):
+        """Test error replies raise without desynchronizing the connection"""
+        backend = RedisBackend(redis_server.url)
+        with pytest.raises(RateLimitBackendError):
+            backend.redis.pipeline(("FLUSHALL",), ("PING",))
+        assert backend.redis.pipeline(("PING",)) == ["PONG"]
+        backend.close()
+
+    def test_sqlite_expire(self, tmp_path):
+        """Test old windows are deleted"""
+        backend = SQLiteBackend(str(tmp_path / "rate_limits.sqlite"))
+        backend.take("client", 900, 60, 1)
+        backend.take("client", 960, 60, 1)
+        backend.expire(960)
+        assert backend.take("client", 1020, 60, 1) == (1, 1, 1)
+        assert backend.take("client", 960, 60, 1) == (2, 0, 1)
+        backend.close()
+
+    def test_from_config(self, tmp_path):
+        """Test the backend is chosen from the configuration"""
+        config = ServerConfig(
+            rate_limit_backend="sqlite",
+            rate_limit_sqlite_path=str(tmp_path / "rate_limits.sqlite"),
+            rate_limit_lease_size=5,
+        )
+        config.validate()
+        limiter = SharedRateLimiter.from_config(config)
+        assert isinstance(limiter.backend, SQLiteBackend)
+        assert limiter.lease_size == 5
+
+        with pytest.raises(ValueError, match="Redis URL"):
+            ServerConfig(rate_limit_backend="redis").validate()
+        for setting in (
+            {"rate_limit_algorithm": "token_bucket"},
+            {"rate_limit_max_delay": 1.0},
+        ):
+            with pytest.raises(ValueError, match="only apply to the local backend"):
+                ServerConfig(
+                    rate_limit_backend="sqlite",
+                    rate_limit_sqlite_path=str(tmp_path / "rate_limits.sqlite"),
+                    **setting,
+                ).validate()
+
+    def test_tier_policies(self, make_backend, clock):
+        """Test each client is limited by the policy passed with its calls"""
+        limiter = SharedRateLimiter(
+            make_backend(), max_requests=2, window_seconds=60
+        )
+        gold = RateLimitPolicy("gold", 6, 60)
+        assert sum(limiter.is_allowed("gold", policy=gold) for _ in range(10)) == 6
+        assert sum(limiter.is_allowed("free") for _ in range(10)) == 2
+        assert limiter.get_client_stats("gold")["remaining"] == 0
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for server-side result storage
+"""
+
+import json
+import mmap
+import pytest
+import time
+from unittest.mock import patch
+try:
+    from result_store import ResultNotFoundError, ResultStore, find_rows, parse_result_uri
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from result_store import ResultNotFoundError, ResultStore, find_rows, parse_result_uri
+
+
+def _result(rows: int = 25):
+    return {
+        "success": True,
+        "natural_response": f"Found {rows} leads",
+        "data": [{"id": i, "name": f"Lead {i}"} for i in range(rows)],
+    }
+
+
+class TestFindRows:
+    """Test locating table rows in results"""
+    
+    def test_top_level_key(self):
+        """Test rows under a top-level key"""
+        rows, path = find_rows({"data": [1, 2]})
+        assert rows == [1, 2]
+        assert path == ["data"]
+    
+    def test_nested_key(self):
+        """Test rows one level down"""
+        rows, path = find_rows({"data": {"rows": [1], "count": 1}})
+        assert rows == [1]
+        assert path == ["data", "rows"]
+    
+    def test_no_rows(self):
+        """Test results without rows"""
+        assert find_rows({"natural_response": "None found"}) == (None, None)
+
+
+class TestParseResultUri:
+    """Test result resource URI parsing"""
+    
+    def test_parse(self):
+        """Test handle and page extraction"""
+        assert parse_result_uri("ambivo://results/abc123?page=4") == ("abc123", 4)
+    
+    def test_default_page(self):
+        """Test page defaults to zero"""
+        assert parse_result_uri("ambivo://results/abc123") == ("abc123", 0)
+    
+    def test_invalid(self):
+        """Test unknown URIs are rejected"""
+        with pytest.raises(ValueError):
+            parse_result_uri("https://results/abc")
+        with pytest.raises(ValueError):
+            parse_result_uri("ambivo://results/abc?page=x")
+
+
+class TestResultStore:
+    """Test handle storage, paging, TTL and quotas"""
+    
+    def test_store_summary(self):
+        """Test the summary keeps non-row fields and describes the rows"""
+        store = ResultStore(page_size=10)
+        summary = store.store("tenant_a", _result(25))
+        
+        assert summary["natural_response"] == "Found 25 leads"
+        assert "data" not in summary
+        assert summary["total_rows"] == 25
+        assert summary["pages"] == 3
+        assert summary["columns"] == ["id", "name"]
+        assert len(summary["preview"]) == 5
+        assert summary["resource_uri"].startswith("ambivo://results/")
+    
+    def test_get_page(self):
+        """Test pages are row slices in order"""
+        store = ResultStore(page_size=10)
+        handle = store.store("tenant_a", _result(25))["result_handle"]
+        
+        page = json.loads(store.get_page("tenant_a", handle, 2))
+        
+        assert page["page"] == 2
+        assert page["pages"] == 3
+        assert [row["id"] for row in page["rows"]] == [20, 21, 22, 23, 24]
+    
+    def test_page_out_of_range(self):
+        """Test invalid pages raise"""
+        store = ResultStore(page_size=10)
+        handle = store.store("tenant_a", _result(25))["result_handle"]
+        
+        with pytest.raises(ValueError, match="Page out of range"):
+            store.get_page("tenant_a", handle, 3)
+    
+    def test_tenant_isolation(self):
+        """Test other tenants cannot read a handle"""
+        store = ResultStore()
+        handle = store.store("tenant_a", _result())["result_handle"]
+        
+        with pytest.raises(ResultNotFoundError):
+            store.get_page("tenant_b", handle, 0)
+    
+    def test_no_rows_not_stored(self):
+        """Test results without rows are returned inline"""
+        store = ResultStore()
+        
+        assert store.store("tenant_a", {"natural_response": "nothing"}) is None
+    
+    def test_ttl_expiry(self):
+        """Test handles expire and free their bytes"""
+        store = ResultStore(ttl=60)
+        handle = store.store("tenant_a", _result())["result_handle"]
+        
+        with patch("result_store.time.monotonic", return_value=time.monotonic() + 61):
+            with pytest.raises(ResultNotFoundError):
+                store.get_page("tenant_a", handle, 0)
+        
+        assert store.get_stats()["bytes"] == 0
+    
+    def test_spill_to_mmap(self):
+        """Test large results are memory-mapped from a temp file"""
+        store = ResultStore(page_size=10, spill_bytes=100)
+        handle = store.store("tenant_a", _result(50))["result_handle"]
+        
+        assert isinstance(store.results[handle].data, mmap.mmap)
+        assert store.get_stats()["spilled"] == 1
+        page = json.loads(store.get_page("tenant_a", handle, 4))
+        assert page["rows"][-1] == {"id": 49, "name": "Lead 49"}
+        
+        store.close()
+        assert store.get_stats()["results"] == 0
+    
+    def test_tenant_quota_evicts_oldest(self):
+        """Test a tenant over quota loses its oldest results first"""
+        store = ResultStore()
+        first = store.store("tenant_a", _result(20))["result_handle"]
+        per_result = store.tenant_bytes["tenant_a"]
+        store.tenant_quota_bytes = per_result * 2
+        
+        second = store.store("tenant_a", _result(20))["result_handle"]
+        other = store.store("tenant_b", _result(20))["result_handle"]
+        third = store.store("tenant_a", _result(20))["result_handle"]
+        
+        assert first not in store.results
+        assert second in store.results
+        assert third in store.results
+        assert other in store.results
+    
+    def test_result_over_quota_inline(self):
+        """Test a single result larger than the quota is not stored"""
+        store = ResultStore(tenant_quota_bytes=10)
+        
+        assert store.store("tenant_a", _result()) is None
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Tests for the upstream retry policy
+"""
+
+import httpx
+import pytest
+import time
+from email.utils import formatdate
+from unittest.mock import AsyncMock, patch
+try:
+    from retry import RetryBudget, RetryPolicy, full_jitter_backoff, parse_retry_after
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from retry import RetryBudget, RetryPolicy, full_jitter_backoff, parse_retry_after
+
+from ambivo_mcp_server.api_client import AmbivoAPIClient
+from ambivo_mcp_server.config import ServerConfig
+
+URL = "http://upstream.test/entity/natural_query"
+
+
+def make_client(responses, **overrides):
+    """API client whose upstream replays `responses`, recording each request"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        response = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    config = ServerConfig(
+        base_url="http://upstream.test", circuit_breaker_enabled=False, **overrides
+    )
+    client = AmbivoAPIClient(config)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, calls
+
+
+class TestBackoff:
+    """Test capped full-jitter backoff"""
+    
+    def test_upper_bound_doubles(self):
+        """Test the jitter range doubles per attempt"""
+        assert full_jitter_backoff(0, 0.5, 10, rand=lambda: 1.0) == 0.5
+        assert full_jitter_backoff(3, 0.5, 10, rand=lambda: 1.0) == 4.0
+    
+    def test_capped(self):
+        """Test the jitter range never exceeds the cap"""
+        assert full_jitter_backoff(20, 0.5, 10, rand=lambda: 1.0) == 10
+    
+    def test_jitter_spreads_delays(self):
+        """Test delays are randomized within the range"""
+        delays = {full_jitter_backoff(4, 0.5, 10) for _ in range(20)}
+        
+        assert len(delays) > 1
+        assert all(0 <= d <= 8 for d in delays)
+
+
+class TestRetryAfter:
+    """Test Retry-After header parsing"""
+    
+    def test_seconds(self):
+        """Test delay-seconds form"""
+        assert parse_retry_after("7") == 7.0
+    
+    def test_http_date(self):
+        """Test HTTP-date form"""
+        now = time.time()
+        delay = parse_retry_after(formatdate(now + 20, usegmt=True), now=now)
+        
+        assert 19 <= delay <= 21
+    
+    def test_date_in_past(self):
+        """Test dates in the past mean no wait"""
+        now = time.time()
+        assert parse_retry_after(formatdate(now - 60, usegmt=True), now=now) == 0.0
+    
+    def test_missing_or_malformed(self):
+        """Test missing and malformed values"""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRetryBudget:
+    """Test token-bucket retry budget"""
+    
+    def test_budget_exhausts(self):
+        """Test retries stop once tokens are spent"""
+        budget = RetryBudget(ratio=0.1, min_per_second=0, max_tokens=2)
+        
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is False
+        assert budget.exhausted == 1
+    
+    def test_successes_earn_retries(self):
+        """Test each success deposits a fraction of a retry"""
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=2)
+        budget.tokens = 0
+        
+        budget.record_success()
+        assert budget.try_acquire() is False
+        budget.record_success()
+        assert budget.try_acquire() is True
+    
+    def test_time_refill(self):
+        """Test the minimum time-based refill"""
+        budget = RetryBudget(ratio=0, min_per_second=1.0, max_tokens=5)
+        budget.tokens = 0
+        
+        with patch("retry.time.monotonic", return_value=budget.last_refill + 2):
+            assert budget.try_acquire() is True
+        assert budget.tokens == pytest.approx(1.0)
+
+
+class TestRetryPolicy:
+    """Test retry decisions"""
+    
+    def test_retryable_statuses(self):
+        """Test default retryable statuses"""
+        policy = RetryPolicy()
+        
+        for status in (429, 502, 503, 504):
+            assert policy.is_retryable_status(status)
+        assert not policy.is_retryable_status(500)
+        assert not policy.is_retryable_status(404)
+    
+    def test_retry_after_honored(self):
+        """Test Retry-After overrides backoff"""
+        policy = RetryPolicy(retry_after_max=30)
+        
+        assert policy.delay_for_status(0, "5") == 5.0
+    
+    def test_retry_after_too_long(self):
+        """Test excessive Retry-After values are not retried"""
+        policy = RetryPolicy(retry_after_max=30)
+        
+        assert policy.delay_for_status(0, "120") is None
+    
+    def test_stats(self):
+        """Test attempt latency and retry counters"""
+        policy = RetryPolicy(budget=RetryBudget(min_per_second=0, max_tokens=1))
+        policy.record_attempt(0.2, "503")
+        policy.record_attempt(0.4, "200")
+        policy.allow_retry()
+        policy.allow_retry()
+        
+        stats = policy.get_stats()
+        assert stats["attempts"] == 2
+        assert stats["retries"] == 1
+        assert stats["budget_exhausted"] == 1
+        assert stats["attempt_latency_avg"] == pytest.approx(0.3)
+        assert stats["attempt_latency_max"] == 0.4
+
+
+class TestClientRetries:
+    """Test retries of upstream requests made by the API client"""
+    
+    async def test_retry_after_honored(self):
+        """Test a retryable status is retried after its Retry-After delay"""
+        client, calls = make_client(
+            [httpx.Response(503, headers={"Retry-After": "2"}), httpx.Response(200)]
+        )
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            response = await client._make_request_with_retry("POST", URL, json={})
+        assert response.status_code == 200
+        assert len(calls) == 2
+        sleep.assert_awaited_once_with(2.0)
+    
+    async def test_attempts_capped(self):
+        """Test a failing upstream is tried max_retries + 1 times"""
+        client, calls = make_client([httpx.Response(503)], max_retries=2)
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            response = await client._make_request_with_retry("POST", URL, json={})
+        assert response.status_code == 503
+        assert len(calls) == 3
+        assert sleep.await_count == 2
+    
+    async def test_connection_errors_retried(self):
+        """Test connection errors are retried, then raised on the last attempt"""
+        client, calls = make_client(
+            [httpx.ConnectError("refused"), httpx.Response(200)], max_retries=1
+        )
+        with patch("asyncio.sleep", new=AsyncMock()):
+            response = await client._make_request_with_retry("POST", URL, json={})
+        assert response.status_code == 200
+        
+        client, calls = make_client([httpx.ConnectError("refused")], max_retries=1)
+        with patch("asyncio.sleep", new=AsyncMock()):
+            with pytest.raises(httpx.ConnectError):
+                await client._make_request_with_retry("POST", URL, json={})
+        assert len(calls) == 2
+    
+    @pytest.mark.parametrize("status", [400, 404, 500])
+    async def test_non_retryable_status(self, status):
+        """Test statuses outside retry_statuses are returned at once"""
+        client, calls = make_client([httpx.Response(status)])
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            response = await client._make_request_with_retry("POST", URL, json={})
+        assert response.status_code == status
+        assert len(calls) == 1
+        sleep.assert_not_awaited()
+    
+    async def test_long_retry_after_not_retried(self):
+        """Test a Retry-After beyond retry_after_max returns the response"""
+        client, calls = make_client(
+            [httpx.Response(429, headers={"Retry-After": "120"})],
+            retry_after_max=30,
+        )
+        response = await client._make_request_with_retry("POST", URL, json={})
+        assert response.status_code == 429
+        assert len(calls) == 1
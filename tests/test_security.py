@@ -3,16 +3,42 @@
 Tests for security components
 """
 
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sys
 import pytest
 import time
 from unittest.mock import Mock, patch
 try:
-    from security import RateLimiter, InputValidator, TokenValidator
+    from security import (
+        RateLimiter,
+        GCRARateLimiter,
+        SlidingWindowRateLimiter,
+        TokenBucketRateLimiter,
+        create_rate_limiter,
+        RateLimitPolicy,
+        RateLimitTiers,
+        InputValidator,
+        TokenValidator,
+    )
 except ImportError:
     import sys
     import os
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from security import RateLimiter, InputValidator, TokenValidator
+    from security import (
+        RateLimiter,
+        GCRARateLimiter,
+        SlidingWindowRateLimiter,
+        TokenBucketRateLimiter,
+        create_rate_limiter,
+        RateLimitPolicy,
+        RateLimitTiers,
+        InputValidator,
+        TokenValidator,
+    )
 
 
 class TestRateLimiter:
@@ -75,6 +101,316 @@ class TestRateLimiter:
         assert stats["requests"] == 2
         assert stats["remaining"] == 3
         assert stats["window_seconds"] == 60
+    
+    def test_rate_limiter_release(self):
+        """Test idle clients are released but active ones keep their quota"""
+        limiter = RateLimiter(max_requests=1, window_seconds=60)
+        limiter.is_allowed("active")
+        with patch("time.time", return_value=0.0):
+            limiter.is_allowed("idle")
+        
+        assert limiter.release("idle") == True
+        assert limiter.release("active") == False
+        assert limiter.release("unknown") == False
+        assert limiter.is_allowed("active") == False
+
+
+@pytest.mark.parametrize("limiter_class", [SlidingWindowRateLimiter, GCRARateLimiter])
+class TestConstantMemoryRateLimiters:
+    """Test the sliding window counter and GCRA rate limiters"""
+    
+    def test_allows_burst_up_to_limit(self, limiter_class, clock):
+        """Test a fresh client may use its whole limit at once"""
+        limiter = limiter_class(max_requests=5, window_seconds=60)
+        for i in range(5):
+            assert limiter.is_allowed("client") == True
+        assert limiter.is_allowed("client") == False
+        assert limiter.is_allowed("other") == True
+    
+    def test_quota_recovers_over_time(self, limiter_class, clock):
+        """Test a limited client is allowed again once the window has passed"""
+        limiter = limiter_class(max_requests=4, window_seconds=60)
+        for i in range(4):
+            limiter.is_allowed("client")
+        assert limiter.is_allowed("client") == False
+        
+        clock.now += 120
+        for i in range(4):
+            assert limiter.is_allowed("client") == True
+        assert limiter.is_allowed("client") == False
+    
+    def test_steady_traffic_held_to_rate(self, limiter_class, clock):
+        """Test constant traffic is held to about max_requests per window"""
+        limiter = limiter_class(max_requests=10, window_seconds=60)
+        allowed = 0
+        for step in range(600):
+            clock.now = 1000.0 + step
+            allowed += limiter.is_allowed("client")
+        # Ten windows at ten requests each, plus at most one initial burst
+        assert 90 <= allowed <= 110
+    
+    def test_state_uses_slots(self, limiter_class):
+        """Test per-client state is a small fixed-size object"""
+        limiter = limiter_class(max_requests=100, window_seconds=60)
+        limiter.is_allowed("client")
+        state = limiter.clients["client"]
+        assert not hasattr(state, "__dict__")
+    
+    def test_stats(self, limiter_class, clock):
+        """Test client statistics"""
+        limiter = limiter_class(max_requests=5, window_seconds=60)
+        limiter.is_allowed("client")
+        limiter.is_allowed("client")
+        stats = limiter.get_client_stats("client")
+        assert stats["requests"] == 2
+        assert stats["remaining"] == 3
+        assert stats["window_seconds"] == 60
+        assert limiter.get_client_stats("unknown")["remaining"] == 5
+    
+    def test_idle_clients_swept(self, limiter_class, clock):
+        """Test the periodic sweep drops idle clients only"""
+        limiter = limiter_class(max_requests=5, window_seconds=60, sweep_interval=30)
+        limiter.is_allowed("idle")
+        clock.now += 130
+        limiter.is_allowed("active")
+        assert set(limiter.clients) == {"active"}
+        assert limiter.get_stats()["swept"] == 1
+        
+        assert limiter.release("active") == False
+        clock.now += 200
+        assert limiter.release("active") == True
+
+
+@pytest.mark.parametrize(
+    "limiter_class",
+    [RateLimiter, SlidingWindowRateLimiter, GCRARateLimiter, TokenBucketRateLimiter],
+)
+class TestWeightedCosts:
+    """Test requests charged more or less than one request"""
+    
+    def test_cost_charged_on_admission(self, limiter_class, clock):
+        """Test a call is admitted only if its whole cost fits"""
+        limiter = limiter_class(max_requests=10, window_seconds=60)
+        assert limiter.is_allowed("client", cost=4) == True
+        assert limiter.is_allowed("client", cost=4) == True
+        assert limiter.is_allowed("client", cost=4) == False
+        assert limiter.is_allowed("client", cost=2) == True
+        assert limiter.get_client_stats("client")["requests"] == 10
+    
+    def test_adjust_charges_and_refunds(self, limiter_class, clock):
+        """Test reconciled costs change the client's remaining quota"""
+        limiter = limiter_class(max_requests=10, window_seconds=60)
+        limiter.is_allowed("client")
+        limiter.adjust("client", 8)
+        assert limiter.get_client_stats("client")["requests"] == 9
+        assert limiter.is_allowed("client", cost=2) == False
+        
+        limiter.adjust("client", -4)
+        assert limiter.get_client_stats("client")["requests"] == 5
+        assert limiter.is_allowed("client", cost=5) == True
+        
+        # Unknown clients have nothing to reconcile
+        limiter.adjust("unknown", 5)
+        assert "unknown" not in limiter.clients
+
+
+class TestTokenBucketRateLimiter:
+    """Test token bucket admission with queueing"""
+    
+    def test_burst_then_reject(self, clock):
+        """Test a full bucket admits its burst and then rejects"""
+        limiter = TokenBucketRateLimiter(max_requests=60, window_seconds=60, burst=3)
+        for i in range(3):
+            assert limiter.is_allowed("client") == True
+        assert limiter.is_allowed("client") == False
+        
+        clock.now += 1
+        assert limiter.is_allowed("client") == True
+        assert limiter.is_allowed("client") == False
+    
+    async def test_acquire_waits_for_permit(self):
+        """Test a call waits for the next token within the max delay"""
+        limiter = TokenBucketRateLimiter(max_requests=20, window_seconds=1, burst=1)
+        assert await limiter.acquire("client", max_delay=0.5) == 0.0
+        
+        start = time.monotonic()
+        waited = await limiter.acquire("client", max_delay=0.5)
+        assert 0 < waited <= 0.05
+        assert time.monotonic() - start >= waited * 0.9
+    
+    async def test_acquire_rejects_beyond_max_delay(self, clock):
+        """Test only calls that would wait too long are rejected"""
+        limiter = TokenBucketRateLimiter(max_requests=60, window_seconds=60, burst=1)
+        assert await limiter.acquire("client", max_delay=0.5) == 0.0
+        assert await limiter.acquire("client", max_delay=0.5) is None
+        assert limiter.get_stats()["queued"] == 0
+    
+    async def test_queued_calls_served_in_order(self):
+        """Test concurrent waiters reserve successive tokens"""
+        limiter = TokenBucketRateLimiter(max_requests=50, window_seconds=1, burst=1)
+        results = await asyncio.gather(
+            *(limiter.acquire("client", max_delay=0.5) for _ in range(4))
+        )
+        assert results[0] == 0.0
+        assert results[1] < results[2] < results[3] <= 0.07
+        assert limiter.get_stats()["queued"] == 3
+        assert limiter.get_stats()["waiting"] == 0
+    
+    async def test_cancelled_wait_returns_token(self):
+        """Test a cancelled waiter gives its reserved token back"""
+        limiter = TokenBucketRateLimiter(max_requests=1, window_seconds=10, burst=1)
+        await limiter.acquire("client", max_delay=20)
+        task = asyncio.create_task(limiter.acquire("client", max_delay=20))
+        await asyncio.sleep(0)
+        assert limiter.clients["client"].tokens < -0.9
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert limiter.clients["client"].tokens > -0.1
+    
+    async def test_other_limiters_do_not_queue(self):
+        """Test limiters without queueing admit or reject immediately"""
+        limiter = RateLimiter(max_requests=1, window_seconds=60)
+        assert await limiter.acquire("client", max_delay=10) == 0.0
+        assert await limiter.acquire("client", max_delay=10) is None
+
+
+@pytest.mark.parametrize(
+    "limiter_class",
+    [RateLimiter, SlidingWindowRateLimiter, GCRARateLimiter, TokenBucketRateLimiter],
+)
+class TestRateLimitPolicies:
+    """Test clients limited by their tier's policy"""
+    
+    def test_policy_limits_client(self, limiter_class, clock):
+        """Test a request's policy replaces the default limits"""
+        limiter = limiter_class(max_requests=2, window_seconds=60)
+        gold = RateLimitPolicy("gold", 5, 60)
+        assert sum(limiter.is_allowed("gold", policy=gold) for _ in range(8)) == 5
+        assert sum(limiter.is_allowed("free") for _ in range(8)) == 2
+        assert limiter.get_client_stats("gold")["remaining"] == 0
+        assert limiter.policy_of("gold") is gold
+        assert limiter.policy_of("unknown") is limiter.default_policy
+    
+    def test_update_keeps_usage(self, limiter_class, clock):
+        """Test raising a policy's limit does not reset what clients used"""
+        limiter = limiter_class(max_requests=10, window_seconds=60)
+        tier = RateLimitPolicy("tier", 4, 60)
+        assert sum(limiter.is_allowed("client", policy=tier) for _ in range(6)) == 4
+        
+        tier.update(6, 60)
+        assert limiter.get_client_stats("client")["remaining"] == 2
+        assert sum(limiter.is_allowed("client", policy=tier) for _ in range(6)) == 2
+
+
+def digest(token):
+    """Key the token validator holds a token under"""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def make_token(claims):
+    """Unsigned JWT carrying the given claims"""
+    encode = lambda data: (
+        base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    )
+    return f"{encode({'alg': 'none'})}.{encode(claims)}.signature"
+
+
+class TestRateLimitTiers:
+    """Test tenant tier resolution"""
+    
+    TIERS = {
+        "gold": {"requests": 1000, "window": 3600},
+        "silver": {"requests": 300, "window": 3600, "burst": 50},
+    }
+    
+    def make_tiers(self, **kwargs):
+        default = RateLimitPolicy("default", 100, 3600)
+        return RateLimitTiers(default, self.TIERS, **kwargs)
+    
+    def test_resolve_by_client_id(self):
+        """Test tenants assigned by client ID get their tier"""
+        tiers = self.make_tiers(tenants={"client-a": "gold"})
+        assert tiers.resolve("client-a").max_requests == 1000
+        assert tiers.resolve("client-b") is tiers.default
+        assert tiers.policies["silver"].burst == 50
+    
+    def test_resolve_by_claim(self):
+        """Test tenants are assigned by a token claim value or tier name"""
+        tiers = self.make_tiers(tenants={"org-1": "silver"}, claim="org")
+        assert tiers.resolve("a", make_token({"org": "org-1"})).name == "silver"
+        assert tiers.resolve("b", make_token({"org": "gold"})).name == "gold"
+        assert tiers.resolve("c", make_token({"org": "org-2"})) is tiers.default
+        assert tiers.resolve("d", "not-a-jwt") is tiers.default
+    
+    def test_resolution_memoized(self):
+        """Test the token is only decoded on a tenant's first call"""
+        tiers = self.make_tiers(claim="org")
+        token = make_token({"org": "gold"})
+        module = sys.modules[RateLimitTiers.__module__]
+        with patch.object(module, "_token_claim", wraps=module._token_claim) as claim:
+            for _ in range(5):
+                assert tiers.resolve("client", token).name == "gold"
+        assert claim.call_count == 1
+        
+        tiers.forget("client")
+        assert "client" not in tiers.memo
+    
+    def test_update_in_place(self):
+        """Test updated tiers keep their policy objects"""
+        tiers = self.make_tiers(tenants={"client": "gold"})
+        gold = tiers.resolve("client")
+        tiers.update({"gold": {"requests": 2000}}, {"client": "gold"})
+        assert tiers.resolve("client") is gold
+        assert gold.max_requests == 2000
+        assert gold.window_seconds == 3600
+        assert "silver" not in tiers.policies
+        
+        with pytest.raises(ValueError, match="Unknown rate limit tiers"):
+            tiers.update(self.TIERS, {"client": "platinum"})
+    
+    def test_limits_cast_to_int(self):
+        """Test limits read as strings, e.g. from the environment, become ints"""
+        tiers = self.make_tiers()
+        tiers.update({"gold": {"requests": "60", "window": "60", "burst": "5"}}, {})
+        policy = tiers.policies["gold"]
+        assert (policy.max_requests, policy.window_seconds, policy.burst) == (60, 60, 5)
+    
+    def test_tiers_file_reloaded(self, tmp_path):
+        """Test the tiers file is reloaded when it changes"""
+        path = tmp_path / "tiers.json"
+        path.write_text(json.dumps({"tenants": {"client": "gold"}}))
+        tiers = self.make_tiers(path=str(path), reload_interval=0)
+        assert tiers.resolve("client").name == "gold"
+        
+        path.write_text(json.dumps({"tenants": {"client": "silver"}}))
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        assert tiers.resolve("client").name == "silver"
+        
+        # Invalid files keep the current policies
+        path.write_text("{")
+        os.utime(path, (time.time() + 20, time.time() + 20))
+        assert tiers.resolve("client").name == "silver"
+        assert tiers.get_stats()["reloads"] == 2
+
+
+class TestCreateRateLimiter:
+    """Test rate limiter selection"""
+    
+    def test_algorithms(self):
+        """Test each algorithm name maps to its limiter"""
+        assert isinstance(create_rate_limiter("sliding_log"), RateLimiter)
+        assert isinstance(
+            create_rate_limiter("sliding_window"), SlidingWindowRateLimiter
+        )
+        limiter = create_rate_limiter("gcra", max_requests=7, window_seconds=70)
+        assert isinstance(limiter, GCRARateLimiter)
+        assert limiter.max_requests == 7
+    
+    def test_unknown_algorithm(self):
+        """Test unknown algorithms are rejected"""
+        with pytest.raises(ValueError, match="Unknown rate limit algorithm"):
+            create_rate_limiter("leaky")
 
 
 class TestInputValidator:
@@ -291,4 +627,58 @@ class TestTokenValidator:
         
         # Wait for expiry
         time.sleep(1.1)
-        assert not validator.is_token_cached(token)
\ No newline at end of file
+        assert not validator.is_token_cached(token)
+    
+    def test_token_cache_expires_in_order(self, clock):
+        """Test expired tokens are dropped from the front without a scan"""
+        validator = TokenValidator(cache_ttl=60)
+        for i in range(5):
+            validator.cache_token(f"token.{i}.sig")
+            clock.now += 10
+        # Caching again moves a token to the back
+        validator.cache_token("token.0.sig")
+        clock.now += 35
+        validator.cache_token("token.5.sig")
+        assert list(validator.token_cache) == [
+            digest("token.3.sig"),
+            digest("token.4.sig"),
+            digest("token.0.sig"),
+            digest("token.5.sig"),
+        ]
+        assert validator.is_token_cached("token.0.sig")
+        assert not validator.is_token_cached("token.1.sig")
+        assert validator.get_stats()["expirations"] == 2
+    
+    def test_token_cache_size_capped(self):
+        """Test the tokens expiring soonest are evicted beyond the cap"""
+        validator = TokenValidator(cache_ttl=60, max_cache_size=3)
+        for i in range(5):
+            validator.cache_token(f"token.{i}.sig")
+        assert list(validator.token_cache) == [
+            digest("token.2.sig"),
+            digest("token.3.sig"),
+            digest("token.4.sig"),
+        ]
+        assert validator.get_stats()["evictions"] == 2
+    
+    def test_client_id_from_digest(self):
+        """Test the client ID is the start of the token's digest"""
+        validator = TokenValidator()
+        client_id = validator.get_client_id_from_token("token.a.sig")
+        assert client_id == hashlib.sha256(b"token.a.sig").hexdigest()[:16]
+        assert validator.client_id_from_digest(digest("token.a.sig")) == client_id
+    
+    def test_raw_tokens_not_held(self):
+        """Test the cache is keyed by digest, hashed once when passed along"""
+        validator = TokenValidator()
+        module = sys.modules[TokenValidator.__module__]
+        with patch.object(
+            module.hashlib, "sha256", wraps=module.hashlib.sha256
+        ) as sha256:
+            token_digest = validator.token_digest("token.a.sig")
+            assert not validator.is_token_cached("token.a.sig", token_digest)
+            validator.cache_token("token.a.sig", token_digest)
+            assert validator.is_token_cached("token.a.sig", token_digest)
+            validator.client_id_from_digest(token_digest)
+            assert sha256.call_count == 1
+        assert list(validator.token_cache) == [digest("token.a.sig")]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight request coalescing
+"""
+
+import asyncio
+import pytest
+try:
+    from singleflight import SingleFlight
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent identical calls"""
+    
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test identical concurrent calls run the function once"""
+        flight = SingleFlight()
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        results = await asyncio.gather(*[flight.do("key", fetch) for _ in range(5)])
+        
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flight.get_stats() == {"in_flight": 0, "executed": 1, "coalesced": 4}
+    
+    async def test_different_keys_run_separately(self):
+        """Test different keys (e.g. tenants) are never coalesced"""
+        flight = SingleFlight()
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+        
+        await asyncio.gather(
+            flight.do(("tenant_a", "q"), fetch), flight.do(("tenant_b", "q"), fetch)
+        )
+        
+        assert calls == 2
+    
+    async def test_sequential_calls_not_coalesced(self):
+        """Test a finished call is not reused by later callers"""
+        flight = SingleFlight()
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return calls
+        
+        assert await flight.do("key", fetch) == 1
+        assert await flight.do("key", fetch) == 2
+    
+    async def test_exception_shared_by_waiters(self):
+        """Test every waiter receives the shared exception"""
+        flight = SingleFlight()
+        
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+        
+        results = await asyncio.gather(
+            flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True
+        )
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.calls == {}
+    
+    async def test_cancelling_waiter_does_not_cancel_shared_call(self):
+        """Test cancelling one waiter leaves the shared call running for others"""
+        flight = SingleFlight()
+        release = asyncio.Event()
+        
+        async def fetch():
+            await release.wait()
+            return "done"
+        
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        
+        release.set()
+        assert await second == "done"
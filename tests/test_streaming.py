@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming response handling
+"""
+
+import json
+import pytest
+import httpx
+try:
+    from streaming import PayloadTooLargeError, StreamingJSONReader, ijson
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from streaming import PayloadTooLargeError, StreamingJSONReader, ijson
+
+
+PAYLOAD = {"success": True, "data": [{"id": i, "name": f"lead {i}"} for i in range(200)]}
+
+
+async def _chunks(body: bytes, size: int = 256):
+    for i in range(0, len(body), size):
+        yield body[i : i + size]
+
+
+async def _streamed_response(body: bytes, headers=None) -> httpx.Response:
+    def handler(request):
+        return httpx.Response(200, content=_chunks(body), headers=headers or {})
+    
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    request = client.build_request("POST", "https://api.test/entity/natural_query")
+    return await client.send(request, stream=True)
+
+
+@pytest.fixture(params=[False, True], ids=["json", "ijson"])
+def use_ijson(request):
+    if request.param and ijson is None:
+        pytest.skip("ijson not installed")
+    return request.param
+
+
+class TestStreamingJSONReader:
+    """Test incremental JSON reading with an early size limit"""
+    
+    async def test_reads_json(self, use_ijson):
+        """Test a streamed body decodes to the same result"""
+        body = json.dumps(PAYLOAD).encode()
+        reader = StreamingJSONReader(max_bytes=len(body), use_ijson=use_ijson)
+        
+        result, raw, size = await reader.read(await _streamed_response(body))
+        
+        assert result == PAYLOAD
+        assert raw is None
+        assert size == len(body)
+    
+    async def test_keep_body(self, use_ijson):
+        """Test the raw body can be kept for caching"""
+        body = json.dumps(PAYLOAD).encode()
+        reader = StreamingJSONReader(max_bytes=len(body), use_ijson=use_ijson)
+        
+        result, raw, _ = await reader.read(await _streamed_response(body), keep_body=True)
+        
+        assert raw == body
+    
+    async def test_aborts_oversized_body(self, use_ijson):
+        """Test oversized bodies abort as bytes arrive"""
+        body = json.dumps(PAYLOAD).encode()
+        reader = StreamingJSONReader(max_bytes=1000, use_ijson=use_ijson)
+        
+        with pytest.raises(PayloadTooLargeError) as exc_info:
+            await reader.read(await _streamed_response(body))
+        
+        assert exc_info.value.received <= 1000 + 256
+    
+    async def test_aborts_on_declared_length(self):
+        """Test a too-large Content-Length aborts before reading"""
+        reader = StreamingJSONReader(max_bytes=10)
+        response = await _streamed_response(b"{}", headers={"Content-Length": "5000"})
+        
+        with pytest.raises(PayloadTooLargeError):
+            await reader.read(response)
+    
+    async def test_invalid_json(self, use_ijson):
+        """Test malformed bodies raise"""
+        reader = StreamingJSONReader(max_bytes=1000, use_ijson=use_ijson)
+        
+        with pytest.raises(Exception):
+            await reader.read(await _streamed_response(b'{"data": [1, 2'))
+    
+    async def test_read_bytes(self):
+        """Test reading the undecoded body for passthrough"""
+        body = json.dumps(PAYLOAD).encode()
+        reader = StreamingJSONReader(max_bytes=len(body))
+        
+        assert await reader.read_bytes(await _streamed_response(body)) == body
+    
+    async def test_read_bytes_aborts_oversized_body(self):
+        """Test the size limit also applies to undecoded reads"""
+        body = json.dumps(PAYLOAD).encode()
+        reader = StreamingJSONReader(max_bytes=1000)
+        
+        with pytest.raises(PayloadTooLargeError):
+            await reader.read_bytes(await _streamed_response(body))
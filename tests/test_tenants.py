@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for tenant sessions
+"""
+
+import hashlib
+import pytest
+from unittest.mock import patch
+try:
+    from tenants import TenantSessionPool, get_tenant_session, tenant_context
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from tenants import TenantSessionPool, get_tenant_session, tenant_context
+
+
+def client_id_for(token):
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+class TestTenantSessionPool:
+    """Test tenant session lookup and eviction"""
+    
+    def test_acquire_reuses_session(self):
+        """Test the same token maps to one session"""
+        pool = TenantSessionPool(client_id_for)
+        first = pool.acquire("token-a")
+        second = pool.acquire("token-a")
+        
+        assert first is second
+        assert first.client_id == client_id_for("token-a")
+        assert first.requests == 2
+        assert pool.get_stats()["sessions"] == 1
+    
+    def test_lru_eviction(self):
+        """Test the least recently used session is evicted beyond the limit"""
+        evicted = []
+        pool = TenantSessionPool(
+            client_id_for, max_sessions=2, on_evict=evicted.append
+        )
+        pool.acquire("token-a")
+        pool.acquire("token-b")
+        pool.acquire("token-a")
+        pool.acquire("token-c")
+        
+        assert [session.token for session in evicted] == ["token-b"]
+        assert client_id_for("token-a") in pool.sessions
+        assert client_id_for("token-b") not in pool.sessions
+        assert pool.get_stats()["evictions"] == 1
+    
+    def test_idle_sessions_expire(self):
+        """Test sessions idle past the TTL are dropped on the next acquire"""
+        pool = TenantSessionPool(client_id_for, idle_ttl=60)
+        with patch("time.monotonic", return_value=1000.0):
+            pool.acquire("token-a")
+            pool.acquire("token-b")
+        with patch("time.monotonic", return_value=1030.0):
+            pool.acquire("token-b")
+        with patch("time.monotonic", return_value=1070.0):
+            pool.acquire("token-c")
+        
+        assert client_id_for("token-a") not in pool.sessions
+        assert client_id_for("token-b") in pool.sessions
+        assert pool.get_stats()["expirations"] == 1
+    
+    def test_memory_stays_bounded(self):
+        """Test thousands of tenants never hold more than max_sessions"""
+        pool = TenantSessionPool(client_id_for, max_sessions=100)
+        for i in range(5000):
+            pool.acquire(f"token-{i}")
+        
+        assert len(pool.sessions) == 100
+    
+    def test_evict_callback_errors_are_contained(self):
+        """Test a failing release does not break acquire"""
+        def fail(session):
+            raise RuntimeError("boom")
+        
+        pool = TenantSessionPool(client_id_for, max_sessions=1, on_evict=fail)
+        pool.acquire("token-a")
+        assert pool.acquire("token-b").token == "token-b"
+
+
+class TestTenantContext:
+    """Test the request-scoped tenant"""
+    
+    def test_context_sets_and_resets(self):
+        """Test the session is only visible inside the context"""
+        pool = TenantSessionPool(client_id_for)
+        session = pool.acquire("token-a")
+        
+        assert get_tenant_session() is None
+        with tenant_context(session):
+            assert get_tenant_session() is session
+        assert get_tenant_session() is None
+    
+    def test_no_session_keeps_surrounding_tenant(self):
+        """Test a None session leaves the current tenant in place"""
+        pool = TenantSessionPool(client_id_for)
+        session = pool.acquire("token-a")
+        
+        with tenant_context(session), tenant_context(None):
+            assert get_tenant_session() is session
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for request tracing
+"""
+
+import json
+import os
+import tempfile
+import pytest
+try:
+    from tracing import JSONLSpanExporter, Tracer, get_request_id, request_context
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from tracing import JSONLSpanExporter, Tracer, get_request_id, request_context
+
+
+class MemoryExporter:
+    """Collect exported spans in a list"""
+    
+    def __init__(self):
+        self.spans = []
+    
+    def export(self, span):
+        self.spans.append(span.to_dict())
+    
+    def close(self):
+        pass
+
+
+class TestTracer:
+    """Test span creation and nesting"""
+    
+    def test_disabled(self):
+        """Test spans are no-ops without an exporter"""
+        tracer = Tracer()
+        assert not tracer.enabled
+        with tracer.span("validate") as span:
+            span.set_attribute("ignored", True)
+        assert tracer.httpx_trace() is None
+    
+    def test_nesting_and_request_id(self):
+        """Test child spans share the request ID as trace ID"""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+        
+        with request_context("req-123") as request_id:
+            assert get_request_id() == "req-123"
+            with tracer.span("tool_call", tool="natural_query"):
+                with tracer.span("validate"):
+                    pass
+        assert get_request_id() is None
+        
+        validate, root = exporter.spans
+        assert root["name"] == "tool_call"
+        assert root["trace_id"] == request_id
+        assert root["parent_id"] is None
+        assert root["attributes"] == {"tool": "natural_query"}
+        assert validate["trace_id"] == request_id
+        assert validate["parent_id"] == root["span_id"]
+    
+    def test_error_status(self):
+        """Test spans record exceptions raised inside them"""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+        
+        with pytest.raises(ValueError):
+            with tracer.span("validate"):
+                raise ValueError("Query too long")
+        
+        assert exporter.spans[0]["status"] == "error"
+        assert exporter.spans[0]["attributes"]["error"] == "ValueError"
+    
+    async def test_httpx_trace_phases(self):
+        """Test connection trace events become child spans"""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+        
+        with tracer.span("upstream_attempt"):
+            trace = tracer.httpx_trace()
+        for event in ("connection.connect_tcp", "http11.receive_response_headers"):
+            await trace(f"{event}.started", {})
+            await trace(f"{event}.complete", {"return_value": None})
+        await trace("http11.receive_response_body.started", {})
+        await trace("http11.receive_response_body.failed", {"exception": OSError()})
+        await trace("connection.close.started", {})
+        
+        attempt = exporter.spans[0]
+        phases = {span["name"]: span for span in exporter.spans[1:]}
+        assert list(phases) == ["connect", "wait", "download"]
+        assert all(span["parent_id"] == attempt["span_id"] for span in phases.values())
+        assert phases["download"]["status"] == "error"
+
+
+class TestJSONLSpanExporter:
+    """Test the local span file"""
+    
+    def test_writes_jsonl(self):
+        """Test spans are written one per line, in batches"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "spans.jsonl")
+            exporter = JSONLSpanExporter(path, buffer_size=2)
+            tracer = Tracer(exporter)
+            
+            for name in ("validate", "upstream_request", "serialize"):
+                with tracer.span(name):
+                    pass
+            with open(path) as f:
+                assert len(f.readlines()) == 2
+            
+            tracer.close()
+            with open(path) as f:
+                spans = [json.loads(line) for line in f]
+            assert [span["name"] for span in spans] == [
+                "validate",
+                "upstream_request",
+                "serialize",
+            ]
+            assert all(span["duration_ms"] >= 0 for span in spans)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for pre-forked HTTP workers
+"""
+
+import os
+import signal
+import socket
+import pytest
+from unittest.mock import patch
+
+try:
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.metrics import MetricsRegistry
+    from ambivo_mcp_server.workers import (
+        Supervisor,
+        WorkerRuntime,
+        bind_socket,
+        current_rss_bytes,
+        reuse_port_available,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from ambivo_mcp_server.config import ServerConfig
+    from ambivo_mcp_server.metrics import MetricsRegistry
+    from ambivo_mcp_server.workers import (
+        Supervisor,
+        WorkerRuntime,
+        bind_socket,
+        current_rss_bytes,
+        reuse_port_available,
+    )
+
+
+def worker_registry(calls, in_flight):
+    registry = MetricsRegistry()
+    registry.counter("calls", "Calls").inc(calls)
+    registry.gauge("in_flight", "In flight").set(in_flight)
+    return registry
+
+
+class TestListenSocket:
+    """Test listening socket setup"""
+    
+    @pytest.mark.skipif(not reuse_port_available(), reason="needs SO_REUSEPORT")
+    def test_reuse_port_sockets_share_a_port(self):
+        """Test workers can each bind the same port with SO_REUSEPORT"""
+        first = bind_socket("127.0.0.1", 0, reuse_port=True)
+        port = first.getsockname()[1]
+        second = bind_socket("127.0.0.1", port, reuse_port=True)
+        try:
+            assert second.getsockname()[1] == port
+            assert second.get_inheritable()
+        finally:
+            first.close()
+            second.close()
+    
+    def test_port_in_use_fails(self):
+        """Test binding a taken port without SO_REUSEPORT fails"""
+        first = bind_socket("127.0.0.1", 0)
+        try:
+            with pytest.raises(OSError):
+                bind_socket("127.0.0.1", first.getsockname()[1])
+        finally:
+            first.close()
+
+
+class TestWorkerRuntime:
+    """Test recycling limits and metrics aggregation"""
+    
+    def test_max_requests_jitter(self, tmp_path):
+        """Test request limits are jittered by up to 10%"""
+        config = ServerConfig(worker_max_requests=1000)
+        limits = {WorkerRuntime(config, 0, str(tmp_path)).max_requests for _ in range(20)}
+        assert all(1000 <= limit <= 1100 for limit in limits)
+        assert WorkerRuntime(ServerConfig(), 0, str(tmp_path)).max_requests is None
+    
+    def test_current_rss(self):
+        """Test RSS is measured"""
+        assert current_rss_bytes() > 0
+    
+    def test_aggregate_across_workers(self, tmp_path):
+        """Test /metrics sums this worker with the others' exported state"""
+        other = WorkerRuntime(ServerConfig(), 1, str(tmp_path))
+        other.state_path = os.path.join(str(tmp_path), "worker-1.json")
+        other.attach(worker_registry(calls=3, in_flight=1))
+        other.write_state()
+        
+        runtime = WorkerRuntime(ServerConfig(), 0, str(tmp_path))
+        runtime.attach(worker_registry(calls=2, in_flight=1))
+        text = runtime.render_prometheus()
+        
+        assert "ambivo_calls_total 5" in text
+        assert "ambivo_in_flight 2" in text
+        assert "ambivo_workers 2" in text
+    
+    def test_retired_worker_keeps_counters(self, tmp_path):
+        """Test a dead worker's counters survive but its gauges do not"""
+        supervisor = Supervisor(ServerConfig(workers=2), run_worker=None)
+        supervisor.metrics_dir = str(tmp_path)
+        dead = WorkerRuntime(ServerConfig(), 1, str(tmp_path))
+        dead.state_path = os.path.join(str(tmp_path), "worker-4242.json")
+        dead.attach(worker_registry(calls=7, in_flight=3))
+        dead.write_state()
+        
+        supervisor._retire(4242)
+        
+        assert not os.path.exists(dead.state_path)
+        runtime = WorkerRuntime(ServerConfig(), 0, str(tmp_path))
+        runtime.attach(worker_registry(calls=1, in_flight=0))
+        text = runtime.render_prometheus()
+        assert "ambivo_calls_total 8" in text
+        assert "ambivo_in_flight 0" in text
+        assert "ambivo_workers 1" in text
+    
+    def test_collectors_labeled_per_worker(self, tmp_path):
+        """Test every worker's collector stats reach the aggregated metrics"""
+        other = WorkerRuntime(ServerConfig(), 1, str(tmp_path))
+        other.state_path = os.path.join(str(tmp_path), "worker-1.json")
+        registry = worker_registry(calls=1, in_flight=0)
+        registry.register_collector("pool", lambda: {"in_use": 3, "name": "x"})
+        other.attach(registry)
+        other.write_state()
+        
+        runtime = WorkerRuntime(ServerConfig(), 0, str(tmp_path))
+        registry = worker_registry(calls=1, in_flight=0)
+        registry.register_collector("pool", lambda: {"in_use": 2, "name": "x"})
+        runtime.attach(registry)
+        text = runtime.render_prometheus()
+        
+        assert 'ambivo_pool_in_use{worker="0"} 2' in text
+        assert 'ambivo_pool_in_use{worker="1"} 3' in text
+        assert "ambivo_pool_name" not in text
+        
+        # Collector gauges describe live workers only
+        supervisor = Supervisor(ServerConfig(workers=2), run_worker=None)
+        supervisor.metrics_dir = str(tmp_path)
+        supervisor._retire(1)
+        text = runtime.render_prometheus()
+        assert 'ambivo_pool_in_use{worker="1"}' not in text
+
+
+class TestRollingReload:
+    """Test SIGHUP replaces workers one at a time"""
+    
+    def make_supervisor(self, tmp_path):
+        supervisor = Supervisor(ServerConfig(workers=2), run_worker=None)
+        supervisor.metrics_dir = str(tmp_path)
+        supervisor.running = True
+        supervisor.workers = {101: 0, 102: 1}
+        pids = iter([201, 202])
+        
+        def spawn(index):
+            pid = next(pids)
+            supervisor.workers[pid] = index
+            return pid
+        
+        supervisor._spawn = spawn
+        return supervisor
+    
+    def test_replacement_serves_before_old_worker_stops(self, tmp_path):
+        """Test each worker is stopped only once its replacement is up"""
+        supervisor = self.make_supervisor(tmp_path)
+        supervisor._reload(signal.SIGHUP, None)
+        
+        with patch("os.kill") as kill:
+            supervisor._roll()
+            assert supervisor.replacing[:2] == (101, 201)
+            supervisor._roll()
+            kill.assert_not_called()
+            
+            (tmp_path / "worker-201.json").write_text("{}")
+            supervisor._roll()
+            kill.assert_called_once_with(101, signal.SIGTERM)
+            
+            supervisor._roll()
+            assert supervisor.replacing[:2] == (102, 202)
+            (tmp_path / "worker-202.json").write_text("{}")
+            supervisor._roll()
+            assert kill.call_count == 2
+        
+        assert supervisor.replaced == {101, 102}
+        assert supervisor.workers == {101: 0, 102: 1, 201: 0, 202: 1}
+        assert supervisor.reload_queue == []
+    
+    def test_replacement_timeout_stops_reload(self, tmp_path):
+        """Test a replacement that never starts is stopped, keeping the old workers"""
+        supervisor = self.make_supervisor(tmp_path)
+        supervisor._reload(signal.SIGHUP, None)
+        
+        with patch("os.kill") as kill, patch("time.monotonic", return_value=0):
+            supervisor._roll()
+        with patch("os.kill") as kill, patch("time.monotonic", return_value=60):
+            supervisor._roll()
+            kill.assert_called_once_with(201, signal.SIGTERM)
+        
+        assert supervisor.replacing is None
+        assert supervisor.reload_queue == []
+        assert supervisor.replaced == {201}